@@ -0,0 +1,127 @@
+# cache of derived per-task artifacts shared by all workers (e.g. in Redis)
+import io
+import os
+
+import polars as pl
+
+
+class ArtifactCache:
+    """Cache backend for derived per-task artifacts, stored as bytes with a TTL.
+
+    This base class caches nothing, it's used when no shared cache is configured.
+    Backends never raise: an unavailable cache is a miss, the artifact is computed instead.
+    Keys look like `<kind>:<...>:<task_id>`, so everything of a task can be dropped at once.
+    """
+
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+        self.errors = 0
+
+    def get(self, key: str) -> bytes | None:
+        """Return the cached artifact, or None when it isn't cached."""
+        self.misses += 1
+        return None
+
+    def set(self, key: str, data: bytes, ttl: float | None = None):
+        """Store an artifact, for `ttl` seconds or the default TTL of the backend."""
+
+    def delete_matching(self, pattern: str):
+        """Drop every artifact whose key matches the glob-style pattern."""
+
+    def invalidate_task(self, task_id: str):
+        """Drop every artifact of a task."""
+        self.delete_matching(f"*:{task_id}")
+
+    def stats(self) -> dict:
+        """Return the counters of this worker; the entries and evictions are up to the backend, so unknown (None)."""
+        lookups = self.hits + self.misses
+        return {
+            "entries": None,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": None,
+            "hit_ratio": self.hits / lookups if lookups else 0.0,
+            "backend": type(self).__name__,
+            "errors": self.errors,
+        }
+
+
+class RedisArtifactCache(ArtifactCache):
+    """Artifact cache in Redis, shared by all uvicorn workers (and hosts).
+
+    Args:
+        redis_client (redis.Redis): Client of the Redis server, with bytes responses.
+        prefix (str): Prefix of all keys, so the cache can share a database.
+        default_ttl (float): Seconds an artifact is kept when no TTL is given.
+    """
+
+    def __init__(self, redis_client, prefix: str = "cronbach:", default_ttl: float = 24 * 60 * 60):
+        super().__init__()
+        self._redis = redis_client
+        self.prefix = prefix
+        self.default_ttl = default_ttl
+
+    def get(self, key: str) -> bytes | None:
+        try:
+            data = self._redis.get(self.prefix + key)
+        except Exception as e:
+            self._log_error("read", key, e)
+            data = None
+        if data is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return data
+
+    def set(self, key: str, data: bytes, ttl: float | None = None):
+        ttl = self.default_ttl if ttl is None else ttl
+        try:
+            self._redis.set(self.prefix + key, data, px=max(1, int(ttl * 1000)))
+        except Exception as e:
+            self._log_error("write", key, e)
+
+    def delete_matching(self, pattern: str):
+        try:
+            keys = list(self._redis.scan_iter(match=self.prefix + pattern, count=1000))
+            if keys:
+                self._redis.unlink(*keys)
+        except Exception as e:
+            self._log_error("delete", pattern, e)
+
+    def _log_error(self, action: str, key: str, error: Exception):
+        self.errors += 1
+        print(f"Warning: Could not {action} {key} in the artifact cache: {error}")
+
+
+def create_artifact_cache() -> ArtifactCache:
+    """Create the artifact cache configured by ARTIFACT_CACHE ("redis" or "none") and the REDIS_* settings."""
+    if os.getenv("ARTIFACT_CACHE", "none").lower() != "redis":
+        return ArtifactCache()
+
+    import redis
+
+    client = redis.Redis(
+        host=os.getenv("REDIS_HOST", "localhost"),
+        port=int(os.getenv("REDIS_PORT", "6379")),
+        db=int(os.getenv("REDIS_DB", "0")),
+        password=os.getenv("REDIS_PASSWORD") or None,
+        socket_timeout=float(os.getenv("REDIS_TIMEOUT", "0.5")),
+        socket_connect_timeout=float(os.getenv("REDIS_TIMEOUT", "0.5")),
+    )
+    return RedisArtifactCache(
+        client,
+        prefix=os.getenv("ARTIFACT_CACHE_PREFIX", "cronbach:"),
+        default_ttl=float(os.getenv("ARTIFACT_CACHE_TTL", str(24 * 60 * 60))),
+    )
+
+
+def frame_to_bytes(df: pl.DataFrame) -> bytes:
+    """Serialize a data frame to compressed Arrow IPC."""
+    buffer = io.BytesIO()
+    df.write_ipc(buffer, compression="zstd")
+    return buffer.getvalue()
+
+
+def frame_from_bytes(data: bytes) -> pl.DataFrame:
+    return pl.read_ipc(io.BytesIO(data))
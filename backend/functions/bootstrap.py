@@ -0,0 +1,76 @@
+# bootstrap confidence intervals for Cronbach's alpha
+import numpy as np
+
+# Replicates resampled at once within a batch, bounds the memory of the weight matrix
+RESAMPLE_CHUNK = 64
+
+
+def bootstrap_batch(values: np.ndarray, seed: np.random.SeedSequence, replicates: int) -> np.ndarray:
+    """Cronbach's alpha of a group for a batch of bootstrap replicates.
+
+    Resampling respondents with replacement is the same as weighting every respondent
+    with the number of times it was drawn, so the sums of a whole chunk of replicates
+    are a single weights × values matrix product.
+    Runs in a worker process; the seed makes the result independent of the worker.
+
+    Args:
+      values (np.ndarray): Complete respondents × statements answers of the group.
+      seed (np.random.SeedSequence): Seed of this batch.
+      replicates (int): Number of bootstrap replicates.
+
+    Returns:
+        (np.ndarray): Cronbach's alpha per replicate.
+    """
+    rng = np.random.default_rng(seed)
+    rows, items_count = values.shape
+
+    # Variances are shift invariant, centering keeps the sums small
+    centered = values.astype(np.float64)
+    centered -= centered.mean(axis=0)
+    totals = centered.sum(axis=1)
+    items = np.column_stack([centered, centered * centered])
+    total_terms = np.column_stack([totals, totals * totals])
+
+    alphas = np.empty(replicates)
+    for start in range(0, replicates, RESAMPLE_CHUNK):
+        chunk = min(RESAMPLE_CHUNK, replicates - start)
+        # Draw the row indices of every replicate and count how often each row was drawn
+        drawn = rng.integers(0, rows, size=(chunk, rows)) + np.arange(chunk)[:, None] * rows
+        weights = np.bincount(drawn.ravel(), minlength=chunk * rows).reshape(chunk, rows).astype(np.float64)
+
+        item_sums = weights @ items
+        total_sums = weights @ total_terms
+
+        item_variances = (item_sums[:, items_count:] - item_sums[:, :items_count] ** 2 / rows) / (rows - 1)
+        total_var = (total_sums[:, 1] - total_sums[:, 0] ** 2 / rows) / (rows - 1)
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            alpha = items_count / (items_count - 1) * (1 - item_variances.sum(axis=1) / total_var)
+        # No reliability if no variance, like `cronbach_alpha`
+        alphas[start:start + chunk] = np.where(total_var == 0, 0.0, alpha)
+
+    return alphas
+
+
+def split_replicates(replicates: int, batch_size: int, seed: int | list[int]) -> list[tuple[np.random.SeedSequence, int]]:
+    """Split the replicates of a group into batches with their own deterministic seed.
+
+    Args:
+      replicates (int): Total number of replicates.
+      batch_size (int): Replicates per batch.
+      seed (int | list[int]): Seed of the group, e.g. [request seed, group index].
+
+    Returns:
+        (list[tuple[np.random.SeedSequence, int]]): Seed and number of replicates per batch.
+    """
+    sizes = [min(batch_size, replicates - start) for start in range(0, replicates, batch_size)]
+    return list(zip(np.random.SeedSequence(seed).spawn(len(sizes)), sizes))
+
+
+def percentile_interval(alphas: np.ndarray, confidence: float) -> tuple[float | None, float | None]:
+    """Percentile confidence interval of the bootstrap alphas, rounded like the alphas themselves."""
+    alphas = alphas[np.isfinite(alphas)]
+    if alphas.size == 0:
+        return None, None
+    low, high = np.quantile(alphas, [(1 - confidence) / 2, (1 + confidence) / 2])
+    return float(np.round(low, 3)), float(np.round(high, 3))
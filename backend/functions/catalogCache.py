@@ -0,0 +1,116 @@
+# cache of the client statement catalogs fetched from ArpY
+import asyncio
+import time
+
+from typing import Awaitable, Callable
+
+import polars as pl
+
+
+class CatalogCache:
+    """Per-client TTL cache of the statement catalogs, with stale-while-revalidate.
+
+    - Catalogs younger than `ttl` are returned from the cache.
+    - Catalogs older than `ttl` but within `ttl + max_stale` are returned as well, while
+      a refresh is started in the background.
+    - Older or missing catalogs are fetched before returning.
+    Concurrent fetches for the same client are deduplicated into a single upstream call.
+
+    Args:
+        fetch (Callable[[str], Awaitable[pl.DataFrame]]): Fetches the catalog of a client,
+            e.g. `get_statements_data` from ArpY.
+        ttl (float): Seconds a catalog is considered fresh.
+        max_stale (float): Seconds after the ttl during which a stale catalog may still be served.
+    """
+
+    def __init__(self, fetch: Callable[[str], Awaitable[pl.DataFrame]], ttl: float, max_stale: float):
+        self._fetch = fetch
+        self.ttl = ttl
+        self.max_stale = max_stale
+        self._entries: dict[str, tuple[float, pl.DataFrame]] = {}
+        self._inflight: dict[str, asyncio.Task] = {}
+        # Bumped on invalidation, so fetches started before it don't store their result
+        self._generation = 0
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.fetches = 0
+        self.fetch_errors = 0
+
+    async def get(self, client: str) -> pl.DataFrame:
+        """Return the statement catalog of the client.
+
+        Args:
+          client (str): Client identifier.
+
+        Returns:
+            (pl.DataFrame): The statement catalog.
+        """
+        entry = self._entries.get(client)
+        if entry is not None:
+            fetched_at, catalog = entry
+            age = time.monotonic() - fetched_at
+            if age < self.ttl:
+                self.hits += 1
+                return catalog
+            if age < self.ttl + self.max_stale:
+                self.stale_hits += 1
+                self._start_fetch(client)
+                return catalog
+            # Too old to serve, replaced by the fetch below
+            self.evictions += 1
+
+        self.misses += 1
+        # Shielded, so a cancelled request doesn't cancel the fetch the others are waiting on
+        return await asyncio.shield(self._start_fetch(client))
+
+    def invalidate(self, client: str | None = None):
+        """Drop the catalog of one client, or of all clients when no client is given."""
+        self._generation += 1
+        if client is None:
+            self._entries.clear()
+            self._inflight.clear()
+        else:
+            self._entries.pop(client, None)
+            self._inflight.pop(client, None)
+
+    def stats(self) -> dict:
+        """Return the counters of the cache, stale catalogs served count as hits in the hit ratio."""
+        lookups = self.hits + self.stale_hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_ratio": (self.hits + self.stale_hits) / lookups if lookups else 0.0,
+            "stale_hits": self.stale_hits,
+            "fetches": self.fetches,
+            "fetch_errors": self.fetch_errors,
+        }
+
+    def _start_fetch(self, client: str) -> asyncio.Task:
+        # Single-flight: join the fetch that is already running for this client
+        task = self._inflight.get(client)
+        if task is None:
+            task = asyncio.create_task(self._fetch_and_store(client, self._generation))
+            self._inflight[client] = task
+            task.add_done_callback(self._log_fetch_error)
+        return task
+
+    async def _fetch_and_store(self, client: str, generation: int) -> pl.DataFrame:
+        self.fetches += 1
+        try:
+            catalog = await self._fetch(client)
+            if generation == self._generation:
+                self._entries[client] = (time.monotonic(), catalog)
+            return catalog
+        finally:
+            if self._inflight.get(client) is asyncio.current_task():
+                del self._inflight[client]
+
+    def _log_fetch_error(self, task: asyncio.Task):
+        # Background refreshes have nobody awaiting them, on failure the stale catalog stays in use
+        if not task.cancelled() and task.exception() is not None:
+            self.fetch_errors += 1
+            print(f"Warning: Fetching a statement catalog failed: {task.exception()}")
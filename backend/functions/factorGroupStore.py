@@ -0,0 +1,128 @@
+# persistence of the saved factor groupings in MongoDB
+import os
+import threading
+import time
+
+from pymongo import DeleteMany, MongoClient, ReturnDocument, UpdateOne
+from pymongo.database import Database
+from pymongo.errors import BulkWriteError
+
+# MongoDB error code of a unique index violation
+DUPLICATE_KEY = 11000
+
+_client: MongoClient | None = None
+_client_lock = threading.Lock()
+
+
+def get_mongo_client() -> MongoClient:
+    """Return the process-wide MongoDB client.
+
+    MongoClient is thread-safe and keeps a connection pool, so every request shares
+    one client instead of connecting per save. It connects lazily, on the first operation.
+    """
+    global _client
+    with _client_lock:
+        if _client is None:
+            _client = MongoClient(
+                os.getenv("MONGO_CONNECTION_URI", "mongodb://localhost:27017/"),
+                maxPoolSize=int(os.getenv("MONGO_MAX_POOL_SIZE", "50")),
+                serverSelectionTimeoutMS=int(os.getenv("MONGO_TIMEOUT_MS", "5000")),
+            )
+        return _client
+
+
+class FactorGroupStore:
+    """Saved factor groupings, one document per statement of a (client, task).
+
+    Every save gets the next version number of its (client, task) and is written as a
+    single unordered bulk write: an upsert per statement and the removal of the
+    statements that aren't in the new grouping anymore. Upserts only replace documents
+    of older versions, so when two saves race the newest one wins.
+
+    Args:
+        database (Database): Database holding the `factor_groups` and `factor_group_versions` collections.
+    """
+
+    def __init__(self, database: Database):
+        self.groups = database["factor_groups"]
+        self.versions = database["factor_group_versions"]
+        self._indexed = False
+
+    def _ensure_indexes(self):
+        # Created on the first save, so starting the app doesn't need the database
+        if not self._indexed:
+            self.groups.create_index([("client", 1), ("task_id", 1), ("statement", 1)], unique=True)
+            self._indexed = True
+
+    def next_version(self, client: str, task_id: str) -> int:
+        """Reserve the next version number of the grouping of a (client, task)."""
+        document = self.versions.find_one_and_update(
+            {"_id": {"client": client, "task_id": task_id}},
+            {"$inc": {"version": 1}},
+            upsert=True,
+            return_document=ReturnDocument.AFTER,
+        )
+        return document["version"]
+
+    def save(self, client: str, task_id: str, groups: list[list[dict]]) -> int:
+        """Save a grouping as the new version of the (client, task).
+
+        Args:
+          client (str): Client identifier.
+          task_id (str): Unique identifier for the task.
+          groups (list[list[dict]]): Statement objects per group, with at least `original_statement`.
+
+        Returns:
+            (int): Version number of the saved grouping.
+
+        Raises:
+            ValueError: If a statement object has no `original_statement`
+            pymongo.errors.PyMongoError: If the database can't be reached or the write fails
+        """
+        statements = []
+        for group_index, group in enumerate(groups):
+            for position, statement in enumerate(group):
+                original = statement.get("original_statement")
+                if not original:
+                    raise ValueError(f"Statement {position} of group {group_index} has no original_statement")
+                statements.append((original, group_index, position, statement.get("aliasses")))
+
+        self._ensure_indexes()
+        version = self.next_version(client, task_id)
+        saved_at = time.time()
+
+        operations = [
+            UpdateOne(
+                {"client": client, "task_id": task_id, "statement": original, "version": {"$lt": version}},
+                {"$set": {
+                    "group": group_index,
+                    "position": position,
+                    "alias": alias,
+                    "version": version,
+                    "saved_at": saved_at,
+                }},
+                upsert=True,
+            )
+            for original, group_index, position, alias in statements
+        ]
+        operations.append(DeleteMany({"client": client, "task_id": task_id, "version": {"$lt": version}}))
+
+        try:
+            self.groups.bulk_write(operations, ordered=False)
+        except BulkWriteError as e:
+            # A newer save already wrote the statement, its upsert hits the unique index
+            if any(error["code"] != DUPLICATE_KEY for error in e.details["writeErrors"]):
+                raise
+        return version
+
+    def load(self, client: str, task_id: str) -> tuple[int, list[list[str]]]:
+        """Return the latest saved version of a (client, task) and its statements per group."""
+        documents = list(self.groups.find({"client": client, "task_id": task_id}).sort([("group", 1), ("position", 1)]))
+        if not documents:
+            # The latest save can be an empty grouping
+            version = self.versions.find_one({"_id": {"client": client, "task_id": task_id}})
+            return (version["version"] if version else 0), []
+        groups = [[] for _ in range(max(document["group"] for document in documents) + 1)]
+        for document in documents:
+            groups[document["group"]].append(document["statement"])
+        return max(document["version"] for document in documents), groups
@@ -0,0 +1,72 @@
+# binary encodings of a group's statement scores, so they don't have to be sent as JSON
+import io
+
+import numpy as np
+import polars as pl
+
+# Raw scores, with the `X-Shape` ("statements,respondents") and `X-Dtype` headers
+RAW_CONTENT_TYPE = "application/octet-stream"
+RAW_DTYPES = {"uint8": np.uint8, "float32": np.float32}
+
+# Arrow IPC, one column per statement
+ARROW_STREAM_CONTENT_TYPE = "application/vnd.apache.arrow.stream"
+ARROW_FILE_CONTENT_TYPE = "application/vnd.apache.arrow.file"
+
+BINARY_CONTENT_TYPES = (RAW_CONTENT_TYPE, ARROW_STREAM_CONTENT_TYPE, ARROW_FILE_CONTENT_TYPE)
+
+
+def decode_raw(body: bytes, shape: str | None, dtype: str | None) -> np.ndarray:
+    """Decode raw statement scores: a row-major (statements, respondents) array like the JSON `group_data`.
+
+    uint8 scores use 0 for a missing answer (the Likert scale starts at 1), float32 scores NaN.
+
+    Args:
+      body (bytes): The scores.
+      shape (str | None): Number of statements and respondents, e.g. "3,10000".
+      dtype (str | None): "uint8" or "float32".
+
+    Returns:
+        (np.ndarray): The scores with a column per statement and NaN for missing answers.
+
+    Raises:
+        ValueError: If the shape or dtype is missing or invalid, or doesn't match the size of the body
+    """
+    if dtype not in RAW_DTYPES:
+        raise ValueError(f"X-Dtype must be one of {', '.join(RAW_DTYPES)}")
+    try:
+        statements, respondents = (int(n) for n in shape.split(","))
+    except (AttributeError, ValueError):
+        raise ValueError('X-Shape must be "statements,respondents"')
+
+    itemsize = np.dtype(RAW_DTYPES[dtype]).itemsize
+    if statements < 0 or respondents < 0 or len(body) != statements * respondents * itemsize:
+        raise ValueError(f"Expected {statements} x {respondents} {dtype} scores, got {len(body)} bytes")
+
+    scores = np.frombuffer(body, dtype=RAW_DTYPES[dtype]).reshape(statements, respondents).T
+    values = scores.astype(np.float64)
+    if dtype == "uint8":
+        values[scores == 0] = np.nan
+    return values
+
+
+def decode_arrow(body: bytes, content_type: str = ARROW_STREAM_CONTENT_TYPE) -> np.ndarray:
+    """Decode statement scores sent as Arrow IPC, with a numeric column per statement and nulls for missing answers.
+
+    Args:
+      body (bytes): The Arrow IPC stream or file.
+      content_type (str): `ARROW_STREAM_CONTENT_TYPE` or `ARROW_FILE_CONTENT_TYPE`.
+
+    Returns:
+        (np.ndarray): The scores with a column per statement and NaN for missing answers.
+
+    Raises:
+        ValueError: If the body isn't Arrow IPC or has non-numeric columns
+    """
+    try:
+        if content_type == ARROW_FILE_CONTENT_TYPE:
+            df = pl.read_ipc(io.BytesIO(body), memory_map=False)
+        else:
+            df = pl.read_ipc_stream(io.BytesIO(body))
+        return df.cast(pl.Float64).to_numpy()
+    except (pl.exceptions.PolarsError, OSError) as e:
+        raise ValueError(f"Invalid Arrow IPC scores: {e}")
@@ -0,0 +1,214 @@
+# local search for the grouping with the highest Cronbach's alphas
+import time
+
+import numpy as np
+
+# With the "minimum" objective only moves involving the weakest group change the score,
+# the total breaks the ties so the other groups keep improving too
+TIE_BREAK = 1e-6
+# Improvements smaller than this are rounding noise
+MIN_IMPROVEMENT = 1e-12
+
+
+def group_alphas(sizes: np.ndarray, variance_sums: np.ndarray, totals: np.ndarray) -> np.ndarray:
+    """Cronbach's alpha from the group sizes and covariance sums, elementwise.
+
+    Groups with less than 2 statements count as 0, groups without variance too (like `cronbach_alpha`).
+    """
+    with np.errstate(divide="ignore", invalid="ignore"):
+        alphas = sizes / (sizes - 1) * (1 - variance_sums / totals)
+    return np.where((sizes < 2) | (totals == 0) | ~np.isfinite(alphas), 0.0, alphas)
+
+
+class GroupingState:
+    """Grouping of the statements with the covariance sums needed to score moves and swaps.
+
+    For every statement the sum of its covariances with each group (`links`) is kept,
+    which gives the new variance sums and totals of both groups of a move or swap in O(1),
+    so all candidates are scored at once with a few array operations.
+
+    Args:
+        covariance (np.ndarray): Covariance matrix of the statements.
+        assignment (np.ndarray): Group index of every statement.
+        n_groups (int): Number of groups.
+        objective (str): "total" to maximize the sum of the alphas, "minimum" for the lowest alpha.
+    """
+
+    def __init__(self, covariance: np.ndarray, assignment: np.ndarray, n_groups: int, objective: str):
+        self.covariance = covariance
+        self.variances = np.diag(covariance).copy()
+        self.assignment = assignment.copy()
+        self.n_groups = n_groups
+        self.objective = objective
+
+        members = np.zeros((len(assignment), n_groups))
+        members[np.arange(len(assignment)), assignment] = 1.0
+        self.links = covariance @ members
+        self.sizes = members.sum(axis=0)
+        self.variance_sums = self.variances @ members
+        self.totals = (members * self.links).sum(axis=0)
+        self._rescore()
+
+    def _rescore(self):
+        self.alphas = group_alphas(self.sizes, self.variance_sums, self.totals)
+        self.total = self.alphas.sum()
+        # Lowest alpha of the groups other than a and b, for the "minimum" objective
+        others = np.broadcast_to(self.alphas, (self.n_groups, self.n_groups, self.n_groups)).copy()
+        groups = np.arange(self.n_groups)
+        others[groups[:, None], groups[None, :], groups[:, None]] = np.inf
+        others[groups[:, None], groups[None, :], groups[None, :]] = np.inf
+        self._minimum_without = others.min(axis=2)
+
+    @property
+    def value(self) -> float:
+        if self.objective == "minimum":
+            return float(self.alphas.min() + TIE_BREAK * self.total)
+        return float(self.total)
+
+    def _value_after(self, a: np.ndarray, b: np.ndarray, alpha_a: np.ndarray, alpha_b: np.ndarray) -> np.ndarray:
+        # Objective after groups a and b (a != b) got new alphas
+        total = self.total - self.alphas[a] - self.alphas[b] + alpha_a + alpha_b
+        if self.objective == "minimum":
+            return np.minimum(self._minimum_without[a, b], np.minimum(alpha_a, alpha_b)) + TIE_BREAK * total
+        return total
+
+    def best_move(self, movable: np.ndarray, min_group_size: int) -> tuple[float, int, int]:
+        """Return the objective, statement and target group of the best single move."""
+        n = len(self.assignment)
+        rows = np.arange(n)
+        a = self.assignment
+
+        source_alpha = group_alphas(
+            self.sizes[a] - 1,
+            self.variance_sums[a] - self.variances,
+            self.totals[a] - 2 * self.links[rows, a] + self.variances,
+        )
+        target_alpha = group_alphas(
+            self.sizes[None, :] + 1,
+            self.variance_sums[None, :] + self.variances[:, None],
+            self.totals[None, :] + 2 * self.links + self.variances[:, None],
+        )
+        values = self._value_after(a[:, None], np.arange(self.n_groups)[None, :], source_alpha[:, None], target_alpha)
+
+        values[rows, a] = -np.inf
+        values[~movable | (self.sizes[a] <= min_group_size)] = -np.inf
+        statement, target = np.unravel_index(np.argmax(values), values.shape)
+        return float(values[statement, target]), int(statement), int(target)
+
+    def best_swap(self, movable: np.ndarray) -> tuple[float, int, int]:
+        """Return the objective and the two statements of the best swap between groups."""
+        a = self.assignment
+        covariance = self.covariance
+        d = self.variances
+        # links_to[i, j]: covariances of statement i with the group of statement j
+        links_to = self.links[:, a]
+        own = self.links[np.arange(len(a)), a]
+
+        # Group of i loses i and gains j, group of j loses j and gains i
+        alpha_i = group_alphas(
+            self.sizes[a][:, None],
+            (self.variance_sums[a] - d)[:, None] + d[None, :],
+            (self.totals[a] - 2 * own + d)[:, None] + 2 * links_to.T - 2 * covariance + d[None, :],
+        )
+        alpha_j = group_alphas(
+            self.sizes[a][None, :],
+            (self.variance_sums[a] - d)[None, :] + d[:, None],
+            (self.totals[a] - 2 * own + d)[None, :] + 2 * links_to - 2 * covariance + d[:, None],
+        )
+        values = self._value_after(a[:, None], a[None, :], alpha_i, alpha_j)
+
+        values[a[:, None] == a[None, :]] = -np.inf
+        values[~movable, :] = -np.inf
+        values[:, ~movable] = -np.inf
+        i, j = np.unravel_index(np.argmax(values), values.shape)
+        return float(values[i, j]), int(i), int(j)
+
+    def move(self, statement: int, target: int):
+        """Move a statement to another group and update the sums."""
+        source = self.assignment[statement]
+        column = self.covariance[:, statement]
+        variance = self.variances[statement]
+
+        self.totals[source] -= 2 * self.links[statement, source] - variance
+        self.variance_sums[source] -= variance
+        self.sizes[source] -= 1
+        self.links[:, source] -= column
+
+        self.totals[target] += 2 * self.links[statement, target] + variance
+        self.variance_sums[target] += variance
+        self.sizes[target] += 1
+        self.links[:, target] += column
+
+        self.assignment[statement] = target
+        self._rescore()
+
+
+def local_search(
+    covariance: np.ndarray,
+    assignment: np.ndarray,
+    n_groups: int,
+    movable: np.ndarray,
+    min_group_size: int,
+    objective: str,
+    time_limit: float,
+) -> tuple[np.ndarray, float, bool]:
+    """Improve a grouping with the best move or swap until nothing improves or the time is up.
+
+    Runs in a worker process, the caller continues an unfinished search with the returned grouping.
+
+    Args:
+      covariance (np.ndarray): Covariance matrix of the statements.
+      assignment (np.ndarray): Group index of every statement to start from.
+      n_groups (int): Number of groups.
+      movable (np.ndarray): Whether each statement may change group (False for locked statements).
+      min_group_size (int): Moves don't shrink groups below this size, swaps keep the sizes.
+      objective (str): "total" to maximize the sum of the alphas, "minimum" for the lowest alpha.
+      time_limit (float): Seconds the search may take.
+
+    Returns:
+        (tuple[np.ndarray, float, bool]): The grouping, its objective and whether it's a local optimum.
+    """
+    deadline = time.monotonic() + time_limit
+    state = GroupingState(covariance, assignment, n_groups, objective)
+
+    while time.monotonic() < deadline:
+        current = state.value
+        move_value, statement, target = state.best_move(movable, min_group_size)
+        swap_value, i, j = state.best_swap(movable)
+
+        if max(move_value, swap_value) <= current + MIN_IMPROVEMENT:
+            return state.assignment, current, True
+        if move_value >= swap_value:
+            state.move(statement, target)
+        else:
+            group_i, group_j = state.assignment[i], state.assignment[j]
+            state.move(i, group_j)
+            state.move(j, group_i)
+
+    return state.assignment, state.value, False
+
+
+def perturb(
+    assignment: np.ndarray,
+    n_groups: int,
+    movable: np.ndarray,
+    min_group_size: int,
+    rng: np.random.Generator,
+    moves: int,
+) -> np.ndarray:
+    """Random starting point for a restart: a number of random moves away from the grouping."""
+    assignment = assignment.copy()
+    sizes = np.bincount(assignment, minlength=n_groups)
+    candidates = np.flatnonzero(movable)
+    if candidates.size == 0 or n_groups < 2:
+        return assignment
+
+    for statement in rng.choice(candidates, size=moves):
+        source = assignment[statement]
+        if sizes[source] <= min_group_size:
+            continue
+        target = (source + rng.integers(1, n_groups)) % n_groups
+        assignment[statement] = target
+        sizes[source] -= 1
+        sizes[target] += 1
+    return assignment
@@ -0,0 +1,54 @@
+# suggested factor groups, from the eigen-decomposition of the item correlations
+import numpy as np
+
+
+def correlation_from_covariance(covariance: np.ndarray) -> np.ndarray:
+    """Item correlation matrix of a covariance matrix; statements without variance correlate 0."""
+    std = np.sqrt(np.diag(covariance))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        correlation = covariance / np.outer(std, std)
+    correlation[~np.isfinite(correlation)] = 0.0
+    np.fill_diagonal(correlation, 1.0)
+    return correlation
+
+
+def varimax(loadings: np.ndarray, max_iterations: int = 100, tolerance: float = 1e-6) -> np.ndarray:
+    """Varimax rotation of a statements × factors loading matrix.
+
+    Rotates the factors so every statement loads high on as few factors as possible,
+    which makes assigning every statement to one factor meaningful.
+    """
+    statements, factors = loadings.shape
+    rotation = np.eye(factors)
+    criterion = 0.0
+    for _ in range(max_iterations):
+        rotated = loadings @ rotation
+        u, s, vt = np.linalg.svd(
+            loadings.T @ (rotated ** 3 - rotated @ np.diag((rotated ** 2).sum(axis=0)) / statements)
+        )
+        rotation = u @ vt
+        previous, criterion = criterion, s.sum()
+        if previous and criterion < previous * (1 + tolerance):
+            break
+    return loadings @ rotation
+
+
+def suggest_groups(correlation: np.ndarray, n_groups: int) -> list[list[int]]:
+    """Divide the statements over groups by their strongest (rotated) principal component.
+
+    Args:
+      correlation (np.ndarray): Item correlation matrix.
+      n_groups (int): Number of groups.
+
+    Returns:
+        (list[list[int]]): Column indices per group, strongest component first; groups can be empty.
+    """
+    eigenvalues, eigenvectors = np.linalg.eigh(correlation)
+    strongest = np.argsort(eigenvalues)[::-1][:n_groups]
+    loadings = eigenvectors[:, strongest] * np.sqrt(np.clip(eigenvalues[strongest], 0, None))
+    if n_groups > 1:
+        loadings = varimax(loadings)
+
+    # Reverse-keyed statements load negatively but still belong to the factor
+    assignment = np.abs(loadings).argmax(axis=1)
+    return [np.flatnonzero(assignment == group).tolist() for group in range(n_groups)]
@@ -0,0 +1,277 @@
+# opt-in profiling of single requests, to find out why the file or task of a particular client is slow
+import asyncio
+import json
+import marshal
+import os
+import pstats
+import re
+import sys
+import threading
+import time
+import tracemalloc
+import uuid
+
+from contextvars import ContextVar
+from typing import Callable
+from urllib.parse import parse_qs
+
+# Requests are profiled with the `X-Profile: 1` header or the `?profile=1` query parameter
+PROFILE_HEADER = b"x-profile"
+PROFILE_QUERY = "profile"
+
+# Number of functions and allocation sites in the summary of a profile
+TOP_ENTRIES = 25
+
+_profiling: ContextVar[bool] = ContextVar("profiling", default=False)
+
+# Sampled threads whose innermost frame is in one of these are waiting for work, not working
+_IDLE_FILES = ("threading.py", "selectors.py", "queue.py")
+# Background threads that mostly sleep in C (the monitors of the MongoDB client)
+_IGNORED_THREADS = ("pymongo",)
+_REQUEST_ID = re.compile(r"^[A-Za-z0-9_-]{1,64}$")
+
+
+def is_profiling() -> bool:
+    """Whether the current request is being profiled."""
+    return _profiling.get()
+
+
+def _is_idle(frame) -> bool:
+    code = frame.f_code
+    return code.co_filename.endswith(_IDLE_FILES) or (
+        code.co_name == "_worker" and code.co_filename.endswith(os.path.join("concurrent", "futures", "thread.py"))
+    )
+
+
+def _function_key(frame) -> tuple[str, int, str]:
+    code = frame.f_code
+    return code.co_filename, code.co_firstlineno, code.co_name
+
+
+class SamplingProfiler:
+    """Samples the stacks of all threads every `interval` seconds.
+
+    cProfile only sees the thread it is enabled in, while the work of a request is spread over
+    the event loop, the threadpool of the sync endpoints and the upload workers. Idle threads
+    (waiting on a lock, queue or selector) and the MongoDB client's monitor threads are skipped.
+
+    The samples are converted to the pstats format, so the profiles open with the usual tools
+    (`python -m pstats`, snakeviz); times are the number of samples times the sampling period.
+
+    Args:
+        interval (float): Seconds between samples.
+    """
+
+    def __init__(self, interval: float = 0.001):
+        self.interval = interval
+        # Number of samples per stack (innermost function first), repeated stacks are stored once
+        self.stacks: dict[tuple[tuple[str, int, str], ...], int] = {}
+        self.ticks = 0
+        self.duration = 0.0
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name="profiler", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self):
+        own_id = threading.get_ident()
+        start = time.perf_counter()
+        while not self._stop.wait(self.interval):
+            self.ticks += 1
+            names = {thread.ident: thread.name for thread in threading.enumerate()}
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own_id or names.get(thread_id, "").startswith(_IGNORED_THREADS) or _is_idle(frame):
+                    continue
+                stack = []
+                while frame is not None:
+                    stack.append(_function_key(frame))
+                    frame = frame.f_back
+                stack = tuple(stack)
+                self.stacks[stack] = self.stacks.get(stack, 0) + 1
+        self.duration = time.perf_counter() - start
+
+    @property
+    def samples(self) -> int:
+        return sum(self.stacks.values())
+
+    def stats(self) -> dict:
+        """Return the samples as pstats data: {function: (calls, calls, own time, cumulative time, callers)}."""
+        period = self.duration / self.ticks if self.ticks else self.interval
+        own: dict[tuple, int] = {}
+        cumulative: dict[tuple, int] = {}
+        # Per callee and caller: samples below the call, and samples in the callee itself
+        edges: dict[tuple, dict[tuple, list[int]]] = {}
+
+        for stack, samples in self.stacks.items():
+            own[stack[0]] = own.get(stack[0], 0) + samples
+            # Recursive functions count once per sample
+            for function in set(stack):
+                cumulative[function] = cumulative.get(function, 0) + samples
+            seen = set()
+            for depth, (callee, caller) in enumerate(zip(stack, stack[1:])):
+                if (callee, caller) in seen:
+                    continue
+                seen.add((callee, caller))
+                edge = edges.setdefault(callee, {}).setdefault(caller, [0, 0])
+                edge[0] += samples
+                edge[1] += samples if depth == 0 else 0
+
+        return {
+            function: (
+                count, count, own.get(function, 0) * period, count * period,
+                {
+                    caller: (below, below, in_callee * period, below * period)
+                    for caller, (below, in_callee) in edges.get(function, {}).items()
+                },
+            )
+            for function, count in cumulative.items()
+        }
+
+
+def top_functions(stats: dict, limit: int = TOP_ENTRIES) -> list[dict]:
+    """The functions with the most cumulative time in the pstats data."""
+    ranked = sorted(stats.items(), key=lambda item: item[1][3], reverse=True)[:limit]
+    return [
+        {"function": pstats.func_std_string(function), "own_seconds": own, "cumulative_seconds": cumulative}
+        for function, (_, _, own, cumulative, _) in ranked
+    ]
+
+
+def list_profiles(directory: str) -> list[dict]:
+    """Return the summaries of the saved profiles, newest first."""
+    if not os.path.isdir(directory):
+        return []
+    summaries = []
+    for name in os.listdir(directory):
+        if name.endswith(".json"):
+            with open(os.path.join(directory, name)) as file:
+                summaries.append(json.load(file))
+    return sorted(summaries, key=lambda summary: summary["started"], reverse=True)
+
+
+def profile_path(directory: str, request_id: str) -> str | None:
+    """Return the path of the pstats file of a profile, or None when there is no such profile."""
+    if not _REQUEST_ID.match(request_id):
+        return None
+    path = os.path.join(directory, f"{request_id}.prof")
+    return path if os.path.exists(path) else None
+
+
+def _header(scope: dict, name: bytes) -> str | None:
+    for key, value in scope["headers"]:
+        if key == name:
+            return value.decode("latin-1")
+    return None
+
+
+def _profiling_requested(scope: dict) -> bool:
+    flag = _header(scope, PROFILE_HEADER)
+    if flag is None and PROFILE_QUERY.encode() in scope["query_string"]:
+        flag = parse_qs(scope["query_string"].decode("latin-1")).get(PROFILE_QUERY, [None])[0]
+    return flag is not None and flag.lower() not in ("", "0", "false")
+
+
+class ProfilingMiddleware:
+    """ASGI middleware profiling the requests that ask for it, for admins only.
+
+    A profiled request is sampled with `SamplingProfiler` and traced with tracemalloc. The profile
+    is saved as `<request id>.prof` (pstats) and `<request id>.json` (summary: duration, status,
+    peak memory, top functions and allocation sites) in `directory`; the request id is taken from
+    the `X-Request-ID` header or generated, and returned in the `X-Profile-Id` header.
+
+    Other requests are passed on untouched. Profiled requests run one at a time, as the sampler and
+    tracemalloc see the whole process.
+
+    Args:
+        app: The ASGI application.
+        directory (str): Directory the profiles are saved in.
+        authorize (Callable[[str | None], bool]): Whether the `X-Admin-Token` header allows profiling.
+        interval (float): Seconds between samples.
+    """
+
+    def __init__(self, app, directory: str, authorize: Callable[[str | None], bool], interval: float = 0.001):
+        self.app = app
+        self.directory = directory
+        self.authorize = authorize
+        self.interval = interval
+        self._lock: asyncio.Lock | None = None
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not _profiling_requested(scope):
+            await self.app(scope, receive, send)
+            return
+
+        if not self.authorize(_header(scope, b"x-admin-token")):
+            await send({
+                "type": "http.response.start",
+                "status": 403,
+                "headers": [(b"content-type", b"application/json")],
+            })
+            await send({"type": "http.response.body", "body": b'{"detail":"Admin token required"}'})
+            return
+
+        request_id = _header(scope, b"x-request-id")
+        if request_id is None or not _REQUEST_ID.match(request_id):
+            request_id = uuid.uuid4().hex
+        status = []
+
+        async def send_with_profile_id(message):
+            if message["type"] == "http.response.start":
+                status.append(message["status"])
+                message = {**message, "headers": [*message.get("headers", []), (b"x-profile-id", request_id.encode())]}
+            await send(message)
+
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        async with self._lock:
+            started = time.time()
+            tracing = tracemalloc.is_tracing()
+            if not tracing:
+                tracemalloc.start()
+            tracemalloc.reset_peak()
+            profiler = SamplingProfiler(self.interval)
+            profiler.start()
+            token = _profiling.set(True)
+            try:
+                await self.app(scope, receive, send_with_profile_id)
+            finally:
+                _profiling.reset(token)
+                profiler.stop()
+                _, peak = tracemalloc.get_traced_memory()
+                # Without the samples of the profiler itself
+                snapshot = tracemalloc.take_snapshot().filter_traces([tracemalloc.Filter(False, __file__)])
+                allocations = snapshot.statistics("lineno")[:TOP_ENTRIES]
+                if not tracing:
+                    tracemalloc.stop()
+
+                summary = {
+                    "request_id": request_id,
+                    "method": scope["method"],
+                    "path": scope["path"],
+                    "query": scope["query_string"].decode("latin-1"),
+                    "status": status[0] if status else None,
+                    "started": started,
+                    "duration": time.time() - started,
+                    "samples": profiler.samples,
+                    "peak_memory_bytes": peak,
+                    "top_allocations": [
+                        {"location": str(stat.traceback[0]), "size_bytes": stat.size, "count": stat.count}
+                        for stat in allocations
+                    ],
+                }
+                await asyncio.to_thread(self._save, request_id, profiler.stats(), summary)
+
+    def _save(self, request_id: str, stats: dict, summary: dict):
+        os.makedirs(self.directory, exist_ok=True)
+        # The format of `pstats.Stats.dump_stats`
+        with open(os.path.join(self.directory, f"{request_id}.prof"), "wb") as file:
+            marshal.dump(stats, file)
+        summary["top_functions"] = top_functions(stats)
+        with open(os.path.join(self.directory, f"{request_id}.json"), "w") as file:
+            json.dump(summary, file, indent=2)
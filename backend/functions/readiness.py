@@ -0,0 +1,64 @@
+# import, startup and warmup timings of the application, reported by `/healthz`
+import time
+
+from contextlib import contextmanager
+from typing import Callable
+
+
+class Readiness:
+    """Tracks how long the application took to import, start and warm up.
+
+    Dependencies only a few endpoints need (the ArpY catalog fetcher, the MongoDB client) are
+    imported on first use, so a new instance starts serving quickly. The warmup imports them in the
+    background right after startup, so the first request using them doesn't pay for it either; the
+    application reports ready once the warmup finished.
+
+    Args:
+        import_seconds (float): Seconds importing the application took.
+    """
+
+    def __init__(self, import_seconds: float):
+        self.import_seconds = import_seconds
+        self.startup: dict[str, float] = {}
+        self.warmup: dict[str, float] = {}
+        self.warmup_errors: dict[str, str] = {}
+        self.ready = False
+        self.created = time.time()
+
+    @contextmanager
+    def measure_startup(self, stage: str):
+        """Record the duration of a startup stage."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.startup[stage] = time.perf_counter() - start
+
+    def run_warmup(self, steps: dict[str, Callable[[], object]]):
+        """Run the warmup steps in order and mark the application ready.
+
+        A failing step is reported but doesn't keep the application from being ready, the
+        dependency is loaded again when a request first needs it.
+
+        Args:
+          steps (dict[str, Callable[[], object]]): Warmup function per step name.
+        """
+        for name, step in steps.items():
+            start = time.perf_counter()
+            try:
+                step()
+            except Exception as e:
+                print(f"Warning: Warmup step {name} failed: {e}")
+                self.warmup_errors[name] = str(e)
+            self.warmup[name] = time.perf_counter() - start
+        self.ready = True
+
+    def to_dict(self) -> dict:
+        return {
+            "status": "ready" if self.ready else "warming up",
+            "uptime": time.time() - self.created,
+            "import_seconds": self.import_seconds,
+            "startup": dict(self.startup),
+            "warmup": dict(self.warmup),
+            "warmup_errors": dict(self.warmup_errors),
+        }
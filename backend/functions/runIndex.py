@@ -0,0 +1,134 @@
+# metadata index of the runs, so cleaning up doesn't need to scan the runs directory
+import os
+import sqlite3
+import threading
+import time
+
+from functions.runStorage import RUN_EXTENSIONS, SOURCES_EXTENSION
+
+
+class RunIndex:
+    """SQLite index of the runs: size, creation time, last access and client.
+
+    Accesses are recorded in memory by `touch` and written to the database by
+    `flush`, so the request path doesn't write to disk.
+
+    Args:
+        db_path (str): Path of the SQLite database.
+    """
+
+    def __init__(self, db_path: str):
+        self._connection = sqlite3.connect(db_path, check_same_thread=False)
+        self._lock = threading.Lock()
+        self._accessed: dict[str, float] = {}
+
+        with self._lock, self._connection:
+            self._connection.execute(
+                """
+                CREATE TABLE IF NOT EXISTS runs (
+                    task_id TEXT PRIMARY KEY,
+                    client TEXT,
+                    size_bytes INTEGER NOT NULL,
+                    created REAL NOT NULL,
+                    last_accessed REAL NOT NULL
+                )
+                """
+            )
+            self._connection.execute("CREATE INDEX IF NOT EXISTS runs_last_accessed ON runs (last_accessed)")
+
+    def register(self, task_id: str, client: str | None, size_bytes: int, created: float | None = None):
+        """Add (or replace) a run in the index."""
+        created = time.time() if created is None else created
+        with self._lock, self._connection:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO runs (task_id, client, size_bytes, created, last_accessed) VALUES (?, ?, ?, ?, ?)",
+                (task_id, client, size_bytes, created, created),
+            )
+
+    def touch(self, task_id: str):
+        """Record that the run was used just now."""
+        with self._lock:
+            self._accessed[task_id] = time.time()
+
+    def flush(self):
+        """Write the recorded accesses to the database."""
+        # Swapped under the lock, so a concurrent touch doesn't write into the dict being written out
+        with self._lock:
+            accessed, self._accessed = self._accessed, {}
+        if not accessed:
+            return
+        with self._lock, self._connection:
+            self._connection.executemany(
+                "UPDATE runs SET last_accessed = MAX(last_accessed, ?) WHERE task_id = ?",
+                [(timestamp, task_id) for task_id, timestamp in accessed.items()],
+            )
+
+    def remove(self, task_id: str):
+        """Remove a run from the index."""
+        with self._lock, self._connection:
+            self._accessed.pop(task_id, None)
+            self._connection.execute("DELETE FROM runs WHERE task_id = ?", (task_id,))
+
+    def idle_since(self, timestamp: float) -> list[str]:
+        """Return the runs that haven't been used since the timestamp."""
+        with self._lock:
+            rows = self._connection.execute("SELECT task_id FROM runs WHERE last_accessed < ?", (timestamp,))
+            return [task_id for (task_id,) in rows]
+
+    def over_quota(self, quota_bytes: int) -> list[str]:
+        """Return the least recently used runs that have to go to fit the total size in the quota."""
+        with self._lock:
+            total = self._connection.execute("SELECT COALESCE(SUM(size_bytes), 0) FROM runs").fetchone()[0]
+            if total <= quota_bytes:
+                return []
+
+            evict = []
+            rows = self._connection.execute("SELECT task_id, size_bytes FROM runs ORDER BY last_accessed")
+            for task_id, size_bytes in rows:
+                if total <= quota_bytes:
+                    break
+                evict.append(task_id)
+                total -= size_bytes
+            return evict
+
+    def count(self) -> int:
+        """Return the number of runs in the index."""
+        with self._lock:
+            return self._connection.execute("SELECT COUNT(*) FROM runs").fetchone()[0]
+
+    def runs(self) -> list[dict]:
+        """Return all runs in the index, most recently used first."""
+        with self._lock:
+            cursor = self._connection.execute(
+                "SELECT task_id, client, size_bytes, created, last_accessed FROM runs ORDER BY last_accessed DESC"
+            )
+            columns = [description[0] for description in cursor.description]
+            return [dict(zip(columns, row)) for row in cursor]
+
+    def sync(self, runs_directory: str):
+        """Make the index match the runs on disk; only needed at startup.
+
+        Runs that aren't indexed yet (e.g. created before the index existed) are
+        added with their file times, index entries without a run are removed.
+        """
+        on_disk = {}
+        for file in os.listdir(runs_directory):
+            if file.endswith(SOURCES_EXTENSION):
+                continue
+            task_id, extension = os.path.splitext(file)
+            if extension in RUN_EXTENSIONS:
+                on_disk[task_id] = os.stat(os.path.join(runs_directory, file))
+
+        with self._lock:
+            indexed = {task_id for (task_id,) in self._connection.execute("SELECT task_id FROM runs")}
+
+        for task_id in indexed - on_disk.keys():
+            self.remove(task_id)
+        for task_id in on_disk.keys() - indexed:
+            stat = on_disk[task_id]
+            self.register(task_id, None, stat.st_size, created=stat.st_ctime)
+
+    def close(self):
+        self.flush()
+        with self._lock:
+            self._connection.close()
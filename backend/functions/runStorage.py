@@ -0,0 +1,105 @@
+# functions for storing and reading the uploaded runs (the statement scores per task)
+import os
+import sys
+
+import polars as pl
+
+# Runs are stored as uncompressed Arrow IPC files. These keep the UInt8 dtype and
+# can be memory-mapped, so reading a run doesn't parse or copy the data.
+RUN_EXTENSION = ".arrow"
+# Runs created before the switch to Arrow are semicolon-separated CSV files
+LEGACY_RUN_EXTENSION = ".csv"
+RUN_EXTENSIONS = (RUN_EXTENSION, LEGACY_RUN_EXTENSION)
+# Optional source file of every respondent, for runs combined from several uploads
+SOURCES_EXTENSION = ".sources.arrow"
+
+
+def run_path(runs_directory: str, task_id: str) -> str:
+    """Return the path of the run file for the given task.
+
+    Args:
+      runs_directory (str): Directory containing the runs.
+      task_id (str): Unique identifier for the task.
+
+    Returns:
+        (str): Path of the Arrow run, or of the legacy CSV run when only that one exists.
+    """
+    path = os.path.join(runs_directory, f"{task_id}{RUN_EXTENSION}")
+    legacy_path = os.path.join(runs_directory, f"{task_id}{LEGACY_RUN_EXTENSION}")
+    if not os.path.exists(path) and os.path.exists(legacy_path):
+        return legacy_path
+    return path
+
+
+def write_run(df: pl.DataFrame, path: str):
+    """Write the statement scores of a task to the run store.
+
+    The file is written next to its destination first and then moved into place,
+    so readers (and memory maps) never see a half written run.
+
+    Args:
+      df (pl.DataFrame): Statement scores, one column per statement.
+      path (str): Destination path, ending with `RUN_EXTENSION`.
+    """
+    tmp_path = f"{path}.tmp"
+    df.write_ipc(tmp_path, compression="uncompressed")
+    os.replace(tmp_path, path)
+
+
+def sources_path(path: str) -> str:
+    """Return the path of the respondents' source files belonging to a run file."""
+    return os.path.splitext(path)[0] + SOURCES_EXTENSION
+
+
+def read_run(path: str) -> pl.DataFrame:
+    """Read a run from the run store.
+
+    Args:
+      path (str): Path of an Arrow or legacy CSV run.
+
+    Returns:
+        (pl.DataFrame): The statement scores as UInt8 columns.
+    """
+    if path.endswith(LEGACY_RUN_EXTENSION):
+        return pl.read_csv(path, separator=";").cast(pl.UInt8)
+    return pl.read_ipc(path, memory_map=True)
+
+
+def convert_csv_run(path: str) -> str:
+    """Convert a legacy CSV run to the Arrow format and remove the CSV file.
+
+    Args:
+      path (str): Path of the legacy CSV run.
+
+    Returns:
+        (str): Path of the new Arrow run.
+    """
+    new_path = path.removesuffix(LEGACY_RUN_EXTENSION) + RUN_EXTENSION
+    write_run(read_run(path), new_path)
+    os.remove(path)
+    return new_path
+
+
+def convert_csv_runs(runs_directory: str) -> list[str]:
+    """Convert every legacy CSV run in the directory to the Arrow format.
+
+    Args:
+      runs_directory (str): Directory containing the runs.
+
+    Returns:
+        (list[str]): Paths of the converted runs.
+    """
+    converted = []
+    for file in os.listdir(runs_directory):
+        if file.endswith(LEGACY_RUN_EXTENSION):
+            converted.append(convert_csv_run(os.path.join(runs_directory, file)))
+    return converted
+
+
+if __name__ == "__main__":
+    # Usage: python -m functions.runStorage [runs_directory]
+    directory = sys.argv[1] if len(sys.argv) > 1 else os.path.join(
+        os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), "runs"
+    )
+    for converted_path in convert_csv_runs(directory):
+        print(f"Converted {converted_path}")
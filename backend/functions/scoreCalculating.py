@@ -1,27 +1,29 @@
 # function(s) for calculating the factor's scores
 import numpy as np
-import pandas as pd
-import polars as pl
 
-def cronbach_alpha(df: pd.DataFrame) -> float:
-    """Calculate Cronbach's alpha for the passed dataframe containing the statement scores.
+from functions.taskMatrix import TaskMatrix, rows_per_chunk
+
+def cronbach_alpha(data) -> float:
+    """Calculate Cronbach's alpha for the passed statement scores.
 
     Args:
-      df (pd.DataFrame): Items with each column as a variable and each row as an observation.
+      data (np.ndarray): Items with each column as a variable and each row as an observation, missing
+        values as NaN. Anything `np.asarray` converts works too, e.g. a pandas or polars DataFrame.
 
     Returns:
         (float): Cronbach's alpha.
         
     Raises:
-        ValueError: If dataframe has less than 2 columns or insufficient data
+        ValueError: If the data has less than 2 columns or insufficient data
     """
-    items_count = df.shape[1]
+    data = np.asarray(data, dtype=np.float64)
+    items_count = data.shape[1]
     
     # Check if we have at least 2 items (statements)
     if items_count < 2:
         raise ValueError("Cronbach's alpha requires at least 2 items (statements)")
     
-    data = df.dropna()
+    data = data[~np.isnan(data).any(axis=1)]
     
     # Check if we have sufficient data after dropping NaN values
     if data.shape[0] < 2:
@@ -37,3 +39,205 @@ def cronbach_alpha(df: pd.DataFrame) -> float:
     
     return np.round(items_count / float(items_count - 1) * (1 - variance_sum / total_var), 3)
 
+
+
+def cronbach_alpha_from_covariance(covariance: np.ndarray, count: int) -> float:
+    """Calculate Cronbach's alpha from the covariance matrix of the group's statements.
+
+    The item variances are the diagonal of the matrix and the variance of the row sums
+    is the sum of all its entries, so this gives the same result as `cronbach_alpha`
+    without touching the respondent rows.
+
+    Args:
+      covariance (np.ndarray): Covariance matrix (ddof=1) of the statements in the group.
+      count (int): Number of respondents the covariances were computed from.
+
+    Returns:
+        (float): Cronbach's alpha.
+
+    Raises:
+        ValueError: If the group has less than 2 statements or insufficient data
+    """
+    return cronbach_alpha_from_sums(
+        covariance.shape[0], float(np.trace(covariance)), float(covariance.sum()), count
+    )
+
+
+def cronbach_alpha_from_sums(items_count: int, variance_sum: float, total_var: float, count: int) -> float:
+    """Calculate Cronbach's alpha from the (running) sums of a group's covariance matrix.
+
+    Args:
+      items_count (int): Number of statements in the group.
+      variance_sum (float): Sum of the item variances (trace of the covariance matrix).
+      total_var (float): Variance of the row sums (sum of the covariance matrix).
+      count (int): Number of respondents the covariances were computed from.
+
+    Returns:
+        (float): Cronbach's alpha.
+
+    Raises:
+        ValueError: If the group has less than 2 statements or insufficient data
+    """
+    if items_count < 2:
+        raise ValueError("Cronbach's alpha requires at least 2 items (statements)")
+
+    if count < 2:
+        raise ValueError("Insufficient data after removing NaN values")
+
+    # Avoid division by zero
+    if total_var == 0:
+        return 0.0  # No reliability if no variance
+
+    return np.round(items_count / float(items_count - 1) * (1 - variance_sum / total_var), 3)
+
+
+def cronbach_alpha_batch(
+    matrix: TaskMatrix,
+    groups: list[list[int]],
+    chunk_rows: int | None = None,
+) -> tuple[list[float | None], list[int]]:
+    """Calculate Cronbach's alpha for many groups in one pass over the task's answer matrix.
+
+    Every group uses listwise deletion of its own statements, like `cronbach_alpha`.
+    Instead of selecting and copying the columns per group, the sums needed for all
+    groups are accumulated at once with matrix products against a statement × group
+    membership matrix, in chunks of rows to bound the memory usage.
+
+    Args:
+      matrix (TaskMatrix): The answers of the task.
+      groups (list[list[int]]): Column indices of the statements in every group.
+      chunk_rows (int | None): Number of rows processed at once, by default as many as fit in
+        `CHUNK_BYTES` for the statements and groups used.
+
+    Returns:
+        (tuple[list[float | None], list[int]]): Cronbach's alpha per group, None for groups with
+        less than 2 statements or insufficient data, and the effective N (complete rows) per group.
+    """
+    rows = matrix.count
+    results: list[float | None] = [None] * len(groups)
+    effective_counts = [0] * len(groups)
+
+    scored = [g for g, indices in enumerate(groups) if len(indices) >= 2]
+    if not scored or rows == 0:
+        return results, effective_counts
+
+    # Only the statements used by the groups are read
+    used = sorted({i for g in scored for i in groups[g]})
+    position = {column: i for i, column in enumerate(used)}
+    columns = len(used)
+
+    if chunk_rows is None:
+        # Per row a float64 value for every statement and for every group (the totals and weights)
+        chunk_rows = rows_per_chunk(columns + len(scored))
+
+    membership = np.zeros((columns, len(scored)))
+    for j, g in enumerate(scored):
+        membership[[position[i] for i in groups[g]], j] = 1.0
+
+    has_missing = matrix.missing_bits is not None
+
+    # Variances are shift invariant, centering on the column means keeps the sums small
+    sums = np.zeros(columns)
+    counts = np.zeros(columns)
+    for start in range(0, rows, chunk_rows):
+        chunk = matrix.values[start:start + chunk_rows, used]
+        sums += chunk.sum(axis=0, dtype=np.float64)
+        counts += chunk.shape[0]
+        if has_missing:
+            counts -= matrix.missing_rows(start, start + chunk_rows)[:, used].sum(axis=0)
+    means = sums / np.maximum(counts, 1)
+
+    complete_counts = np.zeros(len(scored))
+    # Without missing values every row counts for every group, so the item sums are shared
+    item_sums = np.zeros((columns, len(scored) if has_missing else 1))
+    item_squares = np.zeros_like(item_sums)
+    total_sums = np.zeros(len(scored))
+    total_squares = np.zeros(len(scored))
+
+    for start in range(0, rows, chunk_rows):
+        chunk = matrix.values[start:start + chunk_rows, used].astype(np.float64) - means
+
+        if has_missing:
+            chunk_missing = matrix.missing_rows(start, start + chunk_rows)[:, used]
+            chunk[chunk_missing] = 0.0
+            totals = chunk @ membership
+            # A row counts for a group when none of the group's statements is missing
+            weights = (chunk_missing.astype(np.float64) @ membership == 0).astype(np.float64)
+
+            complete_counts += weights.sum(axis=0)
+            item_sums += chunk.T @ weights
+            item_squares += (chunk * chunk).T @ weights
+            total_sums += (weights * totals).sum(axis=0)
+            total_squares += (weights * totals * totals).sum(axis=0)
+        else:
+            totals = chunk @ membership
+            complete_counts += chunk.shape[0]
+            item_sums[:, 0] += chunk.sum(axis=0)
+            item_squares[:, 0] += (chunk * chunk).sum(axis=0)
+            total_sums += totals.sum(axis=0)
+            total_squares += (totals * totals).sum(axis=0)
+
+    item_sums = np.broadcast_to(item_sums, (columns, len(scored)))
+    item_squares = np.broadcast_to(item_squares, (columns, len(scored)))
+
+    for j, g in enumerate(scored):
+        count = complete_counts[j]
+        effective_counts[g] = int(count)
+        if count < 2:
+            continue
+
+        item_variances = (item_squares[:, j] - item_sums[:, j] ** 2 / count) / (count - 1)
+        variance_sum = float(item_variances @ membership[:, j])
+        total_var = float((total_squares[j] - total_sums[j] ** 2 / count) / (count - 1))
+
+        items_count = len(groups[g])
+        # Avoid division by zero
+        if total_var == 0:
+            results[g] = 0.0
+        else:
+            results[g] = float(np.round(items_count / float(items_count - 1) * (1 - variance_sum / total_var), 3))
+
+    return results, effective_counts
+
+
+def item_deletion_statistics(covariance: np.ndarray, count: int) -> tuple[list[float | None], list[float | None]]:
+    """Calculate alpha-if-item-deleted and the corrected item-total correlation for every item of a group.
+
+    Both follow from the group's covariance matrix: removing item i lowers the trace by
+    C[i, i] and the total variance by 2 * sum(C[i, :]) - C[i, i], and the covariance of
+    item i with the total of the other items is sum(C[i, :]) - C[i, i].
+    All items are handled at once with vector operations.
+
+    Args:
+      covariance (np.ndarray): Covariance matrix (ddof=1) of the statements in the group.
+      count (int): Number of respondents the covariances were computed from.
+
+    Returns:
+        (tuple[list[float | None], list[float | None]]): Alpha if the item is deleted and the
+        corrected item-total correlation, per item. None where it can't be calculated.
+    """
+    items_count = covariance.shape[0]
+    if items_count < 2 or count < 2:
+        return [None] * items_count, [None] * items_count
+
+    variances = np.diag(covariance)
+    row_sums = covariance.sum(axis=1)
+    remaining_count = items_count - 1
+
+    remaining_variance_sum = np.trace(covariance) - variances
+    remaining_total_var = covariance.sum() - 2 * row_sums + variances
+    rest_covariance = row_sums - variances
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        if remaining_count >= 2:
+            alphas = remaining_count / (remaining_count - 1) * (1 - remaining_variance_sum / remaining_total_var)
+            # No reliability if no variance, like `cronbach_alpha`
+            alphas = np.where(remaining_total_var == 0, 0.0, alphas)
+        else:
+            alphas = np.full(items_count, np.nan)
+        correlations = rest_covariance / np.sqrt(variances * remaining_total_var)
+
+    def to_list(array: np.ndarray) -> list[float | None]:
+        return [float(np.round(value, 3)) if np.isfinite(value) else None for value in array]
+
+    return to_list(alphas), to_list(correlations)
@@ -0,0 +1,131 @@
+# memo of group scores, shared by concurrent requests for the same groups
+import threading
+
+from collections import OrderedDict
+from concurrent.futures import Future
+from typing import Callable, Hashable
+
+# (alpha, effective N) of a group
+Score = tuple[float | None, int]
+
+
+class ScoreMemo:
+    """LRU memo of group scores with single-flight computation.
+
+    The score of a group doesn't depend on the order of its statements nor on the
+    other groups, so entries are keyed by (task_id, missing value handling, sorted statements).
+    A statement listed twice counts twice in the score, so the key keeps duplicates.
+    Groups that are being computed by another request are waited for instead of
+    computed again, e.g. when a drop fires the same request for the source and target group.
+
+    Args:
+        max_entries (int): Maximum number of group scores kept.
+    """
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._entries: OrderedDict[Hashable, Score] = OrderedDict()
+        self._inflight: dict[Hashable, Future] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.evictions = 0
+
+    @staticmethod
+    def key(task_id: str, missing: str, statements: list[str]) -> tuple:
+        return task_id, missing, tuple(sorted(statements))
+
+    def get_many(
+        self,
+        task_id: str,
+        missing: str,
+        groups: list[list[str]],
+        compute: Callable[[list[list[str]]], list[Score]],
+    ) -> list[Score]:
+        """Return the score of every group, computing only the groups nobody has (or is) computing.
+
+        Args:
+          task_id (str): Unique identifier for the task.
+          missing (str): How missing values are handled, part of the key.
+          groups (list[list[str]]): Every list is a group of statements.
+          compute (Callable): Scores a list of groups in one go, e.g. `score_groups`.
+
+        Returns:
+            (list[Score]): (alpha, effective N) per group.
+
+        Raises:
+            Exception: Whatever `compute` raised, also in the requests that waited for it
+        """
+        keys = [self.key(task_id, missing, statements) for statements in groups]
+        scores: dict[Hashable, Score] = {}
+        claimed: dict[Hashable, Future] = {}
+        waiting: dict[Hashable, Future] = {}
+
+        with self._lock:
+            for key in keys:
+                if key in scores or key in claimed or key in waiting:
+                    continue
+                if key in self._entries:
+                    self._entries.move_to_end(key)
+                    scores[key] = self._entries[key]
+                    self.hits += 1
+                elif key in self._inflight:
+                    waiting[key] = self._inflight[key]
+                    self.coalesced += 1
+                else:
+                    claimed[key] = self._inflight[key] = Future()
+                    self.misses += 1
+
+        if claimed:
+            # Compute our own groups before waiting for others, so requests never wait on each other
+            claimed_groups = [groups[keys.index(key)] for key in claimed]
+            try:
+                computed = compute(claimed_groups)
+            except Exception as e:
+                with self._lock:
+                    for key, future in claimed.items():
+                        del self._inflight[key]
+                        future.set_exception(e)
+                raise
+
+            with self._lock:
+                for (key, future), score in zip(claimed.items(), computed):
+                    del self._inflight[key]
+                    self._entries[key] = score
+                    future.set_result(score)
+                    scores[key] = score
+                self._evict()
+
+        for key, future in waiting.items():
+            scores[key] = future.result()
+
+        return [scores[key] for key in keys]
+
+    def invalidate(self, task_id: str | None = None):
+        """Drop the scores of one task, or everything when no task_id is given."""
+        with self._lock:
+            if task_id is None:
+                self._entries.clear()
+            else:
+                for key in [key for key in self._entries if key[0] == task_id]:
+                    del self._entries[key]
+
+    def stats(self) -> dict:
+        """Return the hit/miss counters of the memo."""
+        with self._lock:
+            lookups = self.hits + self.misses + self.coalesced
+            return {
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_ratio": (self.hits + self.coalesced) / lookups if lookups else 0.0,
+                "coalesced": self.coalesced,
+                "max_entries": self.max_entries,
+            }
+
+    def _evict(self):
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
@@ -0,0 +1,229 @@
+# server-side grouping state, so a single move only rescores the two affected groups
+import threading
+import uuid
+
+from collections import OrderedDict
+from typing import Callable
+
+import numpy as np
+
+from functions.scoreCalculating import cronbach_alpha_from_sums
+from functions.taskStatistics import TaskStatistics
+
+
+class VersionConflictError(Exception):
+    """Raised when a move is based on an outdated version of the session."""
+
+
+class ScoringSession:
+    """Grouping of a task's statements with the running covariance sums per group.
+
+    For every group the sum of the item variances (trace) and the sum of all
+    covariances (variance of the row sums) are kept. Moving, adding or removing a
+    statement only changes these sums for the groups involved, which takes O(k).
+
+    Args:
+        session_id (str): Unique identifier for the session.
+        task_id (str): Unique identifier for the task.
+        statistics (TaskStatistics): Covariance statistics of the task.
+        groups (list[list[str]]): Every list is a group of statements.
+        score_rows (Callable[[list[str]], float]): Scores a group from the respondent rows,
+            used for groups containing statements with missing values.
+    """
+
+    def __init__(
+        self,
+        session_id: str,
+        task_id: str,
+        statistics: TaskStatistics,
+        groups: list[list[str]],
+        score_rows: Callable[[list[str]], float],
+    ):
+        self.session_id = session_id
+        self.task_id = task_id
+        self.version = 0
+        self.groups = [list(statements) for statements in groups]
+        self._statistics = statistics
+        self._score_rows = score_rows
+        self._variance_sums = [0.0] * len(self.groups)
+        self._totals = [0.0] * len(self.groups)
+        # Version of the last change of every group, to recognize outdated scores
+        self.changed_at = [0] * len(self.groups)
+        self.lock = threading.Lock()
+
+        for group_index in range(len(self.groups)):
+            self._recompute_sums(group_index)
+
+    def _recompute_sums(self, group_index: int):
+        covariance = self._statistics.covariance_of(self.groups[group_index])
+        self._variance_sums[group_index] = float(np.trace(covariance))
+        self._totals[group_index] = float(covariance.sum())
+
+    def score(self, group_index: int) -> float | None:
+        """Return Cronbach's alpha for one group, or None when it can't be calculated."""
+        statements = self.groups[group_index]
+        if len(statements) < 2:
+            return None
+
+        try:
+            if not self._statistics.is_complete(statements):
+                return self._score_rows(statements)
+            if not np.isfinite(self._totals[group_index]):
+                # The NaN's of a statement with missing values stay in the running sums after it left
+                self._recompute_sums(group_index)
+            return cronbach_alpha_from_sums(
+                len(statements),
+                self._variance_sums[group_index],
+                self._totals[group_index],
+                self._statistics.count,
+            )
+        except ValueError as e:
+            print(f"Warning: Could not calculate Cronbach's alpha for group {group_index}: {e}")
+            return None
+
+    def scores(self) -> dict[int, float | None]:
+        """Return Cronbach's alpha for every group."""
+        return {i: self.score(i) for i in range(len(self.groups))}
+
+    def needs_rows(self, group_index: int) -> bool:
+        """Whether the group has to be scored from the respondent rows (listwise deletion), which is slow."""
+        statements = self.groups[group_index]
+        return len(statements) >= 2 and not self._statistics.is_complete(statements)
+
+    def _check(self, version: int | None, *group_indices: int):
+        if version is not None and version != self.version:
+            raise VersionConflictError(f"Session is at version {self.version}, change was based on {version}")
+        for group_index in group_indices:
+            if not 0 <= group_index < len(self.groups):
+                raise IndexError(f"Group {group_index} does not exist")
+
+    def _take(self, statement: str, group_index: int):
+        # Remove a statement from a group and subtract its covariances from the running sums
+        covariance = self._statistics.covariance
+        taken = self._statistics.index[statement]
+        variance = float(covariance[taken, taken])
+
+        self.groups[group_index].remove(statement)
+        remaining = self._statistics.indices(self.groups[group_index])
+        self._variance_sums[group_index] -= variance
+        self._totals[group_index] -= 2 * float(covariance[remaining, taken].sum()) + variance
+
+    def _put(self, statement: str, group_index: int):
+        # Add a statement to a group and add its covariances to the running sums
+        covariance = self._statistics.covariance
+        added = self._statistics.index[statement]
+        variance = float(covariance[added, added])
+
+        existing = self._statistics.indices(self.groups[group_index])
+        self.groups[group_index].append(statement)
+        self._variance_sums[group_index] += variance
+        self._totals[group_index] += 2 * float(covariance[existing, added].sum()) + variance
+
+    def _commit(self, *group_indices: int) -> list[int]:
+        self.version += 1
+        for group_index in group_indices:
+            self.changed_at[group_index] = self.version
+        return sorted(set(group_indices))
+
+    def move(self, statement: str, source_group: int, target_group: int, version: int | None = None) -> list[int]:
+        """Move a statement to another group.
+
+        Args:
+          statement (str): The statement being moved.
+          source_group (int): Index of the group the statement is in.
+          target_group (int): Index of the group the statement moves to.
+          version (int | None): Version of the session the client based the move on, None to skip the check.
+
+        Returns:
+            (list[int]): Indices of the groups that changed, to be rescored.
+
+        Raises:
+            VersionConflictError: If the version is outdated
+            ValueError: If the statement isn't in the source group
+            IndexError: If a group index is out of range
+        """
+        self._check(version, source_group, target_group)
+        if statement not in self.groups[source_group]:
+            raise ValueError(f"Statement '{statement}' is not in group {source_group}")
+
+        if source_group != target_group:
+            self._take(statement, source_group)
+            self._put(statement, target_group)
+        return self._commit(source_group, target_group)
+
+    def add(self, statement: str, group_index: int, version: int | None = None) -> list[int]:
+        """Add a statement that isn't in any group yet to a group.
+
+        Raises:
+            VersionConflictError: If the version is outdated
+            ValueError: If the statement doesn't exist or is in a group already
+            IndexError: If the group index is out of range
+        """
+        self._check(version, group_index)
+        if statement not in self._statistics.index:
+            raise ValueError(f"Statement '{statement}' is not part of task {self.task_id}")
+        if any(statement in statements for statements in self.groups):
+            raise ValueError(f"Statement '{statement}' is in a group already")
+
+        self._put(statement, group_index)
+        return self._commit(group_index)
+
+    def remove(self, statement: str, group_index: int, version: int | None = None) -> list[int]:
+        """Remove a statement from its group, it's no longer part of any group.
+
+        Raises:
+            VersionConflictError: If the version is outdated
+            ValueError: If the statement isn't in the group
+            IndexError: If the group index is out of range
+        """
+        self._check(version, group_index)
+        if statement not in self.groups[group_index]:
+            raise ValueError(f"Statement '{statement}' is not in group {group_index}")
+
+        self._take(statement, group_index)
+        return self._commit(group_index)
+
+
+class ScoringSessionStore:
+    """Bounded store of the active scoring sessions; the least recently used ones are dropped.
+
+    Args:
+        max_sessions (int): Maximum number of sessions kept in memory.
+    """
+
+    def __init__(self, max_sessions: int):
+        self.max_sessions = max_sessions
+        self._sessions: OrderedDict[str, ScoringSession] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+    def create(
+        self,
+        task_id: str,
+        statistics: TaskStatistics,
+        groups: list[list[str]],
+        score_rows: Callable[[list[str]], float],
+    ) -> ScoringSession:
+        """Start a new session for the grouping."""
+        session = ScoringSession(str(uuid.uuid4()), task_id, statistics, groups, score_rows)
+        with self._lock:
+            self._sessions[session.session_id] = session
+            while len(self._sessions) > self.max_sessions:
+                self._sessions.popitem(last=False)
+        return session
+
+    def get(self, session_id: str) -> ScoringSession | None:
+        """Return the session, or None when it doesn't exist (anymore)."""
+        with self._lock:
+            session = self._sessions.get(session_id)
+            if session is not None:
+                self._sessions.move_to_end(session_id)
+            return session
+
+    def drop_task(self, task_id: str):
+        """Drop all sessions of a task."""
+        with self._lock:
+            for session_id in [s.session_id for s in self._sessions.values() if s.task_id == task_id]:
+                del self._sessions[session_id]
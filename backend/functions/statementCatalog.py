@@ -0,0 +1,38 @@
+# functions for matching the uploaded statements with the client's statement catalog
+import polars as pl
+
+
+def map_statements_to_catalog(statements: list[str], catalog: pl.DataFrame) -> pl.DataFrame:
+    """Look up the alias and factor group of every statement in the client's catalog with a single join.
+
+    Statements that aren't in the catalog, or have no factor, get factor group -1 and an
+    empty alias. When the catalog contains a statement more than once, the first row is used.
+
+    Args:
+      statements (list[str]): The (original) statements of the task, in column order.
+      catalog (pl.DataFrame): Catalog with the columns "Originele statement", "Aliassen" and "Factor".
+
+    Returns:
+        (pl.DataFrame): One row per statement, in the same order, with the columns
+        original_statement, aliasses and factor_groups.
+    """
+    lookup = (
+        catalog.lazy()
+        .select(
+            pl.col("Originele statement").cast(pl.String).alias("original_statement"),
+            pl.col("Aliassen").cast(pl.String).alias("aliasses"),
+            # Factors look like "F3", the group is the number after the first character
+            pl.col("Factor").cast(pl.String).str.slice(1).cast(pl.Int64, strict=False).alias("factor_groups"),
+        )
+        .unique(subset="original_statement", keep="first", maintain_order=True)
+    )
+
+    return (
+        pl.LazyFrame({"original_statement": statements}, schema={"original_statement": pl.String})
+        .join(lookup, on="original_statement", how="left", maintain_order="left")
+        .with_columns(
+            pl.col("aliasses").fill_null(""),
+            pl.col("factor_groups").fill_null(-1),
+        )
+        .collect()
+    )
@@ -0,0 +1,112 @@
+# process-wide cache for the per-task data used by the scoring endpoints
+import os
+import threading
+
+from collections import OrderedDict
+from typing import Any, Callable
+
+
+class TaskCache:
+    """LRU cache of per-task objects (e.g. the parsed run file) keyed by task_id.
+
+    Every entry remembers the modification time and size of the file it was
+    loaded from. When the file changes on disk the entry is dropped and loaded
+    again, so the cache never serves stale data after a run is rewritten.
+
+    Args:
+        resolve_path (Callable[[str], str]): Returns the file path for a task_id.
+        load (Callable[[str], Any]): Loads the object from the file path.
+        max_bytes (int): Memory budget for all entries together.
+        sizeof (Callable[[Any], int]): Returns the (estimated) size of an entry in bytes.
+    """
+
+    def __init__(
+        self,
+        resolve_path: Callable[[str], str],
+        load: Callable[[str], Any],
+        max_bytes: int,
+        sizeof: Callable[[Any], int],
+    ):
+        self._resolve_path = resolve_path
+        self._load = load
+        self._sizeof = sizeof
+        self.max_bytes = max_bytes
+
+        self._entries: OrderedDict[str, tuple[tuple[int, int], Any, int]] = OrderedDict()
+        self._lock = threading.Lock()
+        self.current_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, task_id: str) -> Any:
+        """Return the object for the task, loading it from disk when it is not cached.
+
+        Args:
+            task_id (str): Unique identifier for the task
+
+        Returns:
+            (Any): The cached object.
+
+        Raises:
+            FileNotFoundError: If the task has no run file
+        """
+        path = self._resolve_path(task_id)
+        stat = os.stat(path)
+        signature = (stat.st_mtime_ns, stat.st_size)
+
+        with self._lock:
+            entry = self._entries.get(task_id)
+            if entry is not None and entry[0] == signature:
+                self._entries.move_to_end(task_id)
+                self.hits += 1
+                return entry[1]
+            self.misses += 1
+
+        # Load outside the lock so a slow read doesn't block the other tasks
+        value = self._load(path)
+        size = self._sizeof(value)
+
+        with self._lock:
+            self._remove(task_id)
+            # Objects larger than the whole budget are served but never kept
+            if size <= self.max_bytes:
+                self._entries[task_id] = (signature, value, size)
+                self.current_bytes += size
+                self._evict()
+        return value
+
+    def invalidate(self, task_id: str | None = None):
+        """Drop one task from the cache, or everything when no task_id is given."""
+        with self._lock:
+            if task_id is None:
+                self._entries.clear()
+                self.current_bytes = 0
+            else:
+                self._remove(task_id)
+
+    def stats(self) -> dict:
+        """Return the hit/miss counters and memory usage of the cache."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_ratio": self.hits / lookups if lookups else 0.0,
+                "current_bytes": self.current_bytes,
+                "max_bytes": self.max_bytes,
+            }
+
+    def _remove(self, task_id: str):
+        entry = self._entries.pop(task_id, None)
+        if entry is not None:
+            self.current_bytes -= entry[2]
+
+    def _evict(self):
+        # Least recently used entries are at the front of the OrderedDict
+        while self.current_bytes > self.max_bytes and self._entries:
+            _, (_, _, size) = self._entries.popitem(last=False)
+            self.current_bytes -= size
+            self.evictions += 1
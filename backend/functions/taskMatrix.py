@@ -0,0 +1,96 @@
+# compact in-memory representation of a task's response data
+import numpy as np
+import polars as pl
+
+# Bytes of float64 values per chunk of rows, so the working set of scoring doesn't grow with the task
+CHUNK_BYTES = 16 * 2**20
+
+
+def rows_per_chunk(columns: int) -> int:
+    """Number of rows in a chunk of `columns` float64 values per row that fits in `CHUNK_BYTES`."""
+    return max(1, CHUNK_BYTES // (max(columns, 1) * 8))
+
+
+class TaskMatrix:
+    """Respondents × statements Likert answers of a task, one byte per answer.
+
+    Attributes:
+        values (np.ndarray): C-contiguous uint8 respondents × statements array, 0 where missing.
+        missing_bits (np.ndarray | None): Missing values as a bitmap packed per row
+            (`np.packbits(mask, axis=1)`), None when nothing is missing.
+        statements (tuple[str, ...]): Statement names, in column order.
+        index (dict[str, int]): Statement name → column index.
+    """
+
+    __slots__ = ("values", "missing_bits", "statements", "index")
+
+    def __init__(self, values: np.ndarray, missing_bits: np.ndarray | None, statements: tuple[str, ...]):
+        self.values = values
+        self.missing_bits = missing_bits
+        self.statements = statements
+        self.index = {statement: i for i, statement in enumerate(statements)}
+
+    @classmethod
+    def from_frame(cls, df: pl.DataFrame) -> "TaskMatrix":
+        """Build the matrix from the statement scores of a task (UInt8 columns)."""
+        values = np.zeros((df.height, df.width), dtype=np.uint8)
+        missing = np.zeros((df.height, df.width), dtype=bool)
+
+        for i, column in enumerate(df.iter_columns()):
+            values[:, i] = column.fill_null(0).cast(pl.UInt8).to_numpy()
+            if column.null_count():
+                missing[:, i] = column.is_null().to_numpy()
+
+        return cls(values, cls._pack(missing), tuple(df.columns))
+
+    @classmethod
+    def from_array(cls, values: np.ndarray, statements: list[str] | None = None) -> "TaskMatrix":
+        """Build the matrix from a respondents × statements array, with NaN's for missing values."""
+        missing = np.isnan(values) if np.issubdtype(values.dtype, np.floating) else np.zeros(values.shape, dtype=bool)
+        matrix_values = np.ascontiguousarray(np.where(missing, 0, values), dtype=np.uint8)
+        if statements is None:
+            statements = [str(i) for i in range(values.shape[1])]
+        return cls(matrix_values, cls._pack(missing), tuple(statements))
+
+    @staticmethod
+    def _pack(missing: np.ndarray) -> np.ndarray | None:
+        return np.packbits(missing, axis=1) if missing.any() else None
+
+    @property
+    def count(self) -> int:
+        """Number of respondents."""
+        return self.values.shape[0]
+
+    @property
+    def nbytes(self) -> int:
+        return self.values.nbytes + (self.missing_bits.nbytes if self.missing_bits is not None else 0)
+
+    def indices(self, statements: list[str]) -> list[int]:
+        """Return the column indices of the statements.
+
+        Raises:
+            KeyError: If a statement is not part of the task
+        """
+        return [self.index[statement] for statement in statements]
+
+    def missing_rows(self, start: int, stop: int) -> np.ndarray | None:
+        """Return the missing value mask of a range of rows, or None when nothing is missing."""
+        if self.missing_bits is None:
+            return None
+        mask = np.unpackbits(self.missing_bits[start:stop], axis=1, count=self.values.shape[1])
+        return mask.view(bool)
+
+    def complete_rows(self, indices: list[int], chunk_rows: int | None = None) -> np.ndarray:
+        """Return the uint8 answers to the statements of the respondents who answered all of them."""
+        values = self.values[:, indices]
+        if self.missing_bits is None:
+            return values
+
+        if chunk_rows is None:
+            # The missing values of a chunk are unpacked for every statement, a byte each
+            chunk_rows = rows_per_chunk(-(-self.values.shape[1] // 8))
+        complete = np.empty(self.count, dtype=bool)
+        for start in range(0, self.count, chunk_rows):
+            stop = start + chunk_rows
+            complete[start:stop] = ~self.missing_rows(start, stop)[:, indices].any(axis=1)
+        return values[complete]
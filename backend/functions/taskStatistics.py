@@ -0,0 +1,271 @@
+# sufficient statistics of a task, computed once so scoring doesn't rescan the respondents
+import io
+import os
+
+import numpy as np
+import polars as pl
+
+from functions.runStorage import read_run
+from functions.taskMatrix import TaskMatrix, rows_per_chunk
+
+STATISTICS_EXTENSION = ".stats.npz"
+# Bumped when the persisted statistics change, older files are recomputed
+STATISTICS_VERSION = 3
+
+
+class TaskStatistics:
+    """Item covariance matrices and counts of a task.
+
+    Cronbach's alpha only needs the item variances and the variance of the row sums,
+    both of which are sums over a submatrix of the item covariance matrix.
+    Columns with missing values get NaN covariances: groups containing them need
+    listwise deletion, which depends on the group, and are scored from the rows.
+    For pairwise deletion every covariance is computed over the respondents who
+    answered both statements, which doesn't depend on the group and is precomputed too.
+
+    Attributes:
+        statements (list[str]): Statement names, in column order.
+        count (int): Number of respondents.
+        covariance (np.ndarray): Item covariance matrix (ddof=1).
+        missing_counts (np.ndarray): Number of missing values per statement.
+        pairwise_covariance (np.ndarray): Item covariance matrix with pairwise deletion.
+        pairwise_counts (np.ndarray): Number of respondents that answered both statements.
+    """
+
+    def __init__(
+        self,
+        statements: list[str],
+        count: int,
+        covariance: np.ndarray,
+        missing_counts: np.ndarray,
+        pairwise_covariance: np.ndarray,
+        pairwise_counts: np.ndarray,
+    ):
+        self.statements = statements
+        self.count = count
+        self.covariance = covariance
+        self.missing_counts = missing_counts
+        self.pairwise_covariance = pairwise_covariance
+        self.pairwise_counts = pairwise_counts
+        self.index = {statement: i for i, statement in enumerate(statements)}
+
+    @classmethod
+    def from_frame(cls, df: pl.DataFrame) -> "TaskStatistics":
+        """Compute the statistics from the statement scores of a task."""
+        return cls.from_matrix(TaskMatrix.from_frame(df))
+
+    @classmethod
+    def from_matrix(cls, matrix: TaskMatrix, chunk_rows: int | None = None) -> "TaskStatistics":
+        """Compute the statistics from the answers of a task.
+
+        The sums are accumulated over chunks of rows, so only a chunk is ever converted to float64.
+        """
+        count, columns = matrix.values.shape
+        if chunk_rows is None:
+            chunk_rows = rows_per_chunk(columns)
+        missing_counts = np.zeros(columns, dtype=np.int64)
+        if matrix.missing_bits is not None:
+            for start in range(0, count, chunk_rows):
+                missing_counts += matrix.missing_rows(start, start + chunk_rows).sum(axis=0)
+
+        if count < 2:
+            covariance = np.full((columns, columns), np.nan)
+        else:
+            # Covariances are shift invariant, centering on the column means keeps the sums small
+            means = matrix.values.sum(axis=0, dtype=np.int64) / count
+            products = np.zeros((columns, columns))
+            for start in range(0, count, chunk_rows):
+                chunk = matrix.values[start:start + chunk_rows] - means
+                products += chunk.T @ chunk
+            covariance = products / (count - 1)
+            # Listwise over all statements: a column with missing values has no covariances
+            incomplete = missing_counts > 0
+            covariance[incomplete, :] = np.nan
+            covariance[:, incomplete] = np.nan
+
+        if missing_counts.any():
+            pairwise_covariance, pairwise_counts = pairwise_statistics(matrix, chunk_rows)
+        else:
+            # Without missing values pairwise deletion doesn't remove anything
+            pairwise_covariance = covariance
+            pairwise_counts = np.full(covariance.shape, count, dtype=np.int64)
+
+        return cls(list(matrix.statements), count, covariance, missing_counts, pairwise_covariance, pairwise_counts)
+
+    def indices(self, statements: list[str]) -> list[int]:
+        """Return the column indices of the statements.
+
+        Raises:
+            KeyError: If a statement is not part of the task
+        """
+        return [self.index[statement] for statement in statements]
+
+    def is_complete(self, statements: list[str]) -> bool:
+        """Whether none of the statements has missing values."""
+        return not self.missing_counts[self.indices(statements)].any()
+
+    def covariance_of(self, statements: list[str]) -> np.ndarray:
+        """Return the covariance submatrix of the statements."""
+        indices = self.indices(statements)
+        return self.covariance[np.ix_(indices, indices)]
+
+    def pairwise_covariance_of(self, statements: list[str]) -> tuple[np.ndarray, int]:
+        """Return the pairwise deletion covariance submatrix of the statements and its effective N.
+
+        The effective N is the smallest number of respondents any of the covariances is based on.
+        """
+        indices = np.ix_(self.indices(statements), self.indices(statements))
+        counts = self.pairwise_counts[indices]
+        return self.pairwise_covariance[indices], int(counts.min()) if counts.size else self.count
+
+    def to_bytes(self) -> bytes:
+        """Serialize the statistics to the (uncompressed) npz format, for the run store and shared caches."""
+        arrays = {
+            "version": STATISTICS_VERSION,
+            "statements": np.array(self.statements, dtype=np.str_),
+            "count": self.count,
+            "covariance": self.covariance,
+            "missing_counts": self.missing_counts,
+        }
+        # Without missing values the pairwise covariance is the same array and every pair
+        # is answered by all respondents, so neither is stored
+        if self.missing_counts.any():
+            arrays["pairwise_covariance"] = self.pairwise_covariance
+            arrays["pairwise_counts"] = self.pairwise_counts
+
+        buffer = io.BytesIO()
+        np.savez(buffer, **arrays)
+        return buffer.getvalue()
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "TaskStatistics | None":
+        """Deserialize statistics, None when they were serialized by an older version."""
+        with np.load(io.BytesIO(data)) as arrays:
+            if "version" not in arrays or int(arrays["version"]) != STATISTICS_VERSION:
+                return None
+            count = int(arrays["count"])
+            covariance = arrays["covariance"]
+            if "pairwise_counts" in arrays:
+                pairwise_covariance, pairwise_counts = arrays["pairwise_covariance"], arrays["pairwise_counts"]
+            else:
+                pairwise_covariance, pairwise_counts = covariance, np.full(covariance.shape, count, dtype=np.int64)
+            return cls(
+                arrays["statements"].tolist(),
+                count,
+                covariance,
+                arrays["missing_counts"],
+                pairwise_covariance,
+                pairwise_counts,
+            )
+
+    def save(self, path: str):
+        """Persist the statistics next to the run."""
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "wb") as file:
+            file.write(self.to_bytes())
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: str) -> "TaskStatistics | None":
+        """Load persisted statistics, None when they were saved by an older version."""
+        with open(path, "rb") as file:
+            return cls.from_bytes(file.read())
+
+    @property
+    def nbytes(self) -> int:
+        arrays = (self.covariance, self.missing_counts, self.pairwise_covariance, self.pairwise_counts)
+        # Without missing values the pairwise covariance is the same array
+        return sum(array.nbytes for array in {id(array): array for array in arrays}.values())
+
+
+def pairwise_statistics(matrix: TaskMatrix, chunk_rows: int | None = None) -> tuple[np.ndarray, np.ndarray]:
+    """Covariance matrix (ddof=1) with pairwise deletion, for all statement pairs at once.
+
+    With O the observed mask and X the values (0 where missing), the sums over the
+    respondents that answered both statements i and j are matrix products:
+    N = O'O (counts), S = X'O (sum of x_i) and P = X'X (sum of x_i * x_j), so
+    cov_ij = (P_ij - S_ij * S_ji / N_ij) / (N_ij - 1).
+
+    Args:
+      matrix (TaskMatrix): The answers of the task, with missing values.
+      chunk_rows (int | None): Number of rows processed at once, by default as many as fit in `CHUNK_BYTES`.
+
+    Returns:
+        (tuple[np.ndarray, np.ndarray]): The covariance matrix (NaN for pairs answered by
+        less than 2 respondents) and the number of respondents per pair.
+    """
+    rows, columns = matrix.values.shape
+    if chunk_rows is None:
+        chunk_rows = rows_per_chunk(columns)
+    observed_counts = np.full(columns, rows, dtype=np.int64)
+    for start in range(0, rows, chunk_rows):
+        observed_counts -= matrix.missing_rows(start, start + chunk_rows).sum(axis=0)
+    # Covariances are shift invariant, centering on the column means keeps the sums small;
+    # missing values are stored as 0, so they don't add to the sums
+    means = matrix.values.sum(axis=0, dtype=np.int64) / np.maximum(observed_counts, 1)
+
+    counts = np.zeros((columns, columns))
+    sums = np.zeros((columns, columns))
+    products = np.zeros((columns, columns))
+    for start in range(0, rows, chunk_rows):
+        observed = ~matrix.missing_rows(start, start + chunk_rows)
+        chunk = np.where(observed, matrix.values[start:start + chunk_rows] - means, 0.0)
+        observed = observed.astype(np.float64)
+        counts += observed.T @ observed
+        sums += chunk.T @ observed
+        products += chunk.T @ chunk
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        covariance = (products - sums * sums.T / counts) / (counts - 1)
+    covariance[counts < 2] = np.nan
+    return covariance, counts.astype(np.int64)
+
+
+def statistics_path(run_path: str) -> str:
+    """Return the path of the statistics belonging to a run file."""
+    return os.path.splitext(run_path)[0] + STATISTICS_EXTENSION
+
+
+def load_or_compute_statistics(run_path: str) -> TaskStatistics:
+    """Load the statistics of a run, computing and persisting them when missing or outdated.
+
+    Args:
+      run_path (str): Path of the run file.
+
+    Returns:
+        (TaskStatistics): The statistics of the run.
+    """
+    path = statistics_path(run_path)
+    if os.path.exists(path) and os.path.getmtime(path) >= os.path.getmtime(run_path):
+        statistics = TaskStatistics.load(path)
+        if statistics is not None:
+            return statistics
+
+    statistics = TaskStatistics.from_frame(read_run(run_path))
+    statistics.save(path)
+    return statistics
+
+
+def listwise_covariance(matrix: TaskMatrix, indices: list[int]) -> tuple[np.ndarray, int]:
+    """Covariance matrix (ddof=1) of the statements, over the respondents who answered all of them.
+
+    Args:
+      matrix (TaskMatrix): The answers of the task.
+      indices (list[int]): Column indices of the statements.
+
+    Returns:
+        (tuple[np.ndarray, int]): The covariance matrix and the number of rows used.
+    """
+    complete = matrix.complete_rows(indices)
+    count = complete.shape[0]
+    if count < 2:
+        return np.full((len(indices), len(indices)), np.nan), count
+
+    # Only a chunk of the answers is converted to float64 at a time
+    means = complete.sum(axis=0, dtype=np.int64) / count
+    scatter = np.zeros((len(indices), len(indices)))
+    chunk_rows = rows_per_chunk(len(indices))
+    for start in range(0, count, chunk_rows):
+        centered = complete[start:start + chunk_rows] - means
+        scatter += centered.T @ centered
+    return scatter / (count - 1), count
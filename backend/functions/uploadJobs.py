@@ -0,0 +1,219 @@
+# background processing of uploaded files, so the upload request returns immediately
+import json
+import os
+import threading
+import time
+
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable
+
+# Statuses of an upload job, in order
+QUEUED = "queued"
+PROCESSING = "processing"
+DONE = "done"
+FAILED = "failed"
+
+# The status of a job is kept next to its run, so every worker process can report it
+JOB_EXTENSION = ".job.json"
+
+
+class UploadJob:
+    """Progress of the processing of one upload.
+
+    Attributes:
+        task_id (str): Unique identifier for the task the upload becomes.
+        status (str): One of `QUEUED`, `PROCESSING`, `DONE` or `FAILED`.
+        stage (str): Description of the current processing step.
+        progress (float): Fraction of the processing that is done (0-1).
+        error (str | None): Error message when the job failed.
+        result (dict | None): What the processing function returned, e.g. a report.
+    """
+
+    def __init__(self, task_id: str):
+        self.task_id = task_id
+        self.status = QUEUED
+        self.stage = "queued"
+        self.progress = 0.0
+        self.error: str | None = None
+        self.result: dict | None = None
+        self.created = time.time()
+        self.finished: float | None = None
+        self._done = threading.Event()
+
+    def report(self, stage: str, progress: float):
+        """Update the current processing step; passed to the processing function."""
+        self.stage = stage
+        self.progress = progress
+
+    def wait(self, timeout: float | None = None) -> bool:
+        """Wait until the job is done or failed; returns False on a timeout."""
+        return self._done.wait(timeout)
+
+    def to_dict(self) -> dict:
+        return {
+            "task_id": self.task_id,
+            "status": self.status,
+            "stage": self.stage,
+            "progress": self.progress,
+            "error": self.error,
+            "result": self.result,
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "UploadJob":
+        """Restore a job from its status, e.g. one persisted by another worker."""
+        job = cls(data["task_id"])
+        job.status = data["status"]
+        job.stage = data["stage"]
+        job.progress = data["progress"]
+        job.error = data["error"]
+        job.result = data["result"]
+        if job.status in (DONE, FAILED):
+            job._done.set()
+        return job
+
+
+class UploadJobQueue:
+    """Bounded pool of workers processing the uploads in the background.
+
+    With a `directory`, the status of every job is also written to `<task_id>.job.json` in it, and
+    jobs of other processes (uvicorn workers sharing the directory) are looked up there.
+
+    Args:
+        max_workers (int): Number of uploads processed at the same time.
+        max_pending (int): Maximum number of queued and running jobs; more are refused.
+        keep_finished (float): Seconds the status of a finished job is kept.
+        directory (str | None): Directory the job statuses are shared in, None to keep them in memory only.
+    """
+
+    def __init__(self, max_workers: int, max_pending: int, keep_finished: float = 60 * 60, directory: str | None = None):
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="upload")
+        self.max_pending = max_pending
+        self.keep_finished = keep_finished
+        self.directory = directory
+        self._jobs: dict[str, UploadJob] = {}
+        self._lock = threading.Lock()
+
+    def submit(self, task_id: str, process: Callable[[Callable[[str, float], None]], dict | None]) -> UploadJob:
+        """Queue the processing of an upload.
+
+        Args:
+          task_id (str): Unique identifier for the task.
+          process (Callable): Processes the upload, gets `UploadJob.report` to report progress.
+            What it returns is kept as the result of the job.
+
+        Returns:
+            (UploadJob): The queued job.
+
+        Raises:
+            RuntimeError: If too many uploads are pending already
+        """
+        job = UploadJob(task_id)
+        with self._lock:
+            self._prune()
+            if self.pending_count() >= self.max_pending:
+                raise RuntimeError("Too many uploads are being processed, try again later")
+            self._jobs[task_id] = job
+
+        self._save(job)
+        self._executor.submit(self._run, job, process)
+        return job
+
+    def get(self, task_id: str) -> UploadJob | None:
+        """Return the job of the task, or None when there is no (recent) job."""
+        with self._lock:
+            job = self._jobs.get(task_id)
+        return job if job is not None else self._load(task_id)
+
+    def forget(self, task_id: str):
+        """Drop the status of the job of a task, e.g. when its run is deleted."""
+        with self._lock:
+            self._jobs.pop(task_id, None)
+        if self.directory is not None:
+            try:
+                os.remove(self._path(task_id))
+            except FileNotFoundError:
+                pass
+
+    def is_pending(self, task_id: str) -> bool:
+        """Whether the upload of the task is still queued or being processed."""
+        job = self.get(task_id)
+        return job is not None and job.status in (QUEUED, PROCESSING)
+
+    def pending_count(self) -> int:
+        return sum(1 for job in self._jobs.values() if job.status in (QUEUED, PROCESSING))
+
+    def _run(self, job: UploadJob, process: Callable[[Callable[[str, float], None]], dict | None]):
+        def report(stage: str, progress: float):
+            job.report(stage, progress)
+            self._save(job)
+
+        job.status = PROCESSING
+        try:
+            job.result = process(report)
+        except Exception as e:
+            print(f"Error: Processing the upload of task {job.task_id} failed: {e}")
+            job.status = FAILED
+            job.error = str(e)
+        else:
+            job.report("done", 1.0)
+            job.status = DONE
+        job.finished = time.time()
+        self._save(job)
+        job._done.set()
+
+    def _path(self, task_id: str) -> str:
+        return os.path.join(self.directory, f"{task_id}{JOB_EXTENSION}")
+
+    def _save(self, job: UploadJob):
+        if self.directory is None:
+            return
+        path = self._path(job.task_id)
+        tmp_path = f"{path}.tmp"
+        try:
+            with open(tmp_path, "w") as file:
+                json.dump(job.to_dict(), file)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            print(f"Warning: Could not save the status of the upload of task {job.task_id}: {e}")
+
+    def _load(self, task_id: str) -> UploadJob | None:
+        if self.directory is None:
+            return None
+        try:
+            with open(self._path(task_id)) as file:
+                return UploadJob.from_dict(json.load(file))
+        except (FileNotFoundError, ValueError):
+            return None
+
+    def remove_stale_statuses(self) -> int:
+        """Remove the job statuses in the directory that weren't updated for `keep_finished` seconds.
+
+        Including the statuses left by other (or earlier) processes; a job that hasn't reported
+        for that long isn't running anymore. This lists the directory, so it is meant for a
+        periodic janitor rather than for every request.
+
+        Returns:
+            (int): Number of removed statuses.
+        """
+        if self.directory is None:
+            return 0
+        cutoff = time.time() - self.keep_finished
+        removed = 0
+        for name in os.listdir(self.directory):
+            if not name.endswith(JOB_EXTENSION):
+                continue
+            path = os.path.join(self.directory, name)
+            try:
+                if os.path.getmtime(path) < cutoff:
+                    os.remove(path)
+                    removed += 1
+            except FileNotFoundError:
+                pass
+        return removed
+
+    def _prune(self):
+        # Forget finished jobs after a while, the run file itself tells the task exists
+        cutoff = time.time() - self.keep_finished
+        for task_id in [t for t, job in self._jobs.items() if job.finished is not None and job.finished < cutoff]:
+            del self._jobs[task_id]
@@ -1,3 +1,101 @@
-# functions for when the user uploads the file and client name
-# one function to check the file
-# one function to check the client name
+# functions for when the user uploads the file(s) and client name
+import time
+
+from concurrent.futures import Executor
+from functools import partial
+from typing import Callable
+
+import polars as pl
+
+# Column with the name of the file every respondent came from, when tagging is requested
+SOURCE_COLUMN = "source_file"
+
+
+def read_statement_columns(path: str, observe: Callable[[str, float], None] | None = None) -> pl.DataFrame:
+    """Read an uploaded Excel file and keep the statement columns.
+
+    Statement columns are marked with a trailing "*", which is removed from the name.
+
+    Args:
+      path (str): Path of the Excel file.
+      observe (Callable[[str, float], None] | None): Called with the stage ("excel_parse", "cast")
+        and its duration in seconds.
+
+    Returns:
+        (pl.DataFrame): The statement scores as UInt8 columns.
+    """
+    start = time.perf_counter()
+    df = pl.read_excel(path)  # process_results_file(tmp.name, return_polars=True)
+    parsed = time.perf_counter()
+
+    statements = tuple(s for s in df.columns if s.endswith("*"))
+    statements_mapping = {s: s.removesuffix("*") for s in statements}
+    df = df.select(statements).cast(pl.UInt8).rename(statements_mapping)
+
+    if observe is not None:
+        observe("excel_parse", parsed - start)
+        observe("cast", time.perf_counter() - parsed)
+    return df
+
+
+def read_uploads(
+    paths: list[str],
+    executor: Executor,
+    observe: Callable[[str, float], None] | None = None,
+) -> list[pl.DataFrame]:
+    """Read several uploaded Excel files in parallel.
+
+    Args:
+      paths (list[str]): Paths of the Excel files.
+      executor (Executor): Pool the files are parsed on.
+      observe (Callable[[str, float], None] | None): Receives the stage timings of every file,
+        see `read_statement_columns`.
+
+    Returns:
+        (list[pl.DataFrame]): The statement columns of every file, in the same order.
+    """
+    return list(executor.map(partial(read_statement_columns, observe=observe), paths))
+
+
+def combine_uploads(
+    frames: list[pl.DataFrame],
+    file_names: list[str],
+) -> tuple[pl.DataFrame, pl.Series, dict]:
+    """Concatenate the statement columns of several files into one task dataset.
+
+    The files are aligned on their statement columns: the result has every statement
+    of every file (in order of first appearance), respondents of files without a
+    statement get a missing value for it.
+
+    Args:
+      frames (list[pl.DataFrame]): Statement columns of every file.
+      file_names (list[str]): Names of the uploaded files.
+
+    Returns:
+        (tuple[pl.DataFrame, pl.Series, dict]): The combined statement scores, the source file
+        of every respondent and a report of the files and mismatched columns.
+    """
+    statements = list(dict.fromkeys(statement for df in frames for statement in df.columns))
+
+    files = []
+    for name, df in zip(file_names, frames):
+        present = set(df.columns)
+        files.append({
+            "file_name": name,
+            "respondents": df.height,
+            "statements": df.width,
+            "missing_statements": [s for s in statements if s not in present],
+        })
+
+    combined = pl.concat(frames, how="diagonal").select(statements)
+    sources = pl.concat(
+        [pl.repeat(name, df.height, dtype=pl.String, eager=True) for name, df in zip(file_names, frames)]
+    ).alias(SOURCE_COLUMN)
+
+    missing_somewhere = {s for f in files for s in f["missing_statements"]}
+    report = {
+        "files": files,
+        # Statements that are not in every file
+        "mismatched_statements": [s for s in statements if s in missing_somewhere],
+    }
+    return combined, sources, report
@@ -1,39 +1,93 @@
+import time
+
+# Reported by `/healthz`; dependencies only some endpoints need are imported on first use
+import_started = time.perf_counter()
+
+import asyncio
+import functools
+import importlib
+import json
 import os
 import uuid
 import tempfile
 import shutil
-import time
 import sys
 
-from typing import Annotated, List
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from contextlib import asynccontextmanager, suppress
+from typing import Annotated, Callable, List, Literal
 
-import uvicorn
+import numpy as np
 import polars as pl
-import pandas as pd
 
 from fastapi.responses import FileResponse
-from fastapi import Body, FastAPI, File, Request, HTTPException, UploadFile, APIRouter, Form
-from fastapi.responses import RedirectResponse
+from fastapi import Body, Depends, FastAPI, File, Header, Request, HTTPException, UploadFile, APIRouter, Form, WebSocket, WebSocketDisconnect
+from fastapi.responses import JSONResponse, PlainTextResponse, RedirectResponse, StreamingResponse
 from fastapi.staticfiles import StaticFiles
 from fastapi.templating import Jinja2Templates
 from dotenv import load_dotenv
 from starlette.middleware.cors import CORSMiddleware
-from pydantic import BaseModel
+from fastapi.exceptions import RequestValidationError
+from pydantic import BaseModel, Field, ValidationError, model_validator
 
 project_directory = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 runs_directory = os.path.join(project_directory, "runs")
 
 load_dotenv(os.path.join(project_directory, ".env"))
+profiles_directory = os.getenv("PROFILES_DIRECTORY") or os.path.join(project_directory, "profiles")
+os.makedirs(runs_directory, exist_ok=True)
 sys.path.append(project_directory)
 
 # from ArpY.rainbow.cst.excel import process_results_file
 # from ArpY.rainbow.project.data_fetcher import get_client_data, get_statements_data
 
-from ArpY.rainbow.project.data_fetcher import get_statements_data
+from functions.scoreCalculating import (
+    cronbach_alpha,
+    cronbach_alpha_batch,
+    cronbach_alpha_from_covariance,
+    item_deletion_statistics,
+)
+from functions.taskCache import TaskCache
+from functions.taskMatrix import TaskMatrix
+from functions.runStorage import read_run, run_path as run_store_path, sources_path, write_run
+from functions.taskStatistics import STATISTICS_VERSION, TaskStatistics, listwise_covariance, load_or_compute_statistics, statistics_path
+from functions.scoringSession import ScoringSession, ScoringSessionStore, VersionConflictError
+from functions.uploadJobs import DONE, FAILED, UploadJobQueue
+from functions.statementCatalog import map_statements_to_catalog
+from functions.catalogCache import CatalogCache
+from functions.uploading import combine_uploads, read_uploads
+from functions.runIndex import RunIndex
+from functions.scoreMemo import ScoreMemo
+from functions.artifactCache import create_artifact_cache, frame_from_bytes, frame_to_bytes
+from functions.groupSuggestion import correlation_from_covariance, suggest_groups
+from functions.groupOptimizer import GroupingState, local_search, perturb
+from functions.bootstrap import RESAMPLE_CHUNK, bootstrap_batch, percentile_interval, split_replicates
+from functions.metrics import CONTENT_TYPE as METRICS_CONTENT_TYPE, Counter, Gauge, Histogram, MetricsRegistry
+from functions.profiling import ProfilingMiddleware, is_profiling, list_profiles, profile_path
+from functions.readiness import Readiness
+from functions.groupData import BINARY_CONTENT_TYPES, RAW_CONTENT_TYPE, decode_arrow, decode_raw
+
+readiness = Readiness(time.perf_counter() - import_started)
 
-from functions.scoreCalculating import cronbach_alpha
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Index the existing runs, warm up in the background and run the janitor while the application is up."""
+    with readiness.measure_startup("run_index_sync"):
+        await asyncio.to_thread(run_index.sync, runs_directory)
+    warmup = asyncio.create_task(asyncio.to_thread(readiness.run_warmup, {
+        "catalog_fetcher": load_statements_fetcher,
+        "factor_group_store": get_factor_group_store,
+        # polars imports its Excel reader on the first upload
+        "excel_reader": lambda: importlib.import_module("fastexcel"),
+    }))
+    janitor = asyncio.create_task(run_janitor())
+    yield
+    janitor.cancel()
+    await warmup
+    run_index.close()
 
-app = FastAPI(root_path="/cronBach")
+
+app = FastAPI(root_path="/cronBach", lifespan=lifespan)
 api = APIRouter(prefix="/api")
 
 
@@ -53,6 +107,33 @@ app.add_middleware(
 )
 
 
+def is_admin(x_admin_token: str | None) -> bool:
+    """Whether the token matches ADMIN_TOKEN; always False when no ADMIN_TOKEN is configured."""
+    admin_token = os.getenv("ADMIN_TOKEN")
+    return bool(admin_token) and x_admin_token == admin_token
+
+
+def require_admin(x_admin_token: Annotated[str | None, Header()] = None):
+    """
+    Dependency for the admin endpoints, which require the `X-Admin-Token` header to match ADMIN_TOKEN.
+    When no ADMIN_TOKEN is configured the admin endpoints are disabled.
+
+    Raises:
+        HTTPException: If the token is missing or wrong
+    """
+    if not is_admin(x_admin_token):
+        raise HTTPException(status_code=403, detail="Admin token required")
+
+
+# Admins can profile a request with the `X-Profile: 1` header or `?profile=1`, see `/api/admin/profiles`
+app.add_middleware(
+    ProfilingMiddleware,
+    directory=profiles_directory,
+    authorize=is_admin,
+    interval=float(os.getenv("PROFILE_SAMPLE_INTERVAL", "0.001")),
+)
+
+
 class ScoreCalculationRequest(BaseModel):
     """
     Request model for calculating Cronbach's alpha scores.
@@ -60,31 +141,406 @@ class ScoreCalculationRequest(BaseModel):
     Attributes:
         task_id: Unique identifier for the task
         groups: Dictionary mapping group indices to lists of statement identifiers
+        missing: How missing values are handled; "listwise" drops respondents with a missing
+            value in the group, "pairwise" uses every respondent that answered both statements of a pair
     """
     task_id: str  # Unique identifier for the task
     groups: list[list[str]]  # every list is a group of statements
     #groups being the original statements
+    missing: Literal["listwise", "pairwise"] = "listwise"
+
+
+def run_path(task_id: str) -> str:
+    """Return the path of the run file for the given task."""
+    return run_store_path(runs_directory, task_id)
+
+
+# Process-wide cache of the runs as compact TaskMatrix objects, so repeated scoring reads no files
+# The budget can be tuned with TASK_CACHE_MAX_MB (default 512 MB)
+task_cache = TaskCache(
+    resolve_path=run_path,
+    load=lambda path: TaskMatrix.from_frame(read_run(path)),
+    max_bytes=int(os.getenv("TASK_CACHE_MAX_MB", "512")) * 1024 * 1024,
+    sizeof=lambda matrix: matrix.nbytes,
+)
+
+# Derived artifacts shared by all workers (ARTIFACT_CACHE=redis), so a request on any worker is warm
+artifact_cache = create_artifact_cache()
+
+
+def statistics_key(task_id: str) -> str:
+    return f"statistics:v{STATISTICS_VERSION}:{task_id}"
+
+
+def load_statistics(path: str) -> TaskStatistics:
+    """
+    Load the covariance statistics of a run from the shared artifact cache,
+    or from the run store (computing them for older runs) and share them.
+
+    Args:
+        path: Path of the run file
 
-def delete_old_runs():
+    Returns:
+        The statistics of the run
     """
-    Delete CSV files in the runs directory that are older than 24 hours.
-    This helps maintain storage space by removing temporary data.
-    This is done during accessing the main page.(since the loading is instant) 
+    key = statistics_key(os.path.basename(path).split(".")[0])
+    data = artifact_cache.get(key)
+    statistics = TaskStatistics.from_bytes(data) if data is not None else None
+    if statistics is None:
+        statistics = load_or_compute_statistics(path)
+        artifact_cache.set(key, statistics.to_bytes())
+    return statistics
+
+
+# The covariance statistics are loaded (or computed for older runs) from the run file.
+# They have their own budget, STATISTICS_CACHE_MAX_MB (default 128 MB), on top of the task cache's
+statistics_cache = TaskCache(
+    resolve_path=run_path,
+    load=load_statistics,
+    max_bytes=int(os.getenv("STATISTICS_CACHE_MAX_MB", "128")) * 1024 * 1024,
+    sizeof=lambda statistics: statistics.nbytes,
+)
+
+
+def load_statements_fetcher() -> Callable:
+    """Import ArpY's catalog fetcher, which is only needed by `/api/get-display-data`."""
+    from ArpY.rainbow.project.data_fetcher import get_statements_data
+    return get_statements_data
+
+
+async def get_statements_data(client: str) -> pl.DataFrame:
+    """Fetch the statement catalog of a client from ArpY."""
+    return await load_statements_fetcher()(client)
+
+
+# The statement catalogs rarely change during a day, so they're served from a cache
+catalog_cache = CatalogCache(
+    get_statements_data,
+    ttl=float(os.getenv("CATALOG_CACHE_TTL", str(60 * 60))),
+    max_stale=float(os.getenv("CATALOG_CACHE_MAX_STALE", str(60 * 60 * 24))),
+)
+
+# Uploads are parsed in the background by a bounded pool of workers
+upload_jobs = UploadJobQueue(
+    max_workers=int(os.getenv("UPLOAD_WORKERS", "2")),
+    max_pending=int(os.getenv("UPLOAD_MAX_PENDING", "20")),
+    directory=runs_directory,
+)
+
+# Files of a multi-file upload are parsed in parallel on this pool
+upload_parse_pool = ThreadPoolExecutor(
+    max_workers=int(os.getenv("UPLOAD_PARSE_THREADS", "4")), thread_name_prefix="upload-parse"
+)
+
+
+def ensure_task_ready(task_id: str):
     """
-    # Create runs directory if it doesn't exist
-    if not os.path.exists(runs_directory):
-        os.makedirs(runs_directory)
-        return  # No files to delete if directory was just created
-    
-    hour_24_ago = time.time() - 60 * 60 * 24
-    for file in os.listdir(runs_directory):
-        if not file.endswith(".csv"):
+    Raise when the upload of the task is still being processed or failed.
+
+    Raises:
+        HTTPException: 409 while the upload is processed, 422 when processing failed
+    """
+    # The run file is written last, so once it exists the upload is done, and the status
+    # of the job (possibly a file of another worker) only has to be read while it is missing
+    if os.path.exists(run_path(task_id)):
+        return
+    job = upload_jobs.get(task_id)
+    if job is None or job.status == DONE:
+        return
+    if job.status != FAILED:
+        raise HTTPException(status_code=409, detail=f"Task {task_id} is still being processed")
+    raise HTTPException(status_code=422, detail=f"Processing task {task_id} failed: {job.error}")
+
+
+def load_task(task_id: str) -> TaskMatrix:
+    """
+    Get the dataset of a task from the cache.
+
+    Args:
+        task_id: Unique identifier for the task
+
+    Returns:
+        The answers of the task as a TaskMatrix
+
+    Raises:
+        HTTPException: If the task doesn't exist (anymore) or its upload isn't processed
+    """
+    ensure_task_ready(task_id)
+    run_index.touch(task_id)
+    try:
+        return task_cache.get(task_id)
+    except FileNotFoundError:
+        task_cache.invalidate(task_id)
+        raise HTTPException(status_code=404, detail=f"Task {task_id} not found")
+
+
+def score_groups_from_rows(task_id: str, groups: list[list[str]]) -> tuple[list[float | None], list[int]]:
+    """
+    Calculate Cronbach's alpha for groups from the respondent rows, with listwise deletion per group.
+    All groups are scored in a single pass over the (shared) columns they use.
+
+    Args:
+        task_id: Unique identifier for the task
+        groups: Every list is a group of statements
+
+    Returns:
+        Cronbach's alpha per group (None when it can't be calculated) and the effective N per group
+    """
+    matrix = load_task(task_id)
+    return cronbach_alpha_batch(matrix, [matrix.indices(statements) for statements in groups])
+
+
+def compute_group_scores(task_id: str, groups: list[list[str]], missing: str = "listwise") -> list[tuple[float | None, int]]:
+    """
+    Calculate Cronbach's alpha and the effective N for every group.
+
+    With listwise deletion groups without missing values are scored from the precomputed
+    covariance matrix and the others from the rows, in one pass for all of them.
+    With pairwise deletion every group is scored from the precomputed pairwise covariance matrix,
+    the effective N is the smallest number of respondents any of its covariances is based on.
+
+    Args:
+        task_id: Unique identifier for the task
+        groups: Every list is a group of statements
+        missing: How missing values are handled, "listwise" or "pairwise"
+
+    Returns:
+        (alpha, effective N) per group, alpha is None when it can't be calculated
+
+    Raises:
+        HTTPException: If the task can't be loaded or a statement isn't part of it
+    """
+    statistics = load_task_statistics(task_id, groups)
+
+    scores = [(None, 0)] * len(groups)
+    # Groups with missing values need listwise deletion, these are scored from the rows
+    row_groups = {}
+
+    for i, statements in enumerate(groups):
+        # Check if group has less than 2 statements (source group limitation)
+        if len(statements) < 2:
+            continue  # Return None for groups with insufficient statements
+
+        if missing == "pairwise":
+            covariance, count = statistics.pairwise_covariance_of(statements)
+        elif statistics.is_complete(statements):
+            covariance, count = statistics.covariance_of(statements), statistics.count
+        else:
+            row_groups[i] = statements
             continue
-        
-        # Get the file's creation time
-        creation_time = os.path.getctime(os.path.join(runs_directory, file))
-        if creation_time < hour_24_ago:
-            os.remove(os.path.join(runs_directory, file))
+
+        try:
+            alpha = cronbach_alpha_from_covariance(covariance, count)
+            scores[i] = (alpha if np.isfinite(alpha) else None, count)
+        except ValueError as e:
+            # Handle cases where calculation fails due to insufficient data
+            print(f"Warning: Could not calculate Cronbach's alpha for group {i}: {e}")
+            scores[i] = (None, count)
+
+    if row_groups:
+        alphas, counts = score_groups_from_rows(task_id, list(row_groups.values()))
+        for i, alpha, count in zip(row_groups, alphas, counts):
+            if alpha is None:
+                print(f"Warning: Could not calculate Cronbach's alpha for group {i}: insufficient data")
+            scores[i] = (alpha, count)
+
+    return scores
+
+
+@functools.cache
+def get_factor_group_store():
+    """The store of the saved factor groupings, through the shared (pooled) MongoDB client; imports pymongo."""
+    from functions.factorGroupStore import FactorGroupStore, get_mongo_client
+    return FactorGroupStore(get_mongo_client()[os.getenv("MONGO_DATABASE", "cronbach")])
+
+
+# (task_id, missing value handling, set of statements) → (alpha, N) of recently scored groups
+score_memo = ScoreMemo(int(os.getenv("SCORE_MEMO_MAX_ENTRIES", "100000")))
+
+
+def score_groups(task_id: str, groups: list[list[str]], missing: str = "listwise") -> list[tuple[float | None, int]]:
+    """
+    Calculate Cronbach's alpha and the effective N for every group, from the score memo where possible.
+    Groups that aren't memoized are computed together with `compute_group_scores`; groups another
+    request is computing right now are waited for instead of computed twice.
+
+    Args:
+        task_id: Unique identifier for the task
+        groups: Every list is a group of statements
+        missing: How missing values are handled, "listwise" or "pairwise"
+
+    Returns:
+        (alpha, effective N) per group, alpha is None when it can't be calculated
+    """
+    run_index.touch(task_id)
+    return score_memo.get_many(
+        task_id, missing, groups, lambda uncached: compute_group_scores(task_id, uncached, missing)
+    )
+
+
+# Bootstrap replicates and optimizer restarts are spread over worker processes
+compute_workers = int(os.getenv("COMPUTE_WORKERS") or os.cpu_count() or 1)
+compute_pool = ProcessPoolExecutor(max_workers=compute_workers)
+
+# Size, creation, last access and client of every run, used by the janitor
+run_index = RunIndex(os.path.join(runs_directory, "index.sqlite3"))
+
+# Server-side groupings for the incremental "move statement" endpoint
+scoring_sessions = ScoringSessionStore(max_sessions=int(os.getenv("SCORING_SESSIONS_MAX", "1000")))
+
+# Open live scoring WebSocket connections
+live_connections = 0
+
+
+def cache_stats_by_name() -> dict[str, dict]:
+    return {
+        "tasks": task_cache.stats(),
+        "statistics": statistics_cache.stats(),
+        "scores": score_memo.stats(),
+        "catalogs": catalog_cache.stats(),
+        "artifacts": artifact_cache.stats(),
+    }
+
+
+def cache_metric(field: str) -> Callable[[], dict[tuple, float]]:
+    # Caches that can't tell (e.g. the entries in Redis) have no series
+    return lambda: {(name,): stats[field] for name, stats in cache_stats_by_name().items() if stats[field] is not None}
+
+
+# Prometheus metrics, scraped from `/metrics`
+metrics = MetricsRegistry()
+request_duration = metrics.register(Histogram(
+    "http_request_duration_seconds", "Latency of the HTTP requests per route", ("method", "route", "status")
+))
+stage_duration = metrics.register(Histogram(
+    "stage_duration_seconds", "Duration of the stages of task creation and the display data", ("pipeline", "stage")
+))
+upload_size = metrics.register(Histogram(
+    "upload_size_bytes", "Size of the uploaded Excel files",
+    buckets=tuple(2 ** i * 1024 for i in range(4, 19, 2)),  # 16 KiB - 256 MiB
+))
+uploaded_bytes = metrics.register(Counter("uploaded_bytes_total", "Total size of the uploaded Excel files"))
+metrics.register(Gauge("cache_hits", "Hits of the cache", cache_metric("hits"), ("cache",)))
+metrics.register(Gauge("cache_misses", "Misses of the cache", cache_metric("misses"), ("cache",)))
+metrics.register(Gauge("cache_hit_ratio", "Fraction of the lookups that hit the cache", cache_metric("hit_ratio"), ("cache",)))
+metrics.register(Gauge("cache_entries", "Entries in the cache", cache_metric("entries"), ("cache",)))
+metrics.register(Gauge("cache_evictions", "Entries evicted from the cache", cache_metric("evictions"), ("cache",)))
+metrics.register(Gauge("tasks", "Number of tasks by state", lambda: {
+    ("stored",): run_index.count(),
+    ("in_memory",): task_cache.stats()["entries"],
+    ("processing",): upload_jobs.pending_count(),
+}, ("state",)))
+metrics.register(Gauge("scoring_sessions", "Scoring sessions kept in memory", lambda: {(): len(scoring_sessions)}))
+metrics.register(Gauge("live_scoring_connections", "Open live scoring connections", lambda: {(): live_connections}))
+
+
+@app.middleware("http")
+async def observe_request_duration(request: Request, call_next):
+    """Record the latency of every request under its route template, so task ids don't become labels."""
+    start = time.perf_counter()
+    status = 500
+    try:
+        response = await call_next(request)
+        status = response.status_code
+        return response
+    finally:
+        route = request.scope.get("route")
+        request_duration.observe(
+            time.perf_counter() - start,
+            method=request.method,
+            route=getattr(route, "path", "unmatched"),
+            status=status,
+        )
+
+
+def load_task_statistics(task_id: str, groups: list[list[str]] | None = None) -> TaskStatistics:
+    """
+    Get the covariance statistics of a task from the cache.
+
+    Args:
+        task_id: Unique identifier for the task
+        groups: Groups of statements the request uses, checked to be part of the task
+
+    Returns:
+        The covariance matrix and counts of the task
+
+    Raises:
+        HTTPException: If the task doesn't exist (anymore) or its upload isn't processed,
+            400 if a statement of the groups isn't part of the task
+    """
+    ensure_task_ready(task_id)
+    run_index.touch(task_id)
+    try:
+        statistics = statistics_cache.get(task_id)
+    except FileNotFoundError:
+        statistics_cache.invalidate(task_id)
+        raise HTTPException(status_code=404, detail=f"Task {task_id} not found")
+
+    for statement in (statement for group in groups or [] for statement in group):
+        if statement not in statistics.index:
+            raise HTTPException(status_code=400, detail=f"Unknown statement {statement!r}")
+    return statistics
+
+def delete_run(task_id: str):
+    """
+    Delete all files of a run and forget everything cached about it.
+
+    Args:
+        task_id: Unique identifier for the task
+    """
+    # Release the (memory mapped) run before removing the files
+    task_cache.invalidate(task_id)
+    statistics_cache.invalidate(task_id)
+    score_memo.invalidate(task_id)
+    artifact_cache.invalidate_task(task_id)
+    scoring_sessions.drop_task(task_id)
+    upload_jobs.forget(task_id)
+
+    path = run_path(task_id)
+    for file in (path, statistics_path(path), sources_path(path)):
+        if os.path.exists(file):
+            os.remove(file)
+    run_index.remove(task_id)
+
+
+def evict_runs() -> list[str]:
+    """
+    Delete the runs that haven't been used for RUN_MAX_IDLE_HOURS (default 24), and then the
+    least recently used runs until the total size fits in RUNS_DISK_QUOTA_MB (default 5 GB).
+    Runs whose upload is still being processed are kept. The statuses of upload jobs that
+    finished long ago are removed as well.
+
+    Returns:
+        The task_id's of the deleted runs
+    """
+    run_index.flush()
+    upload_jobs.remove_stale_statuses()
+
+    max_idle = float(os.getenv("RUN_MAX_IDLE_HOURS", "24")) * 60 * 60
+    quota = int(os.getenv("RUNS_DISK_QUOTA_MB", "5120")) * 1024 * 1024
+
+    evicted = []
+    for task_id in run_index.idle_since(time.time() - max_idle) + run_index.over_quota(quota):
+        if task_id not in evicted and not upload_jobs.is_pending(task_id):
+            delete_run(task_id)
+            evicted.append(task_id)
+    return evicted
+
+
+async def run_janitor():
+    """
+    Background task evicting old runs every JANITOR_INTERVAL seconds (default 10 minutes).
+    The run index keeps track of the runs, so nothing has to scan the runs directory.
+    """
+    interval = float(os.getenv("JANITOR_INTERVAL", "600"))
+    while True:
+        try:
+            evicted = await asyncio.to_thread(evict_runs)
+            if evicted:
+                print(f"Janitor deleted {len(evicted)} run(s)")
+        except Exception as e:
+            print(f"Warning: Janitor failed: {e}")
+        await asyncio.sleep(interval)
 
 
 @app.get("/")
@@ -100,7 +556,7 @@ async def read_root(request: Request):
     """
 
     # @Lucas-vanerven: I've added a test in the root directory `test.xlsx`
-    delete_old_runs()
+    # Old runs are deleted by the janitor in the background, see `run_janitor`
 
     # client_data = await get_client_data()
     # clients = sorted(client_data["Client"].unique())
@@ -118,45 +574,120 @@ async def read_root(request: Request):
     )
 
 
+def process_upload(
+    excel_paths: list[str],
+    file_names: list[str],
+    client: str,
+    task_id: str,
+    tag_source: bool,
+    report: Callable[[str, float], None],
+) -> dict:
+    """
+    Convert the uploaded Excel file(s) to a run. Runs on the upload worker pool.
+    Several files are parsed in parallel and concatenated on their statement columns.
+
+    Args:
+        excel_paths: Paths of the (temporary) uploaded Excel files, removed afterwards
+        file_names: Original names of the uploaded files
+        client: Client identifier
+        task_id: Unique identifier for the task
+        tag_source: Whether to store the source file of every respondent next to the run
+        report: Callback to report the current stage and progress
+
+    Returns:
+        Report of the combined files and the statements that are not in every file
+    """
+    try:
+        report("parsing excel", 0.1)
+        frames = read_uploads(
+            excel_paths, upload_parse_pool, lambda stage, seconds: stage_duration.observe(seconds, pipeline="create_task", stage=stage)
+        )
+    finally:
+        for excel_path in excel_paths:
+            os.remove(excel_path)
+
+    report("combining", 0.6)
+    with stage_duration.time(pipeline="create_task", stage="combine"):
+        run, sources, combine_report = combine_uploads(frames, file_names)
+
+    report("computing statistics", 0.7)
+    # Computed once here, so scoring a group only has to sum a covariance submatrix
+    with stage_duration.time(pipeline="create_task", stage="statistics"):
+        statistics = TaskStatistics.from_frame(run)
+
+    report("writing", 0.9)
+    path = run_path(task_id)
+    files = [path, statistics_path(path)]
+    with stage_duration.time(pipeline="create_task", stage="write"):
+        if tag_source:
+            sources.to_frame().write_ipc(sources_path(path))
+            files.append(sources_path(path))
+        statistics.save(statistics_path(path))
+        # Last, the run file existing tells the task is ready
+        write_run(run, path)
+    artifact_cache.set(statistics_key(task_id), statistics.to_bytes())
+
+    run_index.register(task_id, client, sum(os.path.getsize(file) for file in files))
+
+    return combine_report
+
+
 @api.post("/job/create")
 def create_task(
     request: Request,
     files: List[UploadFile] = File(...),
-    client: str = Form(...)
+    client: str = Form(...),
+    tag_source: bool = Form(False)
 ):
     """
-    Create a new analysis task from uploaded Excel file.
+    Create a new analysis task from uploaded Excel file(s).
+    The files are parsed in the background, the redirect is returned as soon as they are queued.
+    Progress, and a report of mismatched statement columns, can be followed with `/api/job/{task_id}/status`.
     
     Args:
         request: The incoming HTTP request
-        files: List of uploaded files (expecting one Excel file)
+        files: List of uploaded Excel files, e.g. one per region or wave of a survey
         client: Client identifier
+        tag_source: Whether to store the source file of every respondent
         
     Returns:
         Dictionary with redirect URL to the factor group creation page
         
     Raises:
-        HTTPException: If client is not provided
+        HTTPException: If client is not provided, or 503 when too many uploads are pending
     """
     if client is None:
         raise HTTPException(status_code=400, detail="Client is required")
 
-    # Here we need to simulate a file on the disk
-    with tempfile.NamedTemporaryFile(suffix=".xlsx") as tmp:
-        shutil.copyfileobj(files[0].file, tmp)
-        tmp.seek(0)
-        df = pl.read_excel(tmp.name)  # process_results_file(tmp.name, return_polars=True)
+    # Here we need to simulate the files on the disk, the uploads are gone once the request finished
+    excel_paths = []
+    with stage_duration.time(pipeline="create_task", stage="upload_copy"):
+        for file in files:
+            with tempfile.NamedTemporaryFile(suffix=".xlsx", delete=False) as tmp:
+                shutil.copyfileobj(file.file, tmp)
+                size = tmp.tell()
+            excel_paths.append(tmp.name)
+            upload_size.observe(size)
+            uploaded_bytes.inc(size)
+    file_names = [file.filename or f"file {i + 1}" for i, file in enumerate(files)]
 
     while True:
         task_id = str(uuid.uuid4())
-        path = os.path.join(runs_directory, f"{task_id}.csv")
-        if not os.path.exists(path):
+        # Resolves to a new Arrow run when the task_id is still unused
+        path = run_path(task_id)
+        if not os.path.exists(path) and upload_jobs.get(task_id) is None:
             break
 
-    statements = tuple(s for s in df.columns if s.endswith("*"))
-    statements_mapping = {s: s.removesuffix("*") for s in statements}
+    try:
+        job = upload_jobs.submit(task_id, lambda report: process_upload(excel_paths, file_names, client, task_id, tag_source, report))
+    except RuntimeError as e:
+        for excel_path in excel_paths:
+            os.remove(excel_path)
+        raise HTTPException(status_code=503, detail=str(e))
 
-    df.select(statements).cast(pl.UInt8).rename(statements_mapping).write_csv(path, separator=";")
+    if is_profiling():
+        # The profile of an upload should cover its processing, not just the queueing
+        job.wait()
 
     base_url = str(request.base_url).rstrip('/')
     path = "/creating-factor-groups"
@@ -165,6 +696,31 @@ def create_task(
     return {"redirect_url": f"{base_url}{path}{params}"}
 
 
+@api.get("/job/{task_id}/status")
+def get_job_status(task_id: str) -> dict:
+    """
+    Get the processing status of an uploaded file.
+
+    Args:
+        task_id: Unique identifier for the task
+
+    Returns:
+        dict: task_id, status (queued, processing, done or failed), stage, progress (0-1) and error
+
+    Raises:
+        HTTPException: If there is no job or run for the task
+    """
+    job = upload_jobs.get(task_id)
+    if job is not None:
+        return job.to_dict()
+
+    # Jobs are forgotten after a while, the run itself tells the task is ready
+    if os.path.exists(run_path(task_id)):
+        return {"task_id": task_id, "status": DONE, "stage": "done", "progress": 1.0, "error": None}
+
+    raise HTTPException(status_code=404, detail=f"Task {task_id} not found")
+
+
 @app.get("/creating-factor-groups")
 async def serve_vue_app(request: Request):
     """
@@ -207,39 +763,27 @@ async def get_display_data(request: Request) -> list[DisplayDataResponse]:
 
     if task_id is None or client is None:
         raise HTTPException(status_code=400, detail="Task ID and client are required as query parameters")
-    
-    response = []
-    path = os.path.join(project_directory, "runs", f"{task_id}.csv")
-    columns_in_df = pl.read_csv(path, separator=";").columns
-    
-    statements_data = await get_statements_data(client)
-    
-    # Loop over rows
-    for statement in columns_in_df:
-        row = statements_data.filter(pl.col("Originele statement") == statement)
-
-        # We append the statemnet regardless of whether it is in the database or not
-        if row.is_empty():
-            response.append(DisplayDataResponse(
-                original_statement=statement,
-                aliasses="",
-                factor_groups=-1
-            ))
-            continue
 
-        factor_value = row["Factor"].item()
-        factor_group = int(factor_value[1:]) if factor_value != "" and factor_value is not None else -1
+    # The mapping is shared by the workers for as long as the catalog is fresh
+    key = f"display:{client}:{task_id}"
+    with stage_duration.time(pipeline="get_display_data", stage="shared_cache"):
+        data = await asyncio.to_thread(artifact_cache.get, key)
+    if data is not None:
+        run_index.touch(task_id)
+        return frame_from_bytes(data).to_dicts()
 
-        original_statement = row["Originele statement"].item()
-        alias = row["Aliassen"].item()
-        
-        response.append(DisplayDataResponse(
-            original_statement=original_statement,
-            aliasses=alias,
-            factor_groups=factor_group
-        ))
+    # Only the statement names are needed, which the (smaller) statistics have as well
+    statements = (await asyncio.to_thread(load_task_statistics, task_id)).statements
 
-    return response
+    with stage_duration.time(pipeline="get_display_data", stage="catalog_fetch"):
+        statements_data = await catalog_cache.get(client)
+
+    # We return every statement regardless of whether it is in the database or not
+    with stage_duration.time(pipeline="get_display_data", stage="mapping"):
+        mapped = map_statements_to_catalog(statements, statements_data)
+    await asyncio.to_thread(artifact_cache.set, key, frame_to_bytes(mapped), catalog_cache.ttl)
+
+    return mapped.to_dicts()
 
 
 @api.post("/calculate-cronbach-alpha")
@@ -256,60 +800,735 @@ def calculate_cronbach_alpha_endpoint(data: ScoreCalculationRequest) -> dict[int
         dict[int, float | None]: A dictionary with group indices as keys and Cronbach's alpha values as values
                          Groups with less than 2 statements will have null values
     """
-    path = os.path.join(project_directory, "runs", f"{data.task_id}.csv")
-    df = pl.read_csv(path, separator=";")
+    scores = score_groups(data.task_id, data.groups, data.missing)
+    return {i: alpha for i, (alpha, _) in enumerate(scores)}
+
+
+class GroupScore(BaseModel):
+    """
+    Cronbach's alpha of a group with the number of respondents it is based on.
+
+    Attributes:
+        cronbach_alpha: Cronbach's alpha, null when it can't be calculated
+        n: Effective N; complete rows for listwise deletion, the smallest pair count for pairwise deletion
+    """
+    cronbach_alpha: float | None
+    n: int
+
 
-    new_scores = {}
+@api.post("/calculate-group-scores")
+def calculate_group_scores(data: ScoreCalculationRequest) -> dict[int, GroupScore]:
+    """
+    Calculate Cronbach's alpha and the effective N for all groups.
+    Like `/calculate-cronbach-alpha`, but also reports how many respondents every alpha is based on.
 
+    Args:
+        data: Score calculation request containing task_id, groups and the missing value handling
+
+    Returns:
+        dict[int, GroupScore]: The score per group index
+    """
+    scores = score_groups(data.task_id, data.groups, data.missing)
+    return {i: GroupScore(cronbach_alpha=alpha, n=count) for i, (alpha, count) in enumerate(scores)}
+
+
+class ItemStatistics(BaseModel):
+    """
+    Statistics of one statement within its group.
+
+    Attributes:
+        statement: The (original) statement
+        alpha_if_deleted: Cronbach's alpha of the group without this statement
+        item_total_correlation: Correlation with the total of the other statements in the group
+    """
+    statement: str
+    alpha_if_deleted: float | None
+    item_total_correlation: float | None
+
+
+class GroupItemStatistics(BaseModel):
+    """
+    Item statistics of one group.
+
+    Attributes:
+        cronbach_alpha: Cronbach's alpha of the whole group
+        n: Effective N the statistics are based on
+        items: Statistics per statement, in the order of the request
+    """
+    cronbach_alpha: float | None
+    n: int
+    items: list[ItemStatistics]
+
+
+@api.post("/item-statistics")
+def calculate_item_statistics(data: ScoreCalculationRequest) -> dict[int, GroupItemStatistics]:
+    """
+    Calculate alpha-if-item-deleted and the corrected item-total correlation
+    for every statement of every group in one request.
+    Groups without missing values use the precomputed covariance matrix of the task,
+    the others the covariance matrix of their complete rows (listwise deletion),
+    or the precomputed pairwise covariance matrix when pairwise deletion is requested.
+
+    Args:
+        data: Score calculation request containing task_id, groups and the missing value handling
+
+    Returns:
+        dict[int, GroupItemStatistics]: The item statistics per group index
+    """
+    statistics = load_task_statistics(data.task_id, data.groups)
+
+    result = {}
     for i, statements in enumerate(data.groups):
-        # Check if group has less than 2 statements (source group limitation)
-        if len(statements) < 2:
-            new_scores[i] = None  # Return None for groups with insufficient statements
+        if data.missing == "pairwise":
+            covariance, count = statistics.pairwise_covariance_of(statements)
+        elif statistics.is_complete(statements):
+            covariance, count = statistics.covariance_of(statements), statistics.count
         else:
-            try:
-                new_scores[i] = cronbach_alpha(df.select(statements).to_pandas())
-            except ValueError as e:
-                # Handle cases where calculation fails due to insufficient data
-                print(f"Warning: Could not calculate Cronbach's alpha for group {i}: {e}")
-                new_scores[i] = None
-        
-    return new_scores
+            matrix = load_task(data.task_id)
+            covariance, count = listwise_covariance(matrix, matrix.indices(statements))
+
+        try:
+            alpha = cronbach_alpha_from_covariance(covariance, count)
+            alpha = alpha if np.isfinite(alpha) else None
+        except ValueError:
+            alpha = None
+        alphas_if_deleted, correlations = item_deletion_statistics(covariance, count)
+
+        result[i] = GroupItemStatistics(
+            cronbach_alpha=alpha,
+            n=count,
+            items=[
+                ItemStatistics(statement=statement, alpha_if_deleted=alpha_if_deleted, item_total_correlation=correlation)
+                for statement, alpha_if_deleted, correlation in zip(statements, alphas_if_deleted, correlations)
+            ],
+        )
+
+    return result
+
+
+class SuggestGroupsRequest(BaseModel):
+    """
+    Request model for suggesting factor groups.
+
+    Attributes:
+        task_id: Unique identifier for the task
+        n_groups: Number of groups to divide the statements over
+    """
+    task_id: str
+    n_groups: int = Field(default=4, ge=1)
+
+
+class SuggestedGroup(BaseModel):
+    """
+    A suggested factor group with its Cronbach's alpha.
+
+    Attributes:
+        statements: The (original) statements of the group
+        cronbach_alpha: Cronbach's alpha, null when it can't be calculated
+        n: Effective N (complete rows)
+    """
+    statements: list[str]
+    cronbach_alpha: float | None
+    n: int
+
+
+@api.post("/suggest-groups")
+def suggest_factor_groups(data: SuggestGroupsRequest) -> list[SuggestedGroup]:
+    """
+    Suggest an initial division of the statements over factor groups.
+    Uses the principal components of the cached item correlation matrix (pairwise deletion),
+    rotated with varimax; every statement goes to the component it loads highest on.
+
+    Args:
+        data: SuggestGroupsRequest with the task and the number of groups
+
+    Returns:
+        list[SuggestedGroup]: The statements and Cronbach's alpha per group, strongest component first
+
+    Raises:
+        HTTPException: If there are more groups than statements
+    """
+    statistics = load_task_statistics(data.task_id)
+    if data.n_groups > len(statistics.statements):
+        raise HTTPException(status_code=400, detail=f"Can't divide {len(statistics.statements)} statements over {data.n_groups} groups")
+
+    correlation = correlation_from_covariance(statistics.pairwise_covariance)
+    groups = [
+        [statistics.statements[i] for i in indices]
+        for indices in suggest_groups(correlation, data.n_groups)
+    ]
+    scores = score_groups(data.task_id, groups)
+
+    return [
+        SuggestedGroup(statements=statements, cronbach_alpha=alpha, n=count)
+        for statements, (alpha, count) in zip(groups, scores)
+    ]
+
+
+class BootstrapRequest(BaseModel):
+    """
+    Request model for bootstrap confidence intervals of Cronbach's alpha.
+
+    Attributes:
+        task_id: Unique identifier for the task
+        groups: Every list is a group of statements
+        replicates: Number of bootstrap replicates per group
+        confidence: Confidence level of the (percentile) intervals
+        seed: Seed of the resampling, the same seed gives the same intervals
+    """
+    task_id: str
+    groups: list[list[str]]
+    replicates: int = Field(default=1000, ge=10, le=100_000)
+    confidence: float = Field(default=0.95, gt=0, lt=1)
+    seed: int = 0
+
+
+@api.post("/bootstrap-cronbach-alpha")
+async def bootstrap_cronbach_alpha(data: BootstrapRequest) -> StreamingResponse:
+    """
+    Calculate bootstrap confidence intervals of Cronbach's alpha for every group.
+    Every group is bootstrapped over its complete rows (listwise deletion). The replicates are
+    split in batches with their own seed and fanned out over a process pool.
+
+    The response is streamed as newline-delimited JSON: after every finished batch a line with
+    the interval of the replicates so far, `done` is true on the last line of a group.
+
+    Args:
+        data: BootstrapRequest with the task, groups, number of replicates, confidence and seed
+
+    Returns:
+        StreamingResponse with lines of group, replicates, total, cronbach_alpha, ci_low, ci_high and done
+    """
+    matrix = await asyncio.to_thread(load_task, data.task_id)
+    scores = await asyncio.to_thread(score_groups, data.task_id, data.groups)
+    group_values = {
+        i: matrix.complete_rows(matrix.indices(statements))
+        for i, statements in enumerate(data.groups)
+        if scores[i][0] is not None
+    }
+
+    batch_size = max(RESAMPLE_CHUNK, -(-data.replicates // compute_workers))
+
+    async def run_batch(i: int, seed, size: int) -> tuple[int, np.ndarray]:
+        loop = asyncio.get_running_loop()
+        return i, await loop.run_in_executor(compute_pool, bootstrap_batch, group_values[i], seed, size)
+
+    async def stream():
+        # Groups without an alpha have nothing to bootstrap
+        for i, (alpha, _) in enumerate(scores):
+            if i not in group_values:
+                yield json.dumps({
+                    "group": i, "replicates": 0, "total": 0, "cronbach_alpha": alpha,
+                    "ci_low": None, "ci_high": None, "done": True,
+                }) + "\n"
+
+        batches = {
+            i: split_replicates(data.replicates, batch_size, [data.seed, i]) for i in group_values
+        }
+        results = {i: [] for i in group_values}
+        pending = [asyncio.ensure_future(run_batch(i, seed, size)) for i in batches for seed, size in batches[i]]
+
+        try:
+            for next_batch in asyncio.as_completed(pending):
+                i, alphas = await next_batch
+                results[i].append(alphas)
+                collected = np.concatenate(results[i])
+                ci_low, ci_high = percentile_interval(collected, data.confidence)
+                yield json.dumps({
+                    "group": i,
+                    "replicates": int(collected.size),
+                    "total": data.replicates,
+                    "cronbach_alpha": scores[i][0],
+                    "ci_low": ci_low,
+                    "ci_high": ci_high,
+                    "done": len(results[i]) == len(batches[i]),
+                }) + "\n"
+        finally:
+            # The client went away, don't keep the workers busy
+            for future in pending:
+                future.cancel()
+
+    return StreamingResponse(stream(), media_type="application/x-ndjson")
+
+
+class OptimizeGroupsRequest(BaseModel):
+    """
+    Request model for optimizing the factor groups.
+
+    Attributes:
+        task_id: Unique identifier for the task
+        groups: The current grouping, every list is a group of statements
+        objective: Maximize the sum of the alphas ("total") or the lowest alpha ("minimum")
+        locked: Statements that stay in their group
+        min_group_size: Statements aren't moved out of groups of this size
+        restarts: Number of local searches; the first starts from the current grouping,
+            the others from random variations of it
+        time_budget: Seconds the optimization may take
+        seed: Seed of the random restarts
+        missing: How missing values are handled in the reported scores, like in ScoreCalculationRequest
+    """
+    task_id: str
+    groups: list[list[str]]
+    objective: Literal["total", "minimum"] = "total"
+    locked: list[str] = []
+    min_group_size: int = Field(default=2, ge=1)
+    restarts: int = Field(default=8, ge=1, le=64)
+    time_budget: float = Field(default=5.0, gt=0, le=60)
+    seed: int = 0
+    missing: Literal["listwise", "pairwise"] = "listwise"
+
+
+# Seconds a local search runs in a worker before it reports back
+OPTIMIZER_SLICE = 0.5
+
+
+@api.post("/optimize-groups")
+async def optimize_groups(data: OptimizeGroupsRequest) -> StreamingResponse:
+    """
+    Optimize the grouping for the highest Cronbach's alphas with a local search.
+    Every step takes the best move of one statement or swap of two statements, scored incrementally
+    from the (pairwise deletion) covariance sums of the groups. Restarts run in parallel on the
+    process pool, a search that isn't finished is continued in slices of `OPTIMIZER_SLICE` seconds.
+
+    The response is streamed as newline-delimited JSON: a line for every better grouping found,
+    and a last line with `done` true containing the best grouping. The objective is the one of the
+    search, the scores of the groups are calculated like `/calculate-group-scores` with `missing`,
+    so with listwise deletion they can differ from the pairwise deletion alphas that were optimized.
+
+    Args:
+        data: OptimizeGroupsRequest with the current grouping, objective, constraints and budget
+
+    Returns:
+        StreamingResponse with lines of restart, elapsed, objective, groups, scores and done
+
+    Raises:
+        HTTPException: If a statement is in several groups or a locked statement isn't in any group
+    """
+    statistics = await asyncio.to_thread(load_task_statistics, data.task_id, data.groups)
+
+    statements = [statement for group in data.groups for statement in group]
+    if len(set(statements)) != len(statements):
+        raise HTTPException(status_code=400, detail="A statement can only be in one group")
+    unknown_locked = set(data.locked) - set(statements)
+    if unknown_locked:
+        raise HTTPException(status_code=400, detail=f"Locked statements aren't in any group: {sorted(unknown_locked)}")
+
+    indices = statistics.indices(statements)
+    covariance = np.nan_to_num(statistics.pairwise_covariance[np.ix_(indices, indices)])
+    n_groups = len(data.groups)
+    initial = np.repeat(np.arange(n_groups), [len(group) for group in data.groups])
+    locked = set(data.locked)
+    movable = np.array([statement not in locked for statement in statements], dtype=bool)
+
+    async def report(assignment: np.ndarray, value: float, restart: int | None, elapsed: float, done: bool) -> str:
+        groups = [[] for _ in range(n_groups)]
+        for statement, group in zip(statements, assignment):
+            groups[group].append(statement)
+        scores = await asyncio.to_thread(score_groups, data.task_id, groups, data.missing)
+        return json.dumps({
+            "restart": restart,
+            "elapsed": round(elapsed, 3),
+            "objective": round(value, 3),
+            "groups": groups,
+            "scores": {i: alpha for i, (alpha, _) in enumerate(scores)},
+            "done": done,
+        }) + "\n"
+
+    async def stream():
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        deadline = started + data.time_budget
+        rng = np.random.default_rng(data.seed)
+
+        best_assignment = initial
+        best_value = GroupingState(covariance, initial, n_groups, data.objective).value
+        best_restart = None
+
+        running = {}
+        next_restart = 0
+
+        def search(restart: int, assignment: np.ndarray):
+            time_limit = min(OPTIMIZER_SLICE, deadline - loop.time())
+            future = loop.run_in_executor(
+                compute_pool, local_search,
+                covariance, assignment, n_groups, movable, data.min_group_size, data.objective, time_limit,
+            )
+            running[future] = restart
+
+        def start_restart():
+            nonlocal next_restart
+            start = initial if next_restart == 0 else perturb(
+                initial, n_groups, movable, data.min_group_size, rng, max(1, len(statements) // 4)
+            )
+            search(next_restart, start)
+            next_restart += 1
+
+        while next_restart < min(data.restarts, compute_workers):
+            start_restart()
+
+        try:
+            while running:
+                finished, _ = await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+                for future in finished:
+                    restart = running.pop(future)
+                    assignment, value, converged = future.result()
+
+                    if value > best_value + 1e-9:
+                        best_assignment, best_value, best_restart = assignment, value, restart
+                        yield await report(assignment, value, restart, loop.time() - started, False)
+
+                    if loop.time() >= deadline:
+                        continue
+                    if not converged:
+                        search(restart, assignment)
+                    elif next_restart < data.restarts:
+                        start_restart()
+
+            yield await report(best_assignment, best_value, best_restart, loop.time() - started, True)
+        finally:
+            # The client went away, don't keep the workers busy
+            for future in running:
+                future.cancel()
+
+    return StreamingResponse(stream(), media_type="application/x-ndjson")
+
+
+class ScoringSessionResponse(BaseModel):
+    """
+    Response model for starting a scoring session.
+
+    Attributes:
+        session_id: Unique identifier for the session
+        version: Version of the grouping, to be sent along with the next move
+        scores: Cronbach's alpha per group index
+    """
+    session_id: str
+    version: int
+    scores: dict[int, float | None]
+
+
+@api.post("/scoring-session")
+def start_scoring_session(data: ScoreCalculationRequest) -> ScoringSessionResponse:
+    """
+    Start a server-side scoring session for a grouping.
+    Later moves only send the moved statement instead of every group.
+
+    Args:
+        data: Score calculation request containing task_id and groups
+
+    Returns:
+        ScoringSessionResponse with the session id, version and the alpha of every group
+    """
+    statistics = load_task_statistics(data.task_id)
+    task_id = data.task_id
+
+    try:
+        session = scoring_sessions.create(
+            task_id,
+            statistics,
+            data.groups,
+            score_rows=lambda statements: score_groups_from_rows(task_id, [statements])[0][0],
+        )
+    except KeyError as e:
+        raise HTTPException(status_code=400, detail=f"Unknown statement {e}")
+
+    with session.lock:
+        return ScoringSessionResponse(session_id=session.session_id, version=session.version, scores=session.scores())
+
+
+class MoveStatementRequest(BaseModel):
+    """
+    Request model for moving a statement between the groups of a scoring session.
+
+    Attributes:
+        session_id: Unique identifier for the session
+        version: Version of the session the move is based on
+        statement: The (original) statement being moved
+        source_group: Index of the group the statement is moved from
+        target_group: Index of the group the statement is moved to
+    """
+    session_id: str
+    version: int
+    statement: str
+    source_group: int
+    target_group: int
+
+
+class MoveStatementResponse(BaseModel):
+    """
+    Response model for moving a statement.
+
+    Attributes:
+        version: New version of the session
+        scores: Cronbach's alpha of the source and target group
+    """
+    version: int
+    scores: dict[int, float | None]
+
+
+@api.post("/scoring-session/move")
+def move_statement(data: MoveStatementRequest) -> MoveStatementResponse:
+    """
+    Move a statement to another group and return the new alphas of the two affected groups.
+    Only the running sums of these groups are updated, which takes O(k).
+
+    Args:
+        data: MoveStatementRequest with the session, version and move
+
+    Returns:
+        MoveStatementResponse with the new version and the scores of the source and target group
+
+    Raises:
+        HTTPException: 404 if the session expired, 409 if the version is outdated
+    """
+    session = scoring_sessions.get(data.session_id)
+    if session is None:
+        raise HTTPException(status_code=404, detail=f"Scoring session {data.session_id} not found")
+    # A session in use keeps its run from being cleaned up
+    run_index.touch(session.task_id)
+
+    with session.lock:
+        try:
+            changed = session.move(data.statement, data.source_group, data.target_group, data.version)
+        except VersionConflictError as e:
+            raise HTTPException(status_code=409, detail=str(e))
+        except (ValueError, IndexError) as e:
+            raise HTTPException(status_code=400, detail=str(e))
+
+        return MoveStatementResponse(version=session.version, scores={i: session.score(i) for i in changed})
+
+
+# Seconds a change waits before it's scored, so a burst of drags is scored once
+LIVE_SCORING_DELAY = float(os.getenv("LIVE_SCORING_DELAY", "0.05"))
+
+
+@app.websocket("/ws/task/{task_id}")
+async def live_scoring(websocket: WebSocket, task_id: str):
+    """
+    Live scoring of a grouping over a single connection.
+    The grouping is kept server-side, the client only sends the changes:
+
+        {"type": "init", "groups": [[statement, ...], ...]}
+        {"type": "move", "statement": ..., "source_group": ..., "target_group": ...}
+        {"type": "add", "statement": ..., "group": ...}
+        {"type": "remove", "statement": ..., "group": ...}
+
+    Changes are applied to the running covariance sums right away and the changed groups are
+    scored after `LIVE_SCORING_DELAY`, so a burst of changes is pushed as one message:
+
+        {"type": "scores", "version": ..., "scores": {group: alpha, ...}}
+
+    A score computed for a group that changed again in the meantime is dropped, the group is
+    scored again with the next push. Invalid changes get an {"type": "error", "detail": ...} reply.
+    When scoring fails, e.g. because the run was deleted, the connection is closed with code
+    4000 + the HTTP status code (1011 for unexpected errors).
+
+    Args:
+        websocket: The connection
+        task_id: Unique identifier for the task
+    """
+    global live_connections
+    await websocket.accept()
+    try:
+        statistics = await asyncio.to_thread(load_task_statistics, task_id)
+    except HTTPException as e:
+        await websocket.close(code=4000 + e.status_code, reason=e.detail)
+        return
+
+    def score_rows(statements: list[str]) -> float | None:
+        return score_groups_from_rows(task_id, [statements])[0][0]
+
+    session: ScoringSession | None = None
+    dirty: set[int] = set()
+    changed = asyncio.Event()
+
+    async def close(code: int, reason: str = ""):
+        # The client may have gone already
+        with suppress(RuntimeError, WebSocketDisconnect):
+            await websocket.close(code=code, reason=reason)
+
+    async def push_scores():
+        while True:
+            await changed.wait()
+            await asyncio.sleep(LIVE_SCORING_DELAY)
+            changed.clear()
+
+            current = session
+            pending = sorted(dirty)
+            dirty.clear()
+
+            scores = {}
+            for i in pending:
+                changed_at = current.changed_at[i]
+                if current.needs_rows(i):
+                    alpha = await asyncio.to_thread(score_rows, list(current.groups[i]))
+                else:
+                    alpha = current.score(i)
+                # Drop outdated scores, a newer change of the group is scored with the next push
+                if current is session and current.changed_at[i] == changed_at:
+                    scores[i] = alpha
+            if scores:
+                await websocket.send_json({"type": "scores", "version": current.version, "scores": scores})
+
+    async def score_changes():
+        try:
+            await push_scores()
+        except WebSocketDisconnect:
+            pass
+        except HTTPException as e:
+            await close(4000 + e.status_code, e.detail)
+        except Exception as e:
+            print(f"Error: Live scoring of task {task_id} failed: {e}")
+            await close(1011)
+
+    def apply(message) -> list[int]:
+        nonlocal session
+        if not isinstance(message, dict):
+            raise ValueError("Messages must be JSON objects")
+        kind = message.get("type")
+        if kind == "init":
+            session = ScoringSession(str(uuid.uuid4()), task_id, statistics, message["groups"], score_rows)
+            dirty.clear()
+            return list(range(len(session.groups)))
+        if session is None:
+            raise ValueError("Send the groups (init) first")
+        if kind == "move":
+            return session.move(message["statement"], message["source_group"], message["target_group"])
+        if kind == "add":
+            return session.add(message["statement"], message["group"])
+        if kind == "remove":
+            return session.remove(message["statement"], message["group"])
+        raise ValueError(f"Unknown message type {kind}")
+
+    async def receive_changes():
+        try:
+            while True:
+                text = await websocket.receive_text()
+                run_index.touch(task_id)
+                try:
+                    dirty.update(apply(json.loads(text)))
+                except (KeyError, ValueError, IndexError, TypeError) as e:
+                    await websocket.send_json({"type": "error", "detail": str(e)})
+                    continue
+                changed.set()
+        except WebSocketDisconnect:
+            pass
+
+    # Whichever ends first (the client disconnects, or scoring failed and closed the connection) stops the other
+    tasks = {asyncio.create_task(receive_changes()), asyncio.create_task(score_changes())}
+    live_connections += 1
+    try:
+        done, _ = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+    finally:
+        live_connections -= 1
+        for task in tasks:
+            task.cancel()
+        # Unlike gather, wait doesn't raise when the connection itself is cancelled meanwhile
+        await asyncio.wait(tasks)
+    for task in done:
+        task.result()
 
 
 class DragDropCronbachRequest(BaseModel):
     """
     Request model for calculating Cronbach's alpha with drag-and-drop data.
+    Either the scores themselves are sent (group_data), or the task and the names of the
+    statements in the group, to score the task data on the server without sending it.
     """
-    group_data: list[list[float]]  # 2D array of statement scores
+    group_data: list[list[float | None]] | None = None  # 2D array of statement scores, null when missing
+    task_id: str | None = None
+    statements: list[str] | None = None
     group_index: int
 
+    @model_validator(mode="after")
+    def check_scores_or_statements(self):
+        if (self.group_data is None) == (self.task_id is None or self.statements is None):
+            raise ValueError("Send either group_data, or task_id and statements")
+        return self
+
 
-@api.post("/calculate-cronbach-alpha-dragdrop")
-def calculate_cronbach_alpha_dragdrop(data: DragDropCronbachRequest) -> dict:
+def score_group_data(scores: np.ndarray, group_index: int) -> dict:
+    """Cronbach's alpha of the scores of a group (a column per statement), as the drag-and-drop endpoint returns it."""
+    try:
+        alpha_value = cronbach_alpha(scores)
+    except ValueError as e:
+        print(f"Warning: Could not calculate Cronbach's alpha for group {group_index}: {e}")
+        alpha_value = None
+
+    return {
+        "cronbach_alpha": alpha_value,
+        "group_index": group_index,
+        "num_statements": scores.shape[1],
+        "num_responses": scores.shape[0],
+    }
+
+
+@api.post(
+    "/calculate-cronbach-alpha-dragdrop",
+    openapi_extra={"requestBody": {"content": {
+        "application/json": {"schema": DragDropCronbachRequest.model_json_schema()},
+        **{content_type: {"schema": {"type": "string", "format": "binary"}} for content_type in BINARY_CONTENT_TYPES},
+    }}},
+)
+async def calculate_cronbach_alpha_dragdrop(request: Request, group_index: int | None = None) -> dict:
     """
     Calculate Cronbach's alpha for drag-and-drop data.
-    
+
+    The body is one of:
+        - JSON with group_data (a row of responses per statement) and group_index
+        - JSON with task_id, statements and group_index: the scores are taken from the task data
+        - Raw scores (application/octet-stream), a row of responses per statement, with the
+          `X-Shape: statements,respondents` and `X-Dtype: uint8|float32` headers; missing is 0 or NaN
+        - Arrow IPC (application/vnd.apache.arrow.stream or .file), a column per statement
+    The group index of a binary body is passed as the `group_index` query parameter.
+
     Args:
-        data: DragDropCronbachRequest containing group_data (2D array) and group_index
-        
+        request: The incoming HTTP request
+        group_index: Index of the group, for a binary body
+
     Returns:
-        dict: Cronbach's alpha result with value and group_index
+        dict: Cronbach's alpha (null when it can't be calculated), group_index, num_statements and num_responses
+        (the effective N when scoring task data)
+
+    Raises:
+        HTTPException: 400 for invalid scores or unknown statements, 404 if the task doesn't exist
     """
-    import pandas as pd
-    
-    # Convert the 2D array to a DataFrame where each row is a statement's responses
+    content_type = request.headers.get("content-type", "").split(";")[0].strip().lower()
+    body = await request.body()
+
+    if content_type in BINARY_CONTENT_TYPES:
+        if group_index is None:
+            raise HTTPException(status_code=400, detail="The group_index query parameter is required")
+        try:
+            if content_type == RAW_CONTENT_TYPE:
+                scores = await asyncio.to_thread(decode_raw, body, request.headers.get("x-shape"), request.headers.get("x-dtype"))
+            else:
+                scores = await asyncio.to_thread(decode_arrow, body, content_type)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        return await asyncio.to_thread(score_group_data, scores, group_index)
+
+    try:
+        data = await asyncio.to_thread(DragDropCronbachRequest.model_validate_json, body)
+    except ValidationError as e:
+        raise RequestValidationError(e.errors(include_url=False, include_context=False))
+
+    if data.group_data is None:
+        [(alpha_value, count)] = await asyncio.to_thread(score_groups, data.task_id, [data.statements])
+        return {
+            "cronbach_alpha": alpha_value,
+            "group_index": data.group_index,
+            "num_statements": len(data.statements),
+            "num_responses": count,
+        }
+
+    # Every row of the 2D array is a statement's responses
     # Transpose so each column represents a statement
-    df = pd.DataFrame(data.group_data).T
-    
-    # Calculate Cronbach's alpha
-    alpha_value = cronbach_alpha(df)
-    
-    return {
-        "cronbach_alpha": alpha_value,
-        "group_index": data.group_index,
-        "num_statements": len(data.group_data),
-        "num_responses": len(data.group_data[0]) if data.group_data else 0
-    }
+    try:
+        scores = np.asarray(data.group_data, dtype=np.float64).T if data.group_data else np.empty((0, 0))
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Every statement in group_data needs the same number of responses")
+    return await asyncio.to_thread(score_group_data, scores, data.group_index)
 
 
 class SaveFactorGroupsRequest(BaseModel):
@@ -330,34 +1549,134 @@ class SaveFactorGroupsRequest(BaseModel):
 def save_factor_groups(request: SaveFactorGroupsRequest) -> dict:
     """
     Save the factor groups to the database.
+    Every save is a new version of the grouping of the (client, task), written in one bulk write.
     
     Args:
         request: SaveFactorGroupsRequest containing task_id, client, and four groups
         
     Returns:
-        dict: Success message with details about what was saved
+        dict: Success message with the version and details about what was saved
+
+    Raises:
+        HTTPException: 400 if a statement has no original_statement, 503 if the database is unavailable
     """
-    print(f"Saving factor groups for task_id: {request.task_id}, client: {request.client}")
-    print(f"Number of groups: {len(request.groups)}")
-    
-    # Log the structure of what we're receiving
-    for i, group in enumerate(request.groups):
-        print(f"Group {i+1} has {len(group)} statements:")
-        for statement in group:
-            original = statement.get('original_statement', 'N/A')
-            print(f"  - {original}")
+    from pymongo.errors import PyMongoError
+
+    try:
+        version = get_factor_group_store().save(request.client, request.task_id, request.groups)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except PyMongoError as e:
+        print(f"Error: Could not save the factor groups of task {request.task_id}: {e}")
+        raise HTTPException(status_code=503, detail="The factor groups could not be saved, try again later")
 
     total_statements = sum(len(group) for group in request.groups)
-    
+
     return {
         "message": "Factor groups saved successfully",
         "task_id": request.task_id,
         "client": request.client,
+        "version": version,
         "total_statements": total_statements,
         "groups_count": len(request.groups)
     }
 
 
+@api.post("/admin/catalog-cache/invalidate", dependencies=[Depends(require_admin)])
+async def invalidate_catalog_cache(client: str | None = None) -> dict:
+    """
+    Drop the cached statement catalog of a client, or of all clients when no client is given.
+    The next request fetches the catalog from ArpY again.
+
+    Args:
+        client: Client identifier (optional query parameter)
+
+    Returns:
+        dict: The invalidated client and the cache counters
+    """
+    catalog_cache.invalidate(client)
+    # The display mappings are based on the old catalog
+    await asyncio.to_thread(artifact_cache.delete_matching, f"display:{client if client is not None else '*'}:*")
+    return {"invalidated": client if client is not None else "all", "stats": catalog_cache.stats()}
+
+
+@api.get("/admin/runs", dependencies=[Depends(require_admin)])
+def list_runs() -> list[dict]:
+    """
+    List the runs in the run index, most recently used first.
+
+    Returns:
+        list[dict]: task_id, client, size_bytes, created and last_accessed of every run
+    """
+    run_index.flush()
+    return run_index.runs()
+
+
+@api.get("/admin/cache-stats", dependencies=[Depends(require_admin)])
+def cache_stats() -> dict:
+    """
+    Report the hit rates and sizes of the caches.
+
+    Returns:
+        dict: The counters of the run, statistics, score, catalog and artifact caches. Every cache reports
+        entries, hits, misses, evictions and hit_ratio, followed by counters of its own
+    """
+    return cache_stats_by_name()
+
+
+@api.get("/admin/profiles", dependencies=[Depends(require_admin)])
+def list_request_profiles() -> list[dict]:
+    """
+    List the saved request profiles, newest first.
+
+    Returns:
+        list[dict]: The summary of every profile: request id, method, path, status, duration,
+        peak memory and the top functions and allocation sites
+    """
+    return list_profiles(profiles_directory)
+
+
+@api.get("/admin/profiles/{request_id}", dependencies=[Depends(require_admin)])
+def download_request_profile(request_id: str) -> FileResponse:
+    """
+    Download a request profile in the pstats format, e.g. for `python -m pstats` or snakeviz.
+
+    Args:
+        request_id: The request id of the profile
+
+    Raises:
+        HTTPException: If there is no profile with the request id
+    """
+    path = profile_path(profiles_directory, request_id)
+    if path is None:
+        raise HTTPException(status_code=404, detail=f"Profile {request_id} not found")
+    return FileResponse(path, filename=f"{request_id}.prof")
+
+
+@app.get("/healthz")
+def healthz() -> JSONResponse:
+    """
+    Report whether the application is ready, with the import, startup and warmup timings.
+    Responds 503 until the warmup finished, so new instances only get traffic once warm.
+
+    Returns:
+        JSON with the status, uptime, import_seconds and the startup and warmup timings per stage
+    """
+    return JSONResponse(readiness.to_dict(), status_code=200 if readiness.ready else 503)
+
+
+@app.get("/metrics")
+def get_metrics() -> PlainTextResponse:
+    """
+    Expose the metrics in the Prometheus text format: the latency per route, the stage timings of
+    task creation and the display data, the cache hit ratios, the upload sizes and the task counts.
+
+    Returns:
+        The metrics as plain text
+    """
+    return PlainTextResponse(metrics.render(), media_type=METRICS_CONTENT_TYPE)
+
+
 app.include_router(api)
 
 if __name__ == "__main__":
@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Benchmark the vectorized batch scoring kernel against the per-group `cronbach_alpha`.
+
+Usage (from the project directory):
+    python benchmarks/bench_scoring_kernel.py --respondents 5000 --statements 1000 --groups 200
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import polars as pl
+
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "backend"))
+
+from functions.scoreCalculating import cronbach_alpha, cronbach_alpha_batch
+from functions.taskMatrix import TaskMatrix
+
+
+def make_scores(respondents: int, statements: int, missing: float, seed: int) -> pl.DataFrame:
+    """Random Likert scores (1-5) as UInt8 columns, with a fraction of missing values."""
+    rng = np.random.default_rng(seed)
+    factor = rng.normal(size=(respondents, 1))
+    scores = np.clip(np.round(3 + factor + rng.normal(size=(respondents, statements))), 1, 5)
+
+    columns = {}
+    for i in range(statements):
+        column = pl.Series(f"Statement {i}", scores[:, i]).cast(pl.UInt8)
+        if missing:
+            column = column.scatter(np.flatnonzero(rng.random(respondents) < missing), None)
+        columns[column.name] = column
+    return pl.DataFrame(columns)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--respondents", type=int, default=5000)
+    parser.add_argument("--statements", type=int, default=1000)
+    parser.add_argument("--groups", type=int, default=200)
+    parser.add_argument("--missing", type=float, default=0.02, help="Fraction of missing values")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    df = make_scores(args.respondents, args.statements, args.missing, args.seed)
+    rng = np.random.default_rng(args.seed)
+    groups = [
+        sorted(rng.choice(args.statements, size=int(rng.integers(2, 30)), replace=False).tolist())
+        for _ in range(args.groups)
+    ]
+
+    start = time.perf_counter()
+    reference = []
+    for indices in groups:
+        try:
+            reference.append(cronbach_alpha(df.select([df.columns[i] for i in indices]).to_pandas()))
+        except ValueError:
+            reference.append(None)
+    pandas_seconds = time.perf_counter() - start
+
+    # The matrix is built once per task and kept in the task cache
+    matrix = TaskMatrix.from_frame(df)
+
+    start = time.perf_counter()
+    batch, _ = cronbach_alpha_batch(matrix, groups)
+    batch_seconds = time.perf_counter() - start
+
+    mismatches = sum(
+        1 for a, b in zip(reference, batch)
+        if (a is None) != (b is None) or (a is not None and abs(a - b) > 1e-3)
+    )
+
+    print(f"{args.groups} groups, {args.respondents} respondents x {args.statements} statements")
+    print(f"  cronbach_alpha (per group):         {pandas_seconds * 1000:9.1f} ms")
+    print(f"  cronbach_alpha_batch (one pass):    {batch_seconds * 1000:9.1f} ms")
+    print(f"  speedup: {pandas_seconds / batch_seconds:.1f}x, mismatches: {mismatches}")
+    pandas_bytes = df.to_pandas().memory_usage(deep=True).sum()
+    print(f"  memory: TaskMatrix {matrix.nbytes / 1e6:.1f} MB, pandas float64 {pandas_bytes / 1e6:.1f} MB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+Benchmark the cold start of the backend: every run starts a fresh interpreter, imports `main`,
+starts the application and polls `/healthz` until the warmup finished. Reports the import time,
+the time until ready and which heavy dependencies were loaded by the import.
+
+Usage (from the project directory):
+    python benchmarks/bench_startup.py --runs 5
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+project_directory = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Dependencies the import of `main` should not load, they're imported on first use
+DEFERRED = ("pandas", "pymongo", "uvicorn", "fastexcel")
+
+# Runs in the fresh interpreter, prints the measurements as JSON
+CHILD = """
+import json, os, sys, time
+start = time.perf_counter()
+sys.path[:0] = [{benchmarks!r}, {backend!r}]
+from fake_arpy import FakeStatementsFetcher, install_fake_arpy
+install_fake_arpy(FakeStatementsFetcher())
+os.chdir({project!r})
+
+import main
+imported = time.perf_counter() - start
+loaded = [name for name in {deferred!r} if name in sys.modules]
+
+from fastapi.testclient import TestClient
+with TestClient(main.app) as client:
+    while client.get("/healthz").status_code != 200:
+        time.sleep(0.001)
+    ready = time.perf_counter() - start
+    report = client.get("/healthz").json()
+
+print(json.dumps({{"import_seconds": imported, "ready_seconds": ready, "loaded": loaded, "healthz": report}}))
+"""
+
+
+def start_once() -> dict:
+    code = CHILD.format(
+        benchmarks=os.path.join(project_directory, "benchmarks"),
+        backend=os.path.join(project_directory, "backend"),
+        project=project_directory,
+        deferred=DEFERRED,
+    )
+    result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    runs = [start_once() for _ in range(args.runs)]
+
+    print(f"{args.runs} cold starts")
+    print(f"  import main:    median {statistics.median(r['import_seconds'] for r in runs) * 1000:8.1f} ms")
+    print(f"  until ready:    median {statistics.median(r['ready_seconds'] for r in runs) * 1000:8.1f} ms")
+    warmup = runs[-1]["healthz"]["warmup"]
+    for step, seconds in warmup.items():
+        print(f"    warmup {step:<20} {seconds * 1000:8.1f} ms")
+    loaded = sorted({name for r in runs for name in r["loaded"]})
+    print(f"  deferred dependencies loaded by the import: {', '.join(loaded) or 'none'}")
+    if loaded:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+"""
+Offline stand-in for ArpY's `get_statements_data`, so the backend can be imported and
+benchmarked without the ArpY package or the internal data fetcher.
+"""
+
+import asyncio
+import sys
+import types
+
+import polars as pl
+
+DATA_FETCHER_MODULE = "ArpY.rainbow.project.data_fetcher"
+
+
+class FakeStatementsFetcher:
+    """Returns a fixed statement catalog per client, after an optional delay like the real fetcher.
+
+    The upstream calls are counted in `calls`; set `fail` to make the calls fail like an unreachable fetcher.
+
+    Args:
+        catalogs (dict[str, pl.DataFrame]): Catalog per client; unknown clients get an empty catalog.
+        delay (float): Seconds every call takes.
+        fail (bool): Whether the calls raise a ConnectionError.
+    """
+
+    def __init__(self, catalogs: dict[str, pl.DataFrame] | None = None, delay: float = 0.0, fail: bool = False):
+        self.catalogs = catalogs if catalogs is not None else {}
+        self.delay = delay
+        self.fail = fail
+        self.calls = 0
+
+    async def __call__(self, client: str) -> pl.DataFrame:
+        self.calls += 1
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        if self.fail:
+            raise ConnectionError("data fetcher unavailable")
+        return self.catalogs.get(client, pl.DataFrame(
+            {"Originele statement": [], "Aliassen": [], "Factor": []},
+            schema={"Originele statement": pl.String, "Aliassen": pl.String, "Factor": pl.String},
+        ))
+
+
+def install_fake_arpy(fetcher: FakeStatementsFetcher) -> FakeStatementsFetcher:
+    """Register the fetcher as `ArpY.rainbow.project.data_fetcher.get_statements_data` in sys.modules.
+
+    Must be called before the backend (`main`) is imported.
+    """
+    parts = DATA_FETCHER_MODULE.split(".")
+    for i in range(1, len(parts) + 1):
+        name = ".".join(parts[:i])
+        module = sys.modules.get(name)
+        if module is None:
+            module = types.ModuleType(name)
+            module.__path__ = []
+            sys.modules[name] = module
+        if i > 1:
+            setattr(sys.modules[".".join(parts[:i - 1])], parts[i - 1], module)
+
+    sys.modules[DATA_FETCHER_MODULE].get_statements_data = fetcher
+    return fetcher
@@ -0,0 +1,253 @@
+#!/usr/bin/env python3
+"""
+Benchmark suite of the backend: `cronbach_alpha`, task creation (Excel parse and run write),
+`get_display_data` and the scoring endpoints. Everything runs in-process through a test client,
+on a synthetic survey and with an offline stand-in for ArpY's `get_statements_data`.
+
+The results are written as JSON, compare two runs to spot regressions between commits.
+
+Usage (from the project directory):
+    python benchmarks/run_benchmarks.py --respondents 5000 --items 200 --factors 8 --missing 0.02
+    python benchmarks/run_benchmarks.py --compare benchmarks/results/<baseline>.json
+"""
+
+import argparse
+import datetime
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+project_directory = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(os.path.join(project_directory, "backend"))
+
+from fake_arpy import FakeStatementsFetcher, install_fake_arpy
+from synthetic_survey import factor_groups, generate_catalog, generate_survey, write_survey
+
+CLIENT = "Benchmark"
+
+
+def measure(name: str, function, repeat: int, results: dict, setup=None):
+    """Time `function` `repeat` times (after `setup`, which isn't timed) and add the summary to the results."""
+    timings = []
+    for _ in range(repeat):
+        if setup is not None:
+            setup()
+        start = time.perf_counter()
+        function()
+        timings.append((time.perf_counter() - start) * 1000)
+
+    results[name] = {
+        "repeat": repeat,
+        "min_ms": min(timings),
+        "median_ms": statistics.median(timings),
+        "mean_ms": statistics.fmean(timings),
+        "max_ms": max(timings),
+    }
+    print(f"  {name:<45} median {results[name]['median_ms']:10.2f} ms   min {results[name]['min_ms']:10.2f} ms")
+
+
+def git_commit() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=project_directory, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def create_task(client, path: str) -> str:
+    """Upload a survey and wait until it is processed, returns the task id."""
+    with open(path, "rb") as file:
+        response = client.post("/api/job/create", files={"files": file}, data={"client": CLIENT})
+    response.raise_for_status()
+    task_id = response.json()["redirect_url"].split("task_id=")[1].split("&")[0]
+
+    while True:
+        status = client.get(f"/api/job/{task_id}/status").json()
+        if status["status"] == "done":
+            return task_id
+        if status["status"] == "failed":
+            raise RuntimeError(f"Processing the upload failed: {status['error']}")
+        time.sleep(0.001)
+
+
+def run(args) -> dict:
+    fetcher = install_fake_arpy(FakeStatementsFetcher({CLIENT: generate_catalog(args.items, args.factors)}, delay=args.fetch_delay))
+
+    # The backend mounts its static directories relative to the project directory
+    os.chdir(project_directory)
+    import main
+    from fastapi.testclient import TestClient
+    from functions.runStorage import write_run
+    from functions.scoreCalculating import cronbach_alpha, cronbach_alpha_batch
+    from functions.taskMatrix import TaskMatrix
+    from functions.uploading import read_statement_columns
+
+    survey = generate_survey(args.respondents, args.items, args.factors, args.missing, seed=args.seed)
+    groups = factor_groups(args.items, args.factors)
+    results = {}
+    created = []
+
+    with tempfile.TemporaryDirectory() as directory, TestClient(main.app) as client:
+        excel_path = write_survey(survey, os.path.join(directory, "survey.xlsx"))
+        print(f"Survey: {args.respondents} respondents x {args.items} statements, {args.factors} factors, "
+              f"{args.missing:.0%} missing")
+
+        # Task creation
+        parsed = read_statement_columns(excel_path)
+        measure("create_task/parse_excel", lambda: read_statement_columns(excel_path), args.repeat, results)
+        run_path = os.path.join(directory, "run.arrow")
+        measure("create_task/write_run", lambda: write_run(parsed, run_path), args.repeat, results)
+        measure("create_task/upload_to_done", lambda: created.append(create_task(client, excel_path)), args.repeat, results)
+        task_id = created[0]
+
+        # Scoring functions
+        frame = main.read_run(main.run_path(task_id))
+        group_frames = [frame.select(group).to_pandas() for group in groups]
+        measure("cronbach_alpha/pandas_per_group", lambda: [cronbach_alpha(df) for df in group_frames], args.repeat, results)
+        matrix = TaskMatrix.from_frame(frame)
+        indices = [matrix.indices(group) for group in groups]
+        measure("cronbach_alpha/batch_kernel", lambda: cronbach_alpha_batch(matrix, indices), args.repeat, results)
+
+        # Display data, with a cold and a warm catalog cache
+        def get_display_data():
+            client.get("/api/get-display-data", params={"task_id": task_id, "client": CLIENT}).raise_for_status()
+
+        def clear_display_caches():
+            main.catalog_cache.invalidate()
+            main.artifact_cache.delete_matching("display:*")
+
+        measure("get_display_data/cold", get_display_data, args.repeat, results, setup=clear_display_caches)
+        measure("get_display_data/warm", get_display_data, args.repeat, results)
+
+        # Scoring endpoints, without and with the score memo
+        def post(endpoint: str, body: dict):
+            return lambda: client.post(endpoint, json=body).raise_for_status()
+
+        scoring = {"task_id": task_id, "groups": groups}
+        endpoints = {
+            "calculate_cronbach_alpha": post("/api/calculate-cronbach-alpha", scoring),
+            "calculate_group_scores/listwise": post("/api/calculate-group-scores", scoring),
+            "calculate_group_scores/pairwise": post("/api/calculate-group-scores", {**scoring, "missing": "pairwise"}),
+            "item_statistics": post("/api/item-statistics", scoring),
+        }
+        for name, request in endpoints.items():
+            measure(f"{name}/cold", request, args.repeat, results, setup=main.score_memo.invalidate)
+        measure("calculate_cronbach_alpha/memo", endpoints["calculate_cronbach_alpha"], args.repeat, results)
+
+        # Drag-and-drop scoring of the first group: JSON scores, raw uint8 scores and statement names
+        group = frame.select(groups[0])
+        measure("dragdrop/json", post("/api/calculate-cronbach-alpha-dragdrop", {
+            "group_data": [group[statement].to_list() for statement in groups[0]], "group_index": 0,
+        }), args.repeat, results)
+        raw = group.fill_null(0).to_numpy().T.copy().tobytes()
+        measure("dragdrop/raw_uint8", lambda: client.post(
+            "/api/calculate-cronbach-alpha-dragdrop", params={"group_index": 0}, content=raw, headers={
+                "Content-Type": "application/octet-stream", "X-Shape": f"{group.width},{group.height}", "X-Dtype": "uint8",
+            },
+        ).raise_for_status(), args.repeat, results)
+        measure("dragdrop/statement_names", post("/api/calculate-cronbach-alpha-dragdrop", {
+            "task_id": task_id, "statements": groups[0], "group_index": 0,
+        }), args.repeat, results, setup=main.score_memo.invalidate)
+
+        session = client.post("/api/scoring-session", json=scoring).json()
+        measure("scoring_session/start", post("/api/scoring-session", scoring), args.repeat, results)
+
+        moves = {"version": session["version"]}
+
+        def move():
+            # Move the first statement of group 0 back and forth between group 0 and 1
+            source, target = (0, 1) if moves["version"] % 2 == 0 else (1, 0)
+            response = client.post("/api/scoring-session/move", json={
+                "session_id": session["session_id"],
+                "version": moves["version"],
+                "statement": groups[0][0],
+                "source_group": source,
+                "target_group": target,
+            })
+            response.raise_for_status()
+            moves["version"] = response.json()["version"]
+
+        measure("scoring_session/move", move, args.repeat, results)
+
+        for task in created:
+            main.delete_run(task)
+
+    return {
+        "commit": git_commit(),
+        "timestamp": datetime.datetime.now(datetime.timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "parameters": {
+            "respondents": args.respondents,
+            "items": args.items,
+            "factors": args.factors,
+            "missing": args.missing,
+            "repeat": args.repeat,
+            "fetch_delay": args.fetch_delay,
+            "seed": args.seed,
+        },
+        "catalog_fetches": fetcher.calls,
+        "results": results,
+    }
+
+
+def compare(baseline: dict, current: dict, threshold: float) -> list[str]:
+    """Print the median of every benchmark against the baseline, return the regressed benchmarks."""
+    ignored = ("repeat",)
+    if {k: v for k, v in baseline["parameters"].items() if k not in ignored} != \
+            {k: v for k, v in current["parameters"].items() if k not in ignored}:
+        print("Warning: The baseline was run with other parameters")
+
+    print(f"\nCompared with {baseline.get('commit')} ({baseline.get('timestamp')}):")
+    regressions = []
+    for name, result in current["results"].items():
+        if name not in baseline["results"]:
+            continue
+        ratio = result["median_ms"] / baseline["results"][name]["median_ms"]
+        marker = "  REGRESSION" if ratio > threshold else ""
+        print(f"  {name:<45} {baseline['results'][name]['median_ms']:10.2f} -> {result['median_ms']:10.2f} ms  "
+              f"x{ratio:.2f}{marker}")
+        if ratio > threshold:
+            regressions.append(name)
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--respondents", type=int, default=2000)
+    parser.add_argument("--items", type=int, default=40)
+    parser.add_argument("--factors", type=int, default=4)
+    parser.add_argument("--missing", type=float, default=0.02, help="Fraction of missing answers")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--fetch-delay", type=float, default=0.05, help="Seconds the fake catalog fetch takes")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="Path of the JSON results (default: benchmarks/results/<commit>.json)")
+    parser.add_argument("--compare", help="JSON results of a baseline run to compare with")
+    parser.add_argument("--threshold", type=float, default=1.2, help="Slowdown ratio counted as a regression")
+    args = parser.parse_args()
+
+    report = run(args)
+
+    output = args.output or os.path.join(
+        project_directory, "benchmarks", "results", f"{report['commit'] or 'results'}.json"
+    )
+    os.makedirs(os.path.dirname(output), exist_ok=True)
+    with open(output, "w") as file:
+        json.dump(report, file, indent=2)
+    print(f"\nResults written to {output}")
+
+    if args.compare:
+        with open(args.compare) as file:
+            regressions = compare(json.load(file), report, args.threshold)
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+"""
+Synthetic Likert surveys with a known factor structure, for the benchmarks and tests.
+
+Every respondent has a score on each factor, every statement loads on one factor;
+answers are the rounded factor score plus noise, clipped to the 1-5 scale.
+"""
+
+import numpy as np
+import polars as pl
+
+
+def generate_survey(
+    respondents: int = 2000,
+    items: int = 40,
+    factors: int = 4,
+    missing: float = 0.0,
+    loading: float = 1.0,
+    seed: int = 0,
+) -> pl.DataFrame:
+    """Generate the answers of a survey as UInt8 columns named like the upload columns ("Statement i*").
+
+    Args:
+      respondents (int): Number of respondents (rows).
+      items (int): Number of statements.
+      factors (int): Number of factors the statements are divided over.
+      missing (float): Fraction of answers that is missing, at random.
+      loading (float): Weight of the factor in the answers; higher means more correlated statements.
+      seed (int): Seed of the random generator.
+
+    Returns:
+        (pl.DataFrame): The answers, one column per statement, plus a non-statement "Respondent" column.
+    """
+    rng = np.random.default_rng(seed)
+    factor_scores = rng.normal(size=(respondents, factors))
+    item_factors = np.arange(items) % factors
+    answers = np.clip(np.round(3 + loading * factor_scores[:, item_factors] + rng.normal(size=(respondents, items))), 1, 5)
+
+    columns = {"Respondent": np.arange(respondents)}
+    for i in range(items):
+        column = pl.Series(f"Statement {i}*", answers[:, i]).cast(pl.UInt8)
+        if missing:
+            column = column.scatter(np.flatnonzero(rng.random(respondents) < missing), None)
+        columns[column.name] = column
+    return pl.DataFrame(columns)
+
+
+def factor_groups(items: int, factors: int) -> list[list[str]]:
+    """The statements of every factor of a generated survey, as the scoring endpoints expect them."""
+    return [[f"Statement {i}" for i in range(factor, items, factors)] for factor in range(factors)]
+
+
+def generate_catalog(items: int, factors: int) -> pl.DataFrame:
+    """Statement catalog of a generated survey, shaped like ArpY's `get_statements_data` result."""
+    return pl.DataFrame({
+        "Originele statement": [f"Statement {i}" for i in range(items)],
+        "Aliassen": [f"Alias {i}" for i in range(items)],
+        "Factor": [f"F{i % factors + 1}" for i in range(items)],
+    })
+
+
+def write_survey(df: pl.DataFrame, path: str) -> str:
+    """Write a generated survey as an Excel upload."""
+    df.write_excel(path)
+    return path
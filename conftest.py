@@ -0,0 +1,60 @@
+"""
+Fixtures for the tests of the backend endpoints, which run in-process through a test client
+with the offline ArpY stand-in of the benchmarks, like `benchmarks/run_benchmarks.py`
+"""
+
+import os
+import sys
+
+import numpy as np
+import pytest
+
+project_directory = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(os.path.join(project_directory, "backend"))
+sys.path.append(os.path.join(project_directory, "benchmarks"))
+
+from fake_arpy import FakeStatementsFetcher, install_fake_arpy
+from synthetic_survey import generate_catalog, generate_survey, write_survey
+
+CLIENT = "Test"
+ITEMS = 12
+FACTORS = 3
+# Statements with missing values, so some groups are scored from the covariance and others from the rows
+INCOMPLETE = ["Statement 0*", "Statement 4*"]
+
+
+@pytest.fixture(scope="session")
+def backend():
+    """The backend module; imported once, from the project directory it mounts its static files from."""
+    install_fake_arpy(FakeStatementsFetcher({CLIENT: generate_catalog(ITEMS, FACTORS)}))
+    os.chdir(project_directory)
+    import main
+    return main
+
+
+@pytest.fixture(scope="session")
+def client(backend):
+    from fastapi.testclient import TestClient
+
+    with TestClient(backend.app) as client:
+        yield client
+
+
+@pytest.fixture(scope="session")
+def task_id(backend, client, tmp_path_factory):
+    """A processed upload of a synthetic survey, deleted again after the tests."""
+    survey = generate_survey(respondents=600, items=ITEMS, factors=FACTORS, seed=11)
+    rng = np.random.default_rng(12)
+    for name in INCOMPLETE:
+        survey = survey.with_columns(survey[name].scatter(np.flatnonzero(rng.random(survey.height) < 0.1), None))
+    path = write_survey(survey, str(tmp_path_factory.mktemp("upload") / "survey.xlsx"))
+
+    with open(path, "rb") as file:
+        response = client.post("/api/job/create", files={"files": file}, data={"client": CLIENT})
+    response.raise_for_status()
+    task_id = response.json()["redirect_url"].split("task_id=")[1].split("&")[0]
+    assert backend.upload_jobs.get(task_id).wait(30)
+    assert client.get(f"/api/job/{task_id}/status").json()["status"] == "done"
+
+    yield task_id
+    backend.delete_run(task_id)
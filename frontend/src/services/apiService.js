@@ -14,7 +14,10 @@
  * 
  * Available Operations:
  * - Calculate Cronbach's alpha reliability for factor groups
- * - Upload and process data files
+ * - Incrementally rescore groups when a statement is moved
+ * - Suggest an initial division of the statements over factor groups
+ * - Live scoring of drag and drop changes over a single WebSocket connection
+ * - Upload and process data files, and follow their background processing
  * - Retrieve display data for factor analysis
  * - Save factor group configurations
  * - Get factorization results (future implementation)
@@ -91,18 +94,146 @@ class ApiService {
   }
 
   /**
-   * Upload files (existing functionality)
-   * @param {FormData} formData - Form data containing files
-   * @returns {Promise<object>} - Upload result
+   * Start a server-side scoring session for the current grouping
+   * @param {string} taskId - Task ID
+   * @param {Array<Array<string>>} groups - Array of groups with statement names
+   * @returns {Promise<object>} - Session id, version and the scores of all groups
+   */
+  async startScoringSession(taskId, groups) {
+    return this.makeRequest('/api/scoring-session', {
+      method: 'POST',
+      body: JSON.stringify({
+        task_id: taskId,
+        groups: groups
+      })
+    });
+  }
+
+  /**
+   * Move a statement between groups of a scoring session
+   * @param {string} sessionId - Scoring session ID
+   * @param {number} version - Session version the move is based on
+   * @param {string} statement - Original statement being moved
+   * @param {number} sourceGroup - Index of the group the statement leaves
+   * @param {number} targetGroup - Index of the group the statement joins
+   * @returns {Promise<object>} - New version and the scores of the two affected groups
+   */
+  async moveStatement(sessionId, version, statement, sourceGroup, targetGroup) {
+    return this.makeRequest('/api/scoring-session/move', {
+      method: 'POST',
+      body: JSON.stringify({
+        session_id: sessionId,
+        version: version,
+        statement: statement,
+        source_group: sourceGroup,
+        target_group: targetGroup
+      })
+    });
+  }
+
+  /**
+   * Open a live scoring connection for a task, the grouping is kept server-side
+   * and only the changes are sent. Bursts of changes are scored together.
+   * @param {string} taskId - Task ID
+   * @param {function} onScores - Called with the version and the scores of the changed groups
+   * @param {function} onOpen - Called when the connection is ready
+   * @returns {object} - Connection with init, move, add, remove and close; these return false when not connected
+   */
+  openLiveScoring(taskId, onScores, onOpen = () => {}) {
+    const url = `${this.baseURL.replace(/^http/, 'ws')}/ws/task/${encodeURIComponent(taskId)}`;
+    const socket = new WebSocket(url);
+
+    const send = (message) => {
+      if (socket.readyState !== WebSocket.OPEN) {
+        return false;
+      }
+      socket.send(JSON.stringify(message));
+      return true;
+    };
+
+    socket.addEventListener('open', onOpen);
+    socket.addEventListener('message', (event) => {
+      const message = JSON.parse(event.data);
+      if (message.type === 'scores') {
+        onScores(message.version, message.scores);
+      } else if (message.type === 'error') {
+        console.warn('Live scoring error:', message.detail);
+      }
+    });
+    socket.addEventListener('close', (event) => {
+      console.log(`Live scoring connection closed (${event.code})`);
+    });
+
+    return {
+      init: (groups) => send({ type: 'init', groups }),
+      move: (statement, sourceGroup, targetGroup) => send({
+        type: 'move', statement, source_group: sourceGroup, target_group: targetGroup
+      }),
+      add: (statement, group) => send({ type: 'add', statement, group }),
+      remove: (statement, group) => send({ type: 'remove', statement, group }),
+      close: () => socket.close()
+    };
+  }
+
+  /**
+   * Suggest an initial division of the statements over factor groups
+   * @param {string} taskId - Task ID
+   * @param {number} nGroups - Number of groups
+   * @returns {Promise<Array<object>>} - Statements, Cronbach's alpha and N per suggested group
+   */
+  async suggestGroups(taskId, nGroups) {
+    return this.makeRequest('/api/suggest-groups', {
+      method: 'POST',
+      body: JSON.stringify({
+        task_id: taskId,
+        n_groups: nGroups
+      })
+    });
+  }
+
+  /**
+   * Upload one or more Excel files, which are combined into a single task
+   * @param {FormData} formData - Form data containing files, client and optionally tag_source
+   * @returns {Promise<object>} - Upload result with the redirect URL
    */
   async uploadFiles(formData) {
-    return this.makeRequest('/databaseCombiner/api/job/create', {
+    return this.makeRequest('/api/job/create', {
       method: 'POST',
       body: formData,
       headers: {} // Don't set Content-Type for FormData, let browser set it
     });
   }
 
+  /**
+   * Get the processing status of an uploaded file
+   * @param {string} taskId - Task ID
+   * @returns {Promise<object>} - Status (queued, processing, done or failed), stage, progress and error
+   */
+  async getJobStatus(taskId) {
+    return this.makeRequest(`/api/job/${taskId}/status`, {
+      method: 'GET'
+    });
+  }
+
+  /**
+   * Wait until the uploaded file of a task has been processed
+   * @param {string} taskId - Task ID
+   * @param {number} interval - Milliseconds between the status checks
+   * @returns {Promise<object>} - The final job status
+   */
+  async waitForJob(taskId, interval = 500) {
+    for (;;) {
+      const status = await this.getJobStatus(taskId);
+      if (status.status === 'done') {
+        return status;
+      }
+      if (status.status === 'failed') {
+        throw new Error(status.error || 'Processing the upload failed');
+      }
+      await new Promise(resolve => setTimeout(resolve, interval));
+    }
+  }
+
   /**
    * Get factorization data (placeholder for future implementation)
    * @param {string} id - Job/analysis ID
@@ -153,7 +284,13 @@ export default apiService;
 // Named exports for convenience
 export const {
   calculateCronbachAlpha,
+  startScoringSession,
+  moveStatement,
+  openLiveScoring,
+  suggestGroups,
   uploadFiles,
+  getJobStatus,
+  waitForJob,
   getFactorization,
   healthCheck,
   getDisplayData,
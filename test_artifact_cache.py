@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+Tests for the shared artifact cache, using fakeredis as a local stand-in for the Redis server
+"""
+
+import io
+import os
+import sys
+import time
+
+import fakeredis
+import numpy as np
+import polars as pl
+import pytest
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "backend"))
+
+from functions.artifactCache import ArtifactCache, RedisArtifactCache, frame_from_bytes, frame_to_bytes
+from functions.taskStatistics import TaskStatistics
+
+
+class UnavailableRedis:
+    """Stand-in for a Redis server that can't be reached"""
+
+    def __getattr__(self, name):
+        def fail(*args, **kwargs):
+            raise ConnectionError("redis unavailable")
+        return fail
+
+
+def make_statistics(missing=False):
+    rng = np.random.default_rng(0)
+    values = rng.integers(1, 6, size=(200, 5)).astype(float)
+    if missing:
+        values[rng.random(values.shape) < 0.1] = np.nan
+    df = pl.DataFrame({f"Statement {i}": values[:, i] for i in range(values.shape[1])}).fill_nan(None).cast(pl.UInt8)
+    return TaskStatistics.from_frame(df)
+
+
+@pytest.fixture
+def server():
+    return fakeredis.FakeServer()
+
+
+def test_workers_share_artifacts(server):
+    # Two workers, each with their own client of the same server
+    first = RedisArtifactCache(fakeredis.FakeRedis(server=server))
+    second = RedisArtifactCache(fakeredis.FakeRedis(server=server))
+
+    first.set("statistics:task", b"artifact")
+
+    assert second.get("statistics:task") == b"artifact"
+    assert second.stats()["hits"] == 1
+
+
+@pytest.mark.parametrize("missing", [False, True])
+def test_statistics_round_trip(server, missing):
+    cache = RedisArtifactCache(fakeredis.FakeRedis(server=server))
+    statistics = make_statistics(missing)
+
+    cache.set("statistics:task", statistics.to_bytes())
+    restored = TaskStatistics.from_bytes(cache.get("statistics:task"))
+
+    assert restored.statements == statistics.statements
+    assert restored.count == statistics.count
+    np.testing.assert_array_equal(restored.covariance, statistics.covariance)
+    np.testing.assert_array_equal(restored.pairwise_covariance, statistics.pairwise_covariance)
+    np.testing.assert_array_equal(restored.pairwise_counts, statistics.pairwise_counts)
+    # Without missing values the pairwise statistics aren't stored, but follow from the covariance and count
+    assert (restored.pairwise_covariance is restored.covariance) == (not missing)
+    with np.load(io.BytesIO(statistics.to_bytes())) as arrays:
+        assert ("pairwise_counts" in arrays) == missing
+
+
+def test_frame_round_trip():
+    df = pl.DataFrame({"original_statement": ["a", "b"], "aliasses": ["", "B"], "factor_groups": [-1, 2]})
+
+    assert frame_from_bytes(frame_to_bytes(df)).equals(df)
+
+
+def test_artifacts_expire(server):
+    cache = RedisArtifactCache(fakeredis.FakeRedis(server=server), default_ttl=0.05)
+    cache.set("statistics:task", b"artifact")
+    cache.set("display:PPG:task", b"mapping", ttl=60)
+
+    time.sleep(0.1)
+
+    assert cache.get("statistics:task") is None
+    assert cache.get("display:PPG:task") == b"mapping"
+
+
+def test_invalidate_task_drops_only_its_artifacts(server):
+    cache = RedisArtifactCache(fakeredis.FakeRedis(server=server))
+    cache.set("statistics:v2:task", b"1")
+    cache.set("display:PPG:task", b"2")
+    cache.set("display:PPG:other", b"3")
+
+    cache.invalidate_task("task")
+
+    assert cache.get("statistics:v2:task") is None
+    assert cache.get("display:PPG:task") is None
+    assert cache.get("display:PPG:other") == b"3"
+
+
+def test_keys_are_prefixed(server):
+    redis = fakeredis.FakeRedis(server=server)
+    RedisArtifactCache(redis, prefix="cronbach:").set("statistics:task", b"artifact")
+
+    assert redis.keys() == [b"cronbach:statistics:task"]
+
+
+def test_unavailable_redis_is_a_miss():
+    cache = RedisArtifactCache(UnavailableRedis())
+
+    cache.set("statistics:task", b"artifact")
+    cache.invalidate_task("task")
+
+    assert cache.get("statistics:task") is None
+    assert cache.stats()["errors"] == 3
+
+
+def test_default_backend_caches_nothing():
+    cache = ArtifactCache()
+    cache.set("statistics:task", b"artifact")
+
+    assert cache.get("statistics:task") is None
+
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([__file__, "-v"]))
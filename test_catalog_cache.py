@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+"""
+Tests for the statement catalog cache, using the offline stand-in for the ArpY data fetcher of the benchmarks
+"""
+
+import asyncio
+import os
+import sys
+import time
+
+import polars as pl
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "backend"))
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "benchmarks"))
+
+from fake_arpy import FakeStatementsFetcher
+from functions.catalogCache import CatalogCache
+
+
+def catalog(statement):
+    return pl.DataFrame({"Originele statement": [statement], "Aliassen": ["alias"], "Factor": ["F1"]})
+
+
+def fake_fetcher(delay=0.01):
+    return FakeStatementsFetcher({"PPG": catalog("PPG statement 1"), "SAP": catalog("SAP statement 1")}, delay=delay)
+
+
+def test_fresh_catalog_is_served_from_cache():
+    async def run():
+        fetcher = fake_fetcher()
+        cache = CatalogCache(fetcher, ttl=60, max_stale=60)
+        first = await cache.get("PPG")
+        second = await cache.get("PPG")
+        return fetcher.calls, first, second, cache.stats()
+
+    calls, first, second, stats = asyncio.run(run())
+    assert calls == 1
+    assert first.equals(second)
+    assert stats["hits"] == 1 and stats["misses"] == 1
+
+
+def test_concurrent_fetches_are_deduplicated():
+    async def run():
+        fetcher = fake_fetcher(delay=0.05)
+        cache = CatalogCache(fetcher, ttl=60, max_stale=60)
+        results = await asyncio.gather(*(cache.get("PPG") for _ in range(10)), cache.get("SAP"))
+        return fetcher.calls, results
+
+    calls, results = asyncio.run(run())
+    assert calls == 2  # One per client
+    assert all(result.equals(results[0]) for result in results[:10])
+
+
+def test_stale_catalog_is_served_while_refreshing():
+    async def run():
+        fetcher = fake_fetcher()
+        cache = CatalogCache(fetcher, ttl=0.05, max_stale=60)
+        first = await cache.get("PPG")
+        await asyncio.sleep(0.06)
+        fetcher.catalogs["PPG"] = catalog("PPG statement 2")
+
+        stale = await cache.get("PPG")
+        await asyncio.sleep(0.03)  # Let the background refresh finish
+        refreshed = await cache.get("PPG")
+        return fetcher.calls, first, stale, refreshed, cache.stats()
+
+    calls, first, stale, refreshed, stats = asyncio.run(run())
+    assert calls == 2
+    assert stale.equals(first)
+    assert refreshed["Originele statement"].item() == "PPG statement 2"
+    # The stale catalog was served, so it counts as a hit
+    assert stats["stale_hits"] == 1
+    assert stats["hit_ratio"] == 2 / 3
+
+
+def test_expired_catalog_is_fetched_again():
+    async def run():
+        fetcher = fake_fetcher()
+        cache = CatalogCache(fetcher, ttl=0.01, max_stale=0.01)
+        await cache.get("PPG")
+        await asyncio.sleep(0.03)
+        fetcher.catalogs["PPG"] = catalog("PPG statement 2")
+        latest = await cache.get("PPG")
+        return fetcher.calls, latest, cache.stats()
+
+    calls, latest, stats = asyncio.run(run())
+    assert calls == 2
+    assert latest["Originele statement"].item() == "PPG statement 2"
+    assert stats["evictions"] == 1 and stats["misses"] == 2 and stats["hit_ratio"] == 0.0
+
+
+def test_failed_refresh_keeps_stale_catalog():
+    async def run():
+        fetcher = fake_fetcher()
+        cache = CatalogCache(fetcher, ttl=0.01, max_stale=60)
+        first = await cache.get("PPG")
+        await asyncio.sleep(0.02)
+
+        fetcher.fail = True
+        await cache.get("PPG")
+        await asyncio.sleep(0.03)
+        after_failure = await cache.get("PPG")
+        return first, after_failure, cache.stats()
+
+    first, after_failure, stats = asyncio.run(run())
+    assert after_failure.equals(first)
+    assert stats["fetch_errors"] >= 1
+
+
+def test_invalidate_forces_a_new_fetch():
+    async def run():
+        fetcher = fake_fetcher()
+        cache = CatalogCache(fetcher, ttl=60, max_stale=60)
+        await cache.get("PPG")
+        await cache.get("SAP")
+        cache.invalidate("PPG")
+        await cache.get("PPG")
+        await cache.get("SAP")
+        cache.invalidate()
+        await cache.get("SAP")
+        return fetcher.calls
+
+    assert asyncio.run(run()) == 4
+
+
+if __name__ == "__main__":
+    start = time.perf_counter()
+    for name, test in list(globals().items()):
+        if name.startswith("test_"):
+            test()
+            print(f"✅ {name} passed")
+    print(f"All catalog cache tests passed in {time.perf_counter() - start:.2f}s")
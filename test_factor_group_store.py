@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+Tests for saving factor groups to MongoDB, using mongomock as a local stand-in for the database
+"""
+
+import inspect
+import os
+import sys
+
+import mongomock
+import pytest
+
+from mongomock.collection import BulkOperationBuilder
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "backend"))
+
+from functions.factorGroupStore import FactorGroupStore
+
+
+def make_groups(sizes, prefix="Statement"):
+    """Groups of statement objects like the frontend sends them"""
+    groups, number = [], 0
+    for size in sizes:
+        group = []
+        for _ in range(size):
+            group.append({
+                "id": number,
+                "original_statement": f"{prefix} {number}",
+                "aliasses": f"Alias {number}",
+                "factor_groups": len(groups) + 1,
+                "displayText": f"Alias {number}",
+            })
+            number += 1
+        groups.append(group)
+    return groups
+
+
+@pytest.fixture
+def store(monkeypatch):
+    # pymongo >= 4.9 passes a `sort` option for UpdateOne in bulk writes, which mongomock doesn't know yet
+    add_update = BulkOperationBuilder.add_update
+    if "sort" not in inspect.signature(add_update).parameters:
+        def add_update_without_sort(self, *args, sort=None, **kwargs):
+            return add_update(self, *args, **kwargs)
+        monkeypatch.setattr(BulkOperationBuilder, "add_update", add_update_without_sort)
+
+    return FactorGroupStore(mongomock.MongoClient()["cronbach"])
+
+
+def test_save_writes_every_statement(store):
+    version = store.save("PPG", "task", make_groups([2, 1, 1, 0]))
+
+    assert version == 1
+    assert store.groups.count_documents({"client": "PPG", "task_id": "task"}) == 4
+    assert store.load("PPG", "task") == (1, [["Statement 0", "Statement 1"], ["Statement 2"], ["Statement 3"]])
+
+
+def test_versions_are_per_client_and_task(store):
+    assert store.save("PPG", "task", make_groups([1])) == 1
+    assert store.save("PPG", "task", make_groups([1])) == 2
+    assert store.save("PPG", "other task", make_groups([1])) == 1
+    assert store.save("Other client", "task", make_groups([1])) == 1
+
+
+def test_new_save_replaces_the_grouping(store):
+    store.save("PPG", "task", make_groups([3, 3]))
+    groups = make_groups([1, 1])
+    groups[0], groups[1] = groups[1], groups[0]
+    version = store.save("PPG", "task", groups)
+
+    # Statements that aren't in the new grouping are removed, the others are moved
+    assert store.groups.count_documents({"client": "PPG", "task_id": "task"}) == 2
+    assert store.load("PPG", "task") == (version, [["Statement 1"], ["Statement 0"]])
+
+
+def test_empty_save_removes_all_statements(store):
+    store.save("PPG", "task", make_groups([2, 2]))
+    version = store.save("PPG", "task", [[], [], [], []])
+
+    assert store.groups.count_documents({}) == 0
+    assert store.load("PPG", "task") == (version, [])
+
+
+def test_outdated_save_does_not_overwrite_newer_one(store):
+    store.save("PPG", "task", make_groups([2]))
+    # A save that reserved an older version than the current one finishes last
+    newest = store.save("PPG", "task", make_groups([0, 2]))
+    store.next_version = lambda client, task_id: newest - 1
+    store.save("PPG", "task", make_groups([2]))
+
+    assert store.load("PPG", "task") == (newest, [[], ["Statement 0", "Statement 1"]])
+
+
+def test_statement_without_original_statement_is_rejected(store):
+    groups = make_groups([2])
+    del groups[0][1]["original_statement"]
+
+    with pytest.raises(ValueError):
+        store.save("PPG", "task", groups)
+    # Nothing is written and no version is used up
+    assert store.groups.count_documents({}) == 0
+    assert store.save("PPG", "task", make_groups([1])) == 1
+
+
+def test_save_of_2000_statements_is_a_single_bulk_write(store):
+    # Only count the operations, mongomock itself is far too slow for 2000 upserts
+    writes = []
+    store.groups.bulk_write = lambda operations, **kwargs: writes.append(operations)
+
+    store.save("PPG", "task", make_groups([500, 500, 500, 500]))
+
+    assert len(writes) == 1
+    assert len(writes[0]) == 2001
+
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([__file__, "-v", "-s"]))
@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""
+Tests for the binary encodings of the drag-and-drop scores
+"""
+
+import io
+import os
+import sys
+
+import numpy as np
+import polars as pl
+import pytest
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "backend"))
+
+from functions.groupData import ARROW_FILE_CONTENT_TYPE, decode_arrow, decode_raw
+from functions.scoreCalculating import cronbach_alpha
+
+# A row of responses per statement, like the JSON group_data; None is a missing answer
+GROUP_DATA = [[1, 2, 3, 4, 5, None], [2, 2, 3, 5, 4, 3], [1, 3, 3, 4, 5, 2]]
+
+
+def expected():
+    return np.array(GROUP_DATA, dtype=np.float64).T
+
+
+def test_raw_uint8_uses_zero_for_missing():
+    body = np.array([[score or 0 for score in row] for row in GROUP_DATA], dtype=np.uint8).tobytes()
+
+    np.testing.assert_array_equal(decode_raw(body, "3,6", "uint8"), expected())
+
+
+def test_raw_float32_uses_nan_for_missing():
+    body = np.array(GROUP_DATA, dtype=np.float32).tobytes()
+
+    np.testing.assert_array_equal(decode_raw(body, "3,6", "float32"), expected())
+
+
+@pytest.mark.parametrize("shape, dtype", [("3,5", "uint8"), ("3", "uint8"), (None, "uint8"), ("3,6", "int64"), ("3,6", None)])
+def test_raw_rejects_mismatched_headers(shape, dtype):
+    with pytest.raises(ValueError):
+        decode_raw(bytes(18), shape, dtype)
+
+
+@pytest.mark.parametrize("file", [False, True])
+def test_arrow(file):
+    df = pl.DataFrame({f"Statement {i}": row for i, row in enumerate(GROUP_DATA)}).cast(pl.UInt8)
+    buffer = io.BytesIO()
+    if file:
+        df.write_ipc(buffer)
+        scores = decode_arrow(buffer.getvalue(), ARROW_FILE_CONTENT_TYPE)
+    else:
+        df.write_ipc_stream(buffer)
+        scores = decode_arrow(buffer.getvalue())
+
+    np.testing.assert_array_equal(scores, expected())
+    assert cronbach_alpha(scores) == cronbach_alpha(expected())
+
+
+def test_arrow_rejects_invalid_bodies():
+    buffer = io.BytesIO()
+    pl.DataFrame({"Statement 0": ["a"]}).write_ipc_stream(buffer)
+
+    with pytest.raises(ValueError):
+        decode_arrow(b"not arrow")
+    with pytest.raises(ValueError):
+        decode_arrow(buffer.getvalue())
+
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([__file__, "-v"]))
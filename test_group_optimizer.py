@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+Tests for the local search of the group optimizer, comparing its incremental scores with the batch kernel
+"""
+
+import os
+import sys
+
+import numpy as np
+import pytest
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "backend"))
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "benchmarks"))
+
+import functions.groupOptimizer
+from functions.groupOptimizer import GroupingState, local_search
+from functions.scoreCalculating import cronbach_alpha_batch
+from functions.taskMatrix import TaskMatrix
+from functions.taskStatistics import TaskStatistics
+from synthetic_survey import generate_survey
+
+ITEMS = 18
+GROUPS = 4
+
+
+@pytest.fixture(scope="module")
+def matrix() -> TaskMatrix:
+    values = generate_survey(respondents=800, items=ITEMS, factors=3, seed=7).drop("Respondent").to_numpy()
+    return TaskMatrix.from_array(values.astype(np.float64))
+
+
+@pytest.fixture(scope="module")
+def covariance(matrix) -> np.ndarray:
+    return TaskStatistics.from_matrix(matrix).covariance
+
+
+def batch_alphas(matrix: TaskMatrix, assignment: np.ndarray) -> list[float]:
+    """Alphas of the groups of the grouping, rounded to 3 decimals like all reported scores."""
+    groups = [np.flatnonzero(assignment == group).tolist() for group in range(GROUPS)]
+    return cronbach_alpha_batch(matrix, groups)[0]
+
+
+def start(seed: int) -> np.ndarray:
+    # Every group starts with at least 2 statements, so the batch kernel scores all of them
+    return np.random.default_rng(seed).permutation(np.arange(ITEMS) % GROUPS)
+
+
+@pytest.mark.parametrize("objective", ["total", "minimum"])
+def test_incremental_alphas_match_the_batch_kernel(matrix, covariance, objective):
+    assignment = start(1)
+    state = GroupingState(covariance, assignment, GROUPS, objective)
+    movable = np.ones(ITEMS, dtype=bool)
+    np.testing.assert_allclose(state.alphas, batch_alphas(matrix, assignment), atol=1e-3)
+
+    for _ in range(6):
+        value, statement, target = state.best_move(movable, min_group_size=2)
+        state.move(statement, target)
+        assert state.value == pytest.approx(value, abs=1e-9)
+        np.testing.assert_allclose(state.alphas, batch_alphas(matrix, state.assignment), atol=1e-3)
+
+        value, i, j = state.best_swap(movable)
+        group_i, group_j = state.assignment[i], state.assignment[j]
+        state.move(i, group_j)
+        state.move(j, group_i)
+        assert state.value == pytest.approx(value, abs=1e-9)
+        np.testing.assert_allclose(state.alphas, batch_alphas(matrix, state.assignment), atol=1e-3)
+
+
+@pytest.mark.parametrize("objective", ["total", "minimum"])
+@pytest.mark.parametrize("seed", [1, 2, 3])
+def test_local_search_never_lowers_the_objective(monkeypatch, covariance, objective, seed):
+    values = []
+
+    class RecordingState(GroupingState):
+        def best_move(self, movable, min_group_size):
+            # Called once at the start of every step of the search
+            values.append(self.value)
+            return super().best_move(movable, min_group_size)
+
+    monkeypatch.setattr(functions.groupOptimizer, "GroupingState", RecordingState)
+    movable = np.ones(ITEMS, dtype=bool)
+    movable[:3] = False
+    assignment = start(seed)
+
+    result, value, converged = local_search(covariance, assignment, GROUPS, movable, 2, objective, time_limit=10)
+
+    assert converged
+    assert len(values) > 1
+    assert all(later >= earlier for earlier, later in zip(values, values[1:]))
+    assert value == values[-1] >= GroupingState(covariance, assignment, GROUPS, objective).value
+    np.testing.assert_array_equal(result[:3], assignment[:3])
+    assert np.bincount(result, minlength=GROUPS).min() >= 2
+
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([__file__, "-v"]))
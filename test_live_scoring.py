@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+"""
+Tests for the live scoring WebSocket: the changes, coalescing of bursts, error replies and close codes
+"""
+
+import json
+import sys
+
+import pytest
+from fastapi import HTTPException
+from starlette.websockets import WebSocketDisconnect
+
+# The first group has statements with missing values (scored from the rows), the others are complete
+GROUPS = [
+    ["Statement 0", "Statement 3", "Statement 4", "Statement 9"],
+    ["Statement 1", "Statement 7", "Statement 10"],
+    ["Statement 2", "Statement 5", "Statement 6", "Statement 8"],
+]
+
+
+def fresh_scores(client, task_id: str, groups: list[list[str]]) -> dict[int, float | None]:
+    response = client.post("/api/calculate-cronbach-alpha", json={"task_id": task_id, "groups": groups})
+    response.raise_for_status()
+    return {int(i): alpha for i, alpha in response.json().items()}
+
+
+def receive_scores(websocket) -> dict[int, float | None]:
+    message = websocket.receive_json()
+    assert message["type"] == "scores", message
+    return {int(i): alpha for i, alpha in message["scores"].items()}
+
+
+def assert_scores(client, task_id: str, groups: list[list[str]], scores: dict[int, float | None]):
+    expected = fresh_scores(client, task_id, groups)
+    for i, alpha in scores.items():
+        assert alpha == pytest.approx(expected[i], abs=1e-3)
+
+
+def test_changes_are_scored(client, task_id):
+    groups = [list(group) for group in GROUPS]
+
+    with client.websocket_connect(f"/ws/task/{task_id}") as websocket:
+        websocket.send_json({"type": "init", "groups": groups})
+        scores = receive_scores(websocket)
+        assert sorted(scores) == [0, 1, 2]
+        assert_scores(client, task_id, groups, scores)
+
+        websocket.send_json({"type": "move", "statement": "Statement 4", "source_group": 0, "target_group": 1})
+        groups[0].remove("Statement 4")
+        groups[1].append("Statement 4")
+        scores = receive_scores(websocket)
+        assert sorted(scores) == [0, 1]
+        assert_scores(client, task_id, groups, scores)
+
+        websocket.send_json({"type": "add", "statement": "Statement 11", "group": 2})
+        groups[2].append("Statement 11")
+        scores = receive_scores(websocket)
+        assert sorted(scores) == [2]
+        assert_scores(client, task_id, groups, scores)
+
+        websocket.send_json({"type": "remove", "statement": "Statement 3", "group": 0})
+        groups[0].remove("Statement 3")
+        scores = receive_scores(websocket)
+        assert sorted(scores) == [0]
+        assert_scores(client, task_id, groups, scores)
+
+
+def test_a_burst_of_changes_is_scored_once(backend, client, task_id, monkeypatch):
+    # Long enough for the whole burst to arrive before the changes are scored
+    monkeypatch.setattr(backend, "LIVE_SCORING_DELAY", 0.5)
+    groups = [list(group) for group in GROUPS]
+
+    with client.websocket_connect(f"/ws/task/{task_id}") as websocket:
+        websocket.send_json({"type": "init", "groups": groups})
+        receive_scores(websocket)
+
+        websocket.send_json({"type": "move", "statement": "Statement 7", "source_group": 1, "target_group": 2})
+        websocket.send_json({"type": "move", "statement": "Statement 8", "source_group": 2, "target_group": 1})
+        websocket.send_json({"type": "add", "statement": "Statement 11", "group": 2})
+        groups[1].remove("Statement 7")
+        groups[2].append("Statement 7")
+        groups[2].remove("Statement 8")
+        groups[1].append("Statement 8")
+        groups[2].append("Statement 11")
+
+        scores = receive_scores(websocket)
+        # Group 0 didn't change, so it isn't scored again
+        assert sorted(scores) == [1, 2]
+        assert_scores(client, task_id, groups, scores)
+
+        # Nothing else was pushed for the burst: the next message is the reply to this one
+        websocket.send_json({"type": "unknown"})
+        assert websocket.receive_json()["type"] == "error"
+
+
+@pytest.mark.parametrize("message", [
+    "not json",
+    json.dumps([1, 2]),
+    json.dumps({"type": "unknown"}),
+    json.dumps({"type": "move", "statement": "Statement 3", "source_group": 1, "target_group": 0}),
+    json.dumps({"type": "move", "statement": "Statement 3", "source_group": 0, "target_group": 7}),
+    json.dumps({"type": "add", "statement": "Statement 3", "group": 1}),
+    json.dumps({"type": "remove", "group": 0}),
+])
+def test_bad_messages_get_an_error_reply(client, task_id, message):
+    with client.websocket_connect(f"/ws/task/{task_id}") as websocket:
+        websocket.send_json({"type": "init", "groups": GROUPS})
+        receive_scores(websocket)
+
+        websocket.send_text(message)
+        reply = websocket.receive_json()
+        assert reply["type"] == "error" and reply["detail"]
+
+        # The connection stays usable
+        websocket.send_json({"type": "remove", "statement": "Statement 3", "group": 0})
+        assert sorted(receive_scores(websocket)) == [0]
+
+
+def test_changes_before_init_get_an_error_reply(client, task_id):
+    with client.websocket_connect(f"/ws/task/{task_id}") as websocket:
+        websocket.send_json({"type": "add", "statement": "Statement 11", "group": 0})
+
+        assert websocket.receive_json() == {"type": "error", "detail": "Send the groups (init) first"}
+
+
+def test_unknown_task_closes_the_connection(client):
+    with client.websocket_connect("/ws/task/no-such-task") as websocket:
+        with pytest.raises(WebSocketDisconnect) as disconnect:
+            websocket.receive_json()
+
+    assert disconnect.value.code == 4404
+
+
+@pytest.mark.parametrize("error, code", [(HTTPException(status_code=404, detail="Run deleted"), 4404), (RuntimeError("Broken"), 1011)])
+def test_failed_scoring_closes_the_connection(backend, client, task_id, monkeypatch, error, code):
+    def score_groups_from_rows(*args, **kwargs):
+        raise error
+
+    # The first group is scored from the rows
+    monkeypatch.setattr(backend, "score_groups_from_rows", score_groups_from_rows)
+
+    with client.websocket_connect(f"/ws/task/{task_id}") as websocket:
+        websocket.send_json({"type": "init", "groups": GROUPS})
+        with pytest.raises(WebSocketDisconnect) as disconnect:
+            websocket.receive_json()
+
+    assert disconnect.value.code == code
+
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([__file__, "-v"]))
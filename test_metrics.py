@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+"""
+Tests for the Prometheus text rendering of the metrics
+"""
+
+import os
+import sys
+
+import pytest
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "backend"))
+
+from functions.metrics import Counter, Gauge, Histogram, MetricsRegistry
+
+
+def test_histogram_buckets_are_cumulative():
+    registry = MetricsRegistry()
+    histogram = registry.register(Histogram("duration_seconds", "Duration", ("stage",), buckets=(0.1, 1.0)))
+    for value in (0.05, 0.5, 0.5, 5.0):
+        histogram.observe(value, stage="parse")
+
+    lines = registry.render().splitlines()
+
+    assert lines[:2] == ["# HELP duration_seconds Duration", "# TYPE duration_seconds histogram"]
+    assert 'duration_seconds_bucket{stage="parse",le="0.1"} 1' in lines
+    assert 'duration_seconds_bucket{stage="parse",le="1.0"} 3' in lines
+    assert 'duration_seconds_bucket{stage="parse",le="+Inf"} 4' in lines
+    assert 'duration_seconds_sum{stage="parse"} 6.05' in lines
+    assert 'duration_seconds_count{stage="parse"} 4' in lines
+
+
+def test_histogram_times_a_block():
+    histogram = Histogram("duration_seconds", "Duration", buckets=(60.0,))
+    with histogram.time():
+        pass
+
+    assert "duration_seconds_count 1" in histogram.samples()
+
+
+def test_counter_and_gauge():
+    registry = MetricsRegistry()
+    counter = registry.register(Counter("uploaded_bytes_total", "Bytes"))
+    registry.register(Gauge("cache_hit_ratio", "Ratio", lambda: {("tasks",): 0.5}, ("cache",)))
+    counter.inc(10)
+    counter.inc(5)
+
+    text = registry.render()
+
+    assert "uploaded_bytes_total 15.0" in text
+    assert 'cache_hit_ratio{cache="tasks"} 0.5' in text
+
+
+def test_label_values_are_escaped():
+    counter = Counter("requests_total", "Requests", ("route",))
+    counter.inc(route='a"b\\c')
+
+    assert counter.samples() == ['requests_total{route="a\\"b\\\\c"} 1.0']
+
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([__file__, "-v"]))
@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+Tests for the opt-in request profiling
+"""
+
+import os
+import pstats
+import sys
+import time
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "backend"))
+
+from functions.profiling import ProfilingMiddleware, SamplingProfiler, is_profiling, list_profiles, profile_path
+
+
+def busy(seconds):
+    end = time.perf_counter() + seconds
+    while time.perf_counter() < end:
+        pass
+
+
+@pytest.fixture
+def client(tmp_path):
+    app = FastAPI()
+    app.add_middleware(ProfilingMiddleware, directory=str(tmp_path), authorize=lambda token: token == "secret")
+
+    @app.get("/work")
+    def work() -> dict:
+        busy(0.05)
+        return {"profiling": is_profiling()}
+
+    return TestClient(app)
+
+
+def test_requests_are_not_profiled_by_default(client, tmp_path):
+    response = client.get("/work")
+
+    assert response.json() == {"profiling": False}
+    assert "x-profile-id" not in response.headers
+    assert os.listdir(tmp_path) == []
+
+
+def test_profiling_requires_the_admin_token(client, tmp_path):
+    response = client.get("/work", params={"profile": "1"}, headers={"X-Admin-Token": "wrong"})
+
+    assert response.status_code == 403
+    assert os.listdir(tmp_path) == []
+
+
+@pytest.mark.parametrize("flag", [{"headers": {"X-Profile": "1"}}, {"params": {"profile": "true"}}])
+def test_profiled_request_is_saved(client, tmp_path, flag):
+    headers = {"X-Admin-Token": "secret", "X-Request-ID": "slow-file", **flag.get("headers", {})}
+    response = client.get("/work", params=flag.get("params"), headers=headers)
+
+    assert response.json() == {"profiling": True}
+    assert response.headers["x-profile-id"] == "slow-file"
+
+    [summary] = list_profiles(str(tmp_path))
+    assert summary["request_id"] == "slow-file"
+    assert summary["path"] == "/work"
+    assert summary["status"] == 200
+    assert summary["peak_memory_bytes"] > 0
+    # The endpoint runs on the threadpool, which cProfile wouldn't see
+    assert any("(busy)" in function["function"] for function in summary["top_functions"])
+
+    stats = pstats.Stats(profile_path(str(tmp_path), "slow-file"))
+    assert any(name == "busy" for _, _, name in stats.stats)
+
+
+def test_profile_path_rejects_other_paths(tmp_path):
+    assert profile_path(str(tmp_path), "../secret") is None
+    assert profile_path(str(tmp_path), "missing") is None
+
+
+def test_sampled_times_add_up():
+    profiler = SamplingProfiler(interval=0.001)
+    profiler.start()
+    busy(0.1)
+    profiler.stop()
+
+    stats = profiler.stats()
+    [busy_stats] = [entry for (_, _, name), entry in stats.items() if name == "busy"]
+    # The busy loop is most of the profiled time, within sampling noise
+    assert 0.05 < busy_stats[3] <= profiler.duration + 0.01
+    assert sum(own for _, _, own, _, _ in stats.values()) == pytest.approx(profiler.samples * profiler.duration / profiler.ticks)
+
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([__file__, "-v"]))
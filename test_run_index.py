@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+Tests for the run index and the janitor evicting idle runs and runs over the disk quota
+"""
+
+import os
+import sys
+import threading
+import time
+
+import pytest
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "backend"))
+
+from functions.runIndex import RunIndex
+from functions.runStorage import RUN_EXTENSION
+
+MB = 1024 * 1024
+HOUR = 60 * 60
+
+
+@pytest.fixture
+def index(tmp_path):
+    index = RunIndex(str(tmp_path / "index.sqlite3"))
+    yield index
+    index.close()
+
+
+def test_touches_are_written_by_flush(index):
+    two_hours_ago = time.time() - 2 * HOUR
+    index.register("used", "client", 10, created=two_hours_ago)
+    index.register("unused", "client", 10, created=two_hours_ago)
+
+    index.touch("used")
+    # Not on disk until flushed
+    assert sorted(index.idle_since(time.time() - HOUR)) == ["unused", "used"]
+    index.flush()
+
+    assert index.idle_since(time.time() - HOUR) == ["unused"]
+    assert [run["task_id"] for run in index.runs()] == ["used", "unused"]
+
+
+def test_touches_during_a_flush_are_kept(index):
+    tasks = [f"task-{i}" for i in range(200)]
+    for task_id in tasks:
+        index.register(task_id, None, 1, created=0)
+
+    def touch_all():
+        for task_id in tasks:
+            index.touch(task_id)
+
+    threads = [threading.Thread(target=touch_all) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    while any(thread.is_alive() for thread in threads):
+        index.flush()
+    for thread in threads:
+        thread.join()
+    index.flush()
+
+    assert index.idle_since(1) == []
+
+
+def test_over_quota_returns_the_least_recently_used_runs(index):
+    now = time.time()
+    for age, task_id in enumerate(["newest", "middle", "oldest"]):
+        index.register(task_id, None, 40 * MB, created=now - age * HOUR)
+
+    assert index.over_quota(120 * MB) == []
+    assert index.over_quota(100 * MB) == ["oldest"]
+    assert index.over_quota(50 * MB) == ["oldest", "middle"]
+
+
+def test_sync_matches_the_runs_on_disk(index, tmp_path):
+    (tmp_path / f"on-disk{RUN_EXTENSION}").write_bytes(b"run")
+    (tmp_path / "legacy.csv").write_bytes(b"run")
+    index.register("deleted", None, 10)
+
+    index.sync(str(tmp_path))
+
+    assert sorted(run["task_id"] for run in index.runs()) == ["legacy", "on-disk"]
+    assert index.count() == 2
+
+
+@pytest.fixture
+def janitor(backend, tmp_path, monkeypatch):
+    """The backend with an empty runs directory and run index of its own."""
+    index = RunIndex(str(tmp_path / "index.sqlite3"))
+    monkeypatch.setattr(backend, "runs_directory", str(tmp_path))
+    monkeypatch.setattr(backend, "run_index", index)
+    monkeypatch.setenv("RUN_MAX_IDLE_HOURS", "24")
+    monkeypatch.setenv("RUNS_DISK_QUOTA_MB", "100")
+    yield backend
+    index.close()
+
+
+def add_run(janitor, task_id: str, size_mb: int, hours_ago: float) -> str:
+    path = janitor.run_path(task_id)
+    with open(path, "wb") as file:
+        file.write(b"run")
+    janitor.run_index.register(task_id, "client", size_mb * MB, created=time.time() - hours_ago * HOUR)
+    return path
+
+
+def test_evict_runs_deletes_idle_runs_and_runs_over_quota(janitor):
+    add_run(janitor, "idle", 10, hours_ago=30)
+    add_run(janitor, "touched", 10, hours_ago=30)
+    add_run(janitor, "old", 50, hours_ago=5)
+    add_run(janitor, "recent", 50, hours_ago=1)
+    janitor.run_index.touch("touched")
+
+    evicted = janitor.evict_runs()
+
+    # "touched" was used just now, the flush before evicting tells; "old" has to go to fit in 100 MB
+    assert sorted(evicted) == ["idle", "old"]
+    assert sorted(run["task_id"] for run in janitor.run_index.runs()) == ["recent", "touched"]
+    assert not os.path.exists(janitor.run_path("idle")) and not os.path.exists(janitor.run_path("old"))
+    assert os.path.exists(janitor.run_path("recent")) and os.path.exists(janitor.run_path("touched"))
+
+
+def test_evict_runs_keeps_runs_being_uploaded(janitor, monkeypatch):
+    add_run(janitor, "idle", 10, hours_ago=30)
+    add_run(janitor, "uploading", 10, hours_ago=30)
+    monkeypatch.setattr(janitor.upload_jobs, "is_pending", lambda task_id: task_id == "uploading")
+
+    assert janitor.evict_runs() == ["idle"]
+    assert os.path.exists(janitor.run_path("uploading"))
+
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([__file__, "-v"]))
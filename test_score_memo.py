@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+"""
+Tests for the memo of group scores: single-flight computation, LRU eviction and invalidation
+"""
+
+import os
+import shutil
+import sys
+import threading
+import time
+import uuid
+
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "backend"))
+
+from functions.runStorage import sources_path
+from functions.scoreMemo import ScoreMemo
+from functions.taskStatistics import statistics_path
+
+
+class Computer:
+    """Scores every group by its size and records which groups it computed."""
+
+    def __init__(self, started: threading.Event | None = None, release: threading.Event | None = None):
+        self.started = started
+        self.release = release
+        self.computed = []
+        self._lock = threading.Lock()
+
+    def __call__(self, groups: list[list[str]]) -> list[tuple[float | None, int]]:
+        with self._lock:
+            self.computed.extend(groups)
+        if self.started is not None:
+            self.started.set()
+            self.release.wait(5)
+        return [(float(len(group)), 100) for group in groups]
+
+
+def test_concurrent_identical_requests_compute_once():
+    memo = ScoreMemo(max_entries=10)
+    started, release = threading.Event(), threading.Event()
+    compute = Computer(started, release)
+    groups = [["a", "b"], ["c", "d", "e"]]
+
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        first = pool.submit(memo.get_many, "task", "listwise", groups, compute)
+        started.wait(5)
+        # The same groups, in another order, while the first request is computing them
+        others = [pool.submit(memo.get_many, "task", "listwise", [["e", "d", "c"], ["b", "a"]], compute) for _ in range(3)]
+        deadline = time.monotonic() + 5
+        while memo.stats()["coalesced"] < 6 and time.monotonic() < deadline:
+            time.sleep(0.001)
+        release.set()
+        results = [first.result(5)] + [other.result(5) for other in others]
+
+    assert compute.computed == groups
+    assert results[0] == [(2.0, 100), (3.0, 100)]
+    assert all(result == [(3.0, 100), (2.0, 100)] for result in results[1:])
+    assert memo.stats()["misses"] == 2
+    assert memo.stats()["coalesced"] == 6
+
+
+def test_failures_reach_the_waiting_requests():
+    memo = ScoreMemo(max_entries=10)
+    started, release = threading.Event(), threading.Event()
+
+    def compute(groups):
+        started.set()
+        release.wait(5)
+        raise ValueError("run deleted")
+
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        first = pool.submit(memo.get_many, "task", "listwise", [["a", "b"]], compute)
+        started.wait(5)
+        second = pool.submit(memo.get_many, "task", "listwise", [["a", "b"]], compute)
+        release.set()
+        for future in (first, second):
+            with pytest.raises(ValueError):
+                future.result(5)
+
+    # Nothing is memoized, the next request computes again
+    compute_again = Computer()
+    assert memo.get_many("task", "listwise", [["a", "b"]], compute_again) == [(2.0, 100)]
+    assert compute_again.computed == [["a", "b"]]
+
+
+def test_least_recently_used_scores_are_evicted():
+    memo = ScoreMemo(max_entries=2)
+    compute = Computer()
+    memo.get_many("task", "listwise", [["a", "b"], ["c", "d"]], compute)
+    memo.get_many("task", "listwise", [["a", "b"]], compute)  # c, d is now the least recently used
+
+    memo.get_many("task", "listwise", [["e", "f"]], compute)
+    memo.get_many("task", "listwise", [["a", "b"], ["c", "d"]], compute)
+
+    assert compute.computed == [["a", "b"], ["c", "d"], ["e", "f"], ["c", "d"]]
+    assert memo.stats()["entries"] == 2
+    assert memo.stats()["evictions"] == 2
+
+
+def test_keys_keep_duplicate_statements_and_missing_value_handling():
+    memo = ScoreMemo(max_entries=10)
+    compute = Computer()
+
+    scores = memo.get_many("task", "listwise", [["a", "b"], ["a", "a", "b"], ["b", "a"]], compute)
+    memo.get_many("task", "pairwise", [["a", "b"]], compute)
+
+    assert scores == [(2.0, 100), (3.0, 100), (2.0, 100)]
+    assert compute.computed == [["a", "b"], ["a", "a", "b"], ["a", "b"]]
+
+
+def test_invalidate_drops_one_task():
+    memo = ScoreMemo(max_entries=10)
+    compute = Computer()
+    memo.get_many("first", "listwise", [["a", "b"]], compute)
+    memo.get_many("second", "listwise", [["a", "b"]], compute)
+
+    memo.invalidate("first")
+    memo.get_many("first", "listwise", [["a", "b"]], compute)
+    memo.get_many("second", "listwise", [["a", "b"]], compute)
+
+    assert len(compute.computed) == 3
+    memo.invalidate()
+    assert memo.stats()["entries"] == 0
+
+
+def test_deleting_a_task_drops_its_scores(backend, client, task_id):
+    # A copy of the test task, so deleting it doesn't affect the other tests
+    copy_id = str(uuid.uuid4())
+    source, copy = backend.run_path(task_id), backend.run_path(copy_id)
+    for path in (source, statistics_path(source), sources_path(source)):
+        if os.path.exists(path):
+            shutil.copy(path, path.replace(task_id, copy_id))
+    groups = [["Statement 0", "Statement 3"], ["Statement 1", "Statement 7"]]
+
+    response = client.post("/api/calculate-cronbach-alpha", json={"task_id": copy_id, "groups": groups})
+    assert response.status_code == 200
+    assert backend.score_memo.key(copy_id, "listwise", groups[0]) in backend.score_memo._entries
+
+    backend.delete_run(copy_id)
+
+    assert not os.path.exists(copy)
+    assert not any(key[0] == copy_id for key in backend.score_memo._entries)
+    response = client.post("/api/calculate-cronbach-alpha", json={"task_id": copy_id, "groups": groups})
+    assert response.status_code == 404
+
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([__file__, "-v"]))
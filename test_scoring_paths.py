@@ -0,0 +1,186 @@
+#!/usr/bin/env python3
+"""
+Tests comparing the optimized scoring paths with cronbach_alpha on the rows, on synthetic surveys
+"""
+
+import os
+import sys
+import tracemalloc
+
+import numpy as np
+import polars as pl
+import pytest
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "backend"))
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "benchmarks"))
+
+import functions.taskMatrix
+from functions.scoreCalculating import cronbach_alpha, cronbach_alpha_batch, cronbach_alpha_from_covariance, item_deletion_statistics
+from functions.taskMatrix import TaskMatrix
+from functions.taskStatistics import TaskStatistics, listwise_covariance
+from synthetic_survey import generate_survey
+
+ITEMS = 12
+# The factors of the survey, and a group mixing them
+GROUPS = [[0, 3, 6, 9], [1, 4, 7, 10], [2, 5, 8, 11], [0, 1, 5, 8, 11]]
+# Statements that get missing values, so some groups are complete and others aren't
+INCOMPLETE = [0, 4]
+
+
+def survey(missing: float = 0.0, respondents: int = 1500) -> np.ndarray:
+    """Respondents × statements answers as floats, NaN where missing."""
+    values = generate_survey(respondents=respondents, items=ITEMS, factors=3, seed=3).drop("Respondent").to_numpy()
+    values = values.astype(np.float64)
+    if missing:
+        rng = np.random.default_rng(4)
+        values[:, INCOMPLETE] = np.where(rng.random((respondents, len(INCOMPLETE))) < missing, np.nan, values[:, INCOMPLETE])
+    return values
+
+
+def as_frame(values: np.ndarray) -> pl.DataFrame:
+    return pl.DataFrame({f"Statement {i}": values[:, i] for i in range(values.shape[1])}).fill_nan(None).cast(pl.UInt8)
+
+
+def names(group: list[int]) -> list[str]:
+    return [f"Statement {i}" for i in group]
+
+
+@pytest.mark.parametrize("missing", [0.0, 0.1])
+def test_covariance_path_matches_rows(missing):
+    values = survey(missing)
+    statistics = TaskStatistics.from_frame(as_frame(values))
+    matrix = TaskMatrix.from_array(values)
+
+    for group in GROUPS:
+        expected = cronbach_alpha(values[:, group])
+        if statistics.is_complete(names(group)):
+            alpha = cronbach_alpha_from_covariance(statistics.covariance_of(names(group)), statistics.count)
+        else:
+            alpha = cronbach_alpha_from_covariance(*listwise_covariance(matrix, group))
+        assert alpha == pytest.approx(expected, abs=1e-3)
+
+
+@pytest.mark.parametrize("missing", [0.0, 0.1])
+def test_item_deletion_matches_rows(missing):
+    values = survey(missing)
+    matrix = TaskMatrix.from_array(values)
+
+    for group in GROUPS:
+        alphas, correlations = item_deletion_statistics(*listwise_covariance(matrix, group))
+        complete = values[:, group][~np.isnan(values[:, group]).any(axis=1)]
+        for position in range(len(group)):
+            rest = np.delete(complete, position, axis=1)
+            assert alphas[position] == pytest.approx(cronbach_alpha(rest), abs=1e-3)
+            expected_correlation = np.corrcoef(complete[:, position], rest.sum(axis=1))[0, 1]
+            assert correlations[position] == pytest.approx(expected_correlation, abs=1e-3)
+
+
+@pytest.mark.parametrize("missing", [0.0, 0.1])
+@pytest.mark.parametrize("chunk_rows", [65536, 100])
+def test_batch_matches_rows(missing, chunk_rows):
+    values = survey(missing)
+
+    alphas, counts = cronbach_alpha_batch(TaskMatrix.from_array(values), GROUPS, chunk_rows=chunk_rows)
+
+    for group, alpha, count in zip(GROUPS, alphas, counts):
+        complete = ~np.isnan(values[:, group]).any(axis=1)
+        assert count == complete.sum()
+        assert alpha == pytest.approx(cronbach_alpha(values[:, group]), abs=1e-3)
+
+
+def test_batch_working_set_is_bounded_on_wide_tasks(monkeypatch):
+    rng = np.random.default_rng(5)
+    values = rng.integers(1, 6, size=(5000, 400)).astype(np.float64)
+    values[rng.random(values.shape) < 0.02] = np.nan
+    matrix = TaskMatrix.from_array(values)
+    groups = [list(range(start, start + 10)) for start in range(0, 400, 10)]
+    unchunked = cronbach_alpha_batch(matrix, groups, chunk_rows=matrix.count)
+
+    monkeypatch.setattr(functions.taskMatrix, "CHUNK_BYTES", 2**20)
+    tracemalloc.start()
+    try:
+        chunked = cronbach_alpha_batch(matrix, groups)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    assert chunked == unchunked
+    # A float64 copy of the statements alone would be 16 MB
+    assert peak < 8 * 2**20
+
+
+def test_batch_skips_groups_that_cant_be_scored():
+    values = survey()
+    values[1:, 2] = np.nan
+
+    alphas, counts = cronbach_alpha_batch(TaskMatrix.from_array(values), [[0], [], [1, 2], [0, 1]])
+
+    assert alphas[:3] == [None, None, None]
+    assert counts[2] == 1
+    assert alphas[3] == pytest.approx(cronbach_alpha(values[:, [0, 1]]), abs=1e-3)
+
+
+@pytest.mark.parametrize("missing", [0.0, 0.1])
+def test_task_matrix_keeps_answers_and_missing_values(missing):
+    values = survey(missing)
+
+    from_frame = TaskMatrix.from_frame(as_frame(values))
+    from_array = TaskMatrix.from_array(values)
+
+    for matrix in (from_frame, from_array):
+        assert matrix.values.dtype == np.uint8
+        assert (matrix.missing_bits is None) == (missing == 0.0)
+        np.testing.assert_array_equal(matrix.values, np.nan_to_num(values).astype(np.uint8))
+        # 12 statements are packed in 2 bytes per row, the padding bits aren't statements
+        if missing:
+            np.testing.assert_array_equal(matrix.missing_rows(7, 300), np.isnan(values[7:300]))
+        else:
+            assert matrix.missing_rows(7, 300) is None
+
+
+@pytest.mark.parametrize("missing", [0.0, 0.1])
+def test_task_matrix_complete_rows_match_rows(missing):
+    values = survey(missing)
+    matrix = TaskMatrix.from_array(values)
+
+    for group in GROUPS:
+        complete = matrix.complete_rows(group, chunk_rows=100)
+        expected = values[:, group][~np.isnan(values[:, group]).any(axis=1)]
+        np.testing.assert_array_equal(complete, expected)
+        assert cronbach_alpha(complete) == pytest.approx(cronbach_alpha(values[:, group]), abs=1e-3)
+
+
+def pairwise_reference(values: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """Covariance and count of every pair of statements over the rows answering both, one pair at a time."""
+    columns = values.shape[1]
+    covariance = np.empty((columns, columns))
+    counts = np.empty((columns, columns), dtype=np.int64)
+    for i in range(columns):
+        for j in range(columns):
+            both = ~np.isnan(values[:, i]) & ~np.isnan(values[:, j])
+            counts[i, j] = both.sum()
+            covariance[i, j] = np.cov(values[both, i], values[both, j])[0, 1]
+    return covariance, counts
+
+
+@pytest.mark.parametrize("missing", [0.0, 0.1])
+def test_pairwise_deletion_matches_rows(missing):
+    values = survey(missing, respondents=500)
+    statistics = TaskStatistics.from_frame(as_frame(values))
+    covariance, counts = pairwise_reference(values)
+
+    np.testing.assert_allclose(statistics.pairwise_covariance, covariance, atol=1e-9)
+    np.testing.assert_array_equal(statistics.pairwise_counts, counts)
+
+    for group in GROUPS:
+        pairwise_covariance, count = statistics.pairwise_covariance_of(names(group))
+        alpha = cronbach_alpha_from_covariance(pairwise_covariance, count)
+        assert count == counts[np.ix_(group, group)].min()
+        assert alpha == pytest.approx(cronbach_alpha_from_covariance(covariance[np.ix_(group, group)], count), abs=1e-3)
+        if not missing:
+            # Without missing values pairwise and listwise deletion are the same
+            assert alpha == pytest.approx(cronbach_alpha(values[:, group]), abs=1e-3)
+
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([__file__, "-v"]))
@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+Tests for the server-side scoring sessions, comparing the scores after moves with scoring the whole grouping
+"""
+
+import sys
+
+import pytest
+
+# The first group has statements with missing values (scored from the rows), the others are complete
+GROUPS = [
+    ["Statement 0", "Statement 3", "Statement 4", "Statement 9"],
+    ["Statement 1", "Statement 7", "Statement 10"],
+    ["Statement 2", "Statement 5", "Statement 6", "Statement 8", "Statement 11"],
+]
+MOVES = [
+    ("Statement 4", 0, 1),
+    ("Statement 6", 2, 1),
+    ("Statement 0", 0, 2),
+    ("Statement 6", 1, 0),
+    ("Statement 10", 1, 1),
+]
+
+
+def start(client, task_id: str) -> dict:
+    response = client.post("/api/scoring-session", json={"task_id": task_id, "groups": GROUPS})
+    response.raise_for_status()
+    return response.json()
+
+
+def fresh_scores(client, task_id: str, groups: list[list[str]]) -> dict[int, float | None]:
+    response = client.post("/api/calculate-cronbach-alpha", json={"task_id": task_id, "groups": groups})
+    response.raise_for_status()
+    return {int(i): alpha for i, alpha in response.json().items()}
+
+
+def test_moves_score_like_the_whole_grouping(client, task_id):
+    session = start(client, task_id)
+    assert {int(i): alpha for i, alpha in session["scores"].items()} == pytest.approx(fresh_scores(client, task_id, GROUPS), abs=1e-3)
+
+    groups = [list(group) for group in GROUPS]
+    version = session["version"]
+    for statement, source, target in MOVES:
+        response = client.post("/api/scoring-session/move", json={
+            "session_id": session["session_id"], "version": version,
+            "statement": statement, "source_group": source, "target_group": target,
+        })
+        assert response.status_code == 200
+        groups[source].remove(statement)
+        groups[target].append(statement)
+
+        body = response.json()
+        assert body["version"] == version + 1
+        version = body["version"]
+        # Only the two affected groups are scored
+        assert sorted(int(i) for i in body["scores"]) == sorted({source, target})
+        expected = fresh_scores(client, task_id, groups)
+        for i, alpha in body["scores"].items():
+            assert alpha == pytest.approx(expected[int(i)], abs=1e-3)
+
+
+def test_outdated_version_conflicts(client, task_id):
+    session = start(client, task_id)
+    move = {"session_id": session["session_id"], "statement": "Statement 1", "source_group": 1, "target_group": 2}
+
+    assert client.post("/api/scoring-session/move", json={**move, "version": session["version"]}).status_code == 200
+    # A second move based on the same version was made without seeing the first
+    response = client.post("/api/scoring-session/move", json={**move, "version": session["version"], "source_group": 2})
+    assert response.status_code == 409
+
+
+def test_unknown_session_is_not_found(client, task_id):
+    response = client.post("/api/scoring-session/move", json={
+        "session_id": "no-such-session", "version": 0, "statement": "Statement 1", "source_group": 1, "target_group": 2,
+    })
+
+    assert response.status_code == 404
+
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([__file__, "-v"]))
@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+"""
+Tests for the synthetic survey generator and the offline ArpY stand-in of the benchmarks
+"""
+
+import asyncio
+import os
+import sys
+
+import numpy as np
+import pytest
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "backend"))
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "benchmarks"))
+
+from fake_arpy import FakeStatementsFetcher, install_fake_arpy
+from synthetic_survey import factor_groups, generate_catalog, generate_survey
+
+
+def test_survey_shape_and_scale():
+    df = generate_survey(respondents=500, items=12, factors=3)
+
+    assert df.height == 500
+    assert [name for name in df.columns if name.endswith("*")] == [f"Statement {i}*" for i in range(12)]
+    answers = df.drop("Respondent").to_numpy()
+    assert answers.min() >= 1 and answers.max() <= 5
+
+
+def test_statements_of_a_factor_correlate():
+    df = generate_survey(respondents=2000, items=8, factors=2, loading=1.0)
+    correlation = np.corrcoef(df.drop("Respondent").to_numpy().astype(float), rowvar=False)
+
+    # Statements 0 and 2 load on the same factor, statements 0 and 1 don't
+    assert correlation[0, 2] > 0.3
+    assert abs(correlation[0, 1]) < 0.1
+    assert factor_groups(8, 2) == [[f"Statement {i}" for i in (0, 2, 4, 6)], [f"Statement {i}" for i in (1, 3, 5, 7)]]
+
+
+def test_missingness():
+    df = generate_survey(respondents=4000, items=5, missing=0.1)
+    fraction = df.drop("Respondent").null_count().to_numpy().sum() / (4000 * 5)
+
+    assert fraction == pytest.approx(0.1, abs=0.02)
+
+
+def test_fake_arpy_replaces_get_statements_data():
+    fetcher = install_fake_arpy(FakeStatementsFetcher({"PPG": generate_catalog(4, 2)}))
+
+    from ArpY.rainbow.project.data_fetcher import get_statements_data
+
+    catalog = asyncio.run(get_statements_data("PPG"))
+    assert catalog["Factor"].to_list() == ["F1", "F2", "F1", "F2"]
+    assert asyncio.run(get_statements_data("Unknown")).height == 0
+    assert fetcher.calls == 2
+
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([__file__, "-v"]))
@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+Tests for the background upload jobs, with two queues sharing a directory like two uvicorn workers
+"""
+
+import os
+import sys
+import threading
+import time
+
+import pytest
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "backend"))
+
+from functions.uploadJobs import DONE, FAILED, JOB_EXTENSION, PROCESSING, UploadJobQueue
+
+
+@pytest.fixture
+def workers(tmp_path):
+    return (
+        UploadJobQueue(max_workers=1, max_pending=5, directory=str(tmp_path)),
+        UploadJobQueue(max_workers=1, max_pending=5, directory=str(tmp_path)),
+    )
+
+
+def test_other_worker_sees_the_progress(workers):
+    first, second = workers
+    reported = threading.Event()
+    finish = threading.Event()
+
+    def process(report):
+        report("parsing excel", 0.1)
+        reported.set()
+        finish.wait(5)
+        return {"files": 1}
+
+    job = first.submit("task", process)
+    reported.wait(5)
+
+    assert second.get("task").to_dict() == {
+        "task_id": "task", "status": PROCESSING, "stage": "parsing excel", "progress": 0.1, "error": None, "result": None,
+    }
+    assert second.is_pending("task")
+
+    finish.set()
+    job.wait(5)
+    assert second.get("task").status == DONE
+    assert second.get("task").result == {"files": 1}
+    assert not second.is_pending("task")
+
+
+def test_other_worker_sees_the_failure(workers):
+    first, second = workers
+
+    def process(report):
+        raise ValueError("not an Excel file")
+
+    first.submit("task", process).wait(5)
+
+    assert second.get("task").status == FAILED
+    assert second.get("task").error == "not an Excel file"
+
+
+def test_forgotten_jobs_are_gone_for_every_worker(workers):
+    first, second = workers
+    first.submit("task", lambda report: None).wait(5)
+
+    second.forget("task")
+
+    assert first.get("task") is not None  # Still in the memory of the worker that ran it
+    first.forget("task")
+    assert first.get("task") is None and second.get("task") is None
+
+
+def test_stale_statuses_are_removed_by_the_janitor_only(tmp_path):
+    first = UploadJobQueue(max_workers=1, max_pending=5, keep_finished=60, directory=str(tmp_path))
+    second = UploadJobQueue(max_workers=1, max_pending=5, keep_finished=60, directory=str(tmp_path))
+    first.submit("old", lambda report: None).wait(5)
+    first.submit("recent", lambda report: None).wait(5)
+    an_hour_ago = time.time() - 60 * 60
+    os.utime(tmp_path / f"old{JOB_EXTENSION}", (an_hour_ago, an_hour_ago))
+
+    # Submitting doesn't list the directory
+    second.submit("new", lambda report: None).wait(5)
+    assert (tmp_path / f"old{JOB_EXTENSION}").exists()
+
+    assert second.remove_stale_statuses() == 1
+    assert not (tmp_path / f"old{JOB_EXTENSION}").exists()
+    assert second.get("recent").status == DONE
+
+
+def test_without_directory_jobs_stay_in_memory():
+    queue = UploadJobQueue(max_workers=1, max_pending=5)
+    queue.submit("task", lambda report: None).wait(5)
+
+    assert queue.get("task").status == DONE
+    queue.forget("task")
+    assert queue.get("task") is None
+
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([__file__, "-v"]))